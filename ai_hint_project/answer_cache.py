@@ -0,0 +1,251 @@
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+# 🔧 Defaults
+DEFAULT_MAX_ENTRIES = 500
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_SIMILARITY_THRESHOLD = 0.92
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+
+def normalize_question(text):
+    """Lowercase, drop trailing punctuation noise and collapse whitespace."""
+    text = text.lower().strip()
+    text = re.sub(r"[?!.,;:]+(\s|$)", r"\1", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class AnswerCache:
+    """LRU/TTL cache of generated answers, persisted to a JSON file.
+
+    Entries are keyed on persona + normalized question + a hash of the retrieved
+    context, so a rebuilt index doesn't serve stale answers. When an exact key
+    misses, questions for the same persona and context are compared by embedding
+    cosine similarity and reused above the threshold.
+
+    put() only updates memory and marks the cache dirty; a background thread
+    writes the file every flush_interval seconds (and at exit), outside the
+    lock get() uses. Each flush takes a file lock, merges in what other
+    processes saved since and picks their entries up, so processes sharing
+    the file don't overwrite each other's answers.
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 similarity_threshold=DEFAULT_SIMILARITY_THRESHOLD, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()        # entries
+        self._flush_lock = threading.Lock()  # one flush at a time
+        self._entries = OrderedDict()
+        self._cleared_at = 0.0
+        self._dirty = False
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.flushes = 0
+        self._load()
+        self._stopped = False
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="answer-cache-flush", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @staticmethod
+    def make_key(persona, question, context):
+        return _hash(f"{persona}\x00{normalize_question(question)}\x00{_hash(context)}")
+
+    def _read(self):
+        """(entries, cleared_at) as saved on disk."""
+        if not os.path.exists(self.path):
+            return [], 0.0
+        with open(self.path, "r") as f:
+            data = json.load(f)
+        return data.get("entries", []), data.get("cleared_at", 0.0)
+
+    def _load(self):
+        try:
+            entries, self._cleared_at = self._read()
+        except Exception as e:
+            print(f"⚠️ Could not load answer cache: {e}")
+            return
+        now = time.time()
+        for key, entry in entries:
+            if now - entry["created"] < self.ttl_seconds:
+                self._entries[key] = entry
+
+    @contextmanager
+    def _file_lock(self):
+        """Serialize read-merge-write of the cache file across processes."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _merge(self, ours, theirs, cleared_at, now):
+        """On-disk entries updated with ours (the newer answer wins), oldest first, capped at max_entries."""
+        merged = OrderedDict()
+        for key, entry in list(theirs) + list(ours):
+            if entry["created"] <= cleared_at or self._expired(entry, now):
+                continue
+            current = merged.get(key)
+            if current is None or entry["created"] >= current["created"]:
+                merged.pop(key, None)
+                merged[key] = entry
+        while len(merged) > self.max_entries:
+            merged.popitem(last=False)
+        return merged
+
+    def flush(self):
+        """Write pending changes to disk; returns True if the file was written."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return False
+                self._dirty = False
+                ours, cleared_at = list(self._entries.items()), self._cleared_at
+            now = time.time()
+            try:
+                with self._file_lock():
+                    theirs, their_cleared_at = self._read()
+                    cleared_at = max(cleared_at, their_cleared_at)
+                    merged = self._merge(ours, theirs, cleared_at, now)
+                    tmp_path = self.path + ".tmp"
+                    with open(tmp_path, "w") as f:
+                        json.dump({"entries": list(merged.items()), "cleared_at": cleared_at}, f)
+                    os.replace(tmp_path, self.path)
+            except Exception as e:
+                print(f"⚠️ Could not save answer cache: {e}")
+                with self._lock:
+                    self._dirty = True  # retry on the next flush
+                return False
+            with self._lock:
+                # Pick up what other processes answered, and their clear()
+                self._cleared_at = max(self._cleared_at, cleared_at)
+                for key in [key for key, entry in self._entries.items() if entry["created"] <= self._cleared_at]:
+                    del self._entries[key]
+                for key, entry in merged.items():
+                    if key not in self._entries:
+                        self._entries[key] = entry
+                        self._entries.move_to_end(key, last=False)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            self.flushes += 1
+            return True
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        if self._stopped:
+            return
+        self._stopped = True
+        self._wake.set()
+        self.flush()
+
+    def _expired(self, entry, now):
+        return now - entry["created"] >= self.ttl_seconds
+
+    def _semantic_lookup(self, persona, context_hash, embedding, now):
+        query = _unit(embedding)
+        best_key, best_score = None, self.similarity_threshold
+        for key, entry in self._entries.items():
+            if entry["persona"] != persona or entry["context_hash"] != context_hash:
+                continue
+            if entry.get("embedding") is None or self._expired(entry, now):
+                continue
+            score = float(np.dot(query, _unit(entry["embedding"])))
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    def get(self, persona, question, context, embedding=None):
+        """Return a cached answer or None."""
+        key = self.make_key(persona, question, context)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                del self._entries[key]
+                entry = None
+            if entry is None and embedding is not None:
+                key = self._semantic_lookup(persona, _hash(context), embedding, now)
+                entry = self._entries.get(key) if key else None
+                if entry is not None:
+                    self.semantic_hits += 1
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry["answer"]
+
+    def put(self, persona, question, context, answer, embedding=None):
+        key = self.make_key(persona, question, context)
+        with self._lock:
+            self._entries[key] = {
+                "persona": persona,
+                "question": normalize_question(question),
+                "context_hash": _hash(context),
+                "answer": answer,
+                "embedding": [float(x) for x in embedding] if embedding is not None else None,
+                "created": time.time(),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def clear(self):
+        """Drop every entry, in this process and (from the next flush) in the others sharing the file."""
+        with self._lock:
+            self._entries.clear()
+            self._cleared_at = time.time()
+            self._dirty = True
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "flushes": self.flushes,
+            "dirty": self._dirty,
+        }
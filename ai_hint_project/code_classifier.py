@@ -0,0 +1,128 @@
+import re
+from collections import Counter
+
+# 🔧 Defaults
+MAX_SCAN_CHARS = 4096   # only the head of a large paste is scanned
+CODE_THRESHOLD = 3      # evidence score from which an input counts as code
+MAX_QUERY_TERMS = 12    # identifiers added to the retrieval query of a code input
+MAX_QUERY_PROSE = 400   # characters of the user's own words kept in that query
+
+# One alternation, compiled once and run in a single finditer pass. Every
+# repetition is bounded or stops at a newline, so a match attempt costs at
+# most one line and the whole scan is linear in the (capped) input length.
+# name: (pattern, language the evidence points to, weight)
+FEATURES = {
+    "fence": (r"^```[ \t]*\w*", None, 0),
+    "java_import": (r"^[ \t]*import[ \t]+(?:static[ \t]+)?[\w.]+(?:\.\*)?[ \t]*;", "java", 3),
+    "java_member": (r"\b(?:public|private|protected)[ \t]+(?:(?:static|final|abstract)[ \t]+){0,3}"
+                    r"(?:class|interface|enum|record|void|int|long|double|boolean|char|[A-Z]\w*)\b", "java", 3),
+    "java_api": (r"\b(?:System\.(?:out|err)\.print|new[ \t]+[A-Z]\w*[ \t]*[(<\[]|throws[ \t]+[A-Z])|"
+                 r"@(?:Override|FunctionalInterface|Deprecated|SuppressWarnings|Test)\b", "java", 3),
+    "java_decl": (r"\b(?:int|long|double|float|boolean|char|byte|short|String|var)(?:\[\])?[ \t]+\w+[ \t]*[=;,)]",
+                  "java", 2),
+    "java_generic": (r"\b[A-Z]\w*<[\w ,?<>\[\]]{1,60}>", "java", 2),
+    "java_statement": (r";[ \t]*(?://[^\n]*)?$", "java", 1),
+    "java_lambda": (r"->", "java", 1),
+    "py_def": (r"^[ \t]*(?:async[ \t]+)?(?:def[ \t]+\w+[ \t]*\(|class[ \t]+\w+[ \t]*[(:])", "python", 3),
+    "py_import": (r"^[ \t]*(?:from[ \t]+[\w.]+[ \t]+import\b|import[ \t]+[\w.]+(?:[ \t]+as[ \t]+\w+)?[ \t]*$)",
+                  "python", 2),
+    "py_block": (r"^[ \t]*(?:if|elif|else|for|while|try|except|finally|with)\b[^\n]{0,200}:[ \t]*$", "python", 2),
+    "py_token": (r"\b(?:self\.\w|(?:None|True|False)\b|print\(|lambda\b[^\n:]{0,40}:|f\")", "python", 1),
+    "block": (r"[{}][ \t]*$", "code", 1),
+    "call": (r"(?<=\w)\([^()\n]{0,80}\)", "code", 1),
+    "assignment": (r"^[ \t]*[\w.\[\]]{1,60}[ \t]*[-+*/]?=[ \t]*[^=\s]", "code", 1),
+    "comment": (r"^[ \t]*(?://|/\*)", "code", 1),
+}
+FEATURE_RE = re.compile("|".join(f"(?P<{name}>{pattern})" for name, (pattern, _, _) in FEATURES.items()),
+                        re.MULTILINE)
+FENCE_LANGUAGES = {"java": "java", "python": "python", "py": "python"}
+
+IDENTIFIER_RE = re.compile(r"\b[A-Z][a-z0-9]+(?:[A-Z][a-z0-9]*)+\b|\b[A-Z][a-z]{2,}\b|\.([a-z]\w{2,})\(")
+COMMON_IDENTIFIERS = frozenset("String Integer Object System Override Exception Main Test None True False Self".split())
+FENCED_BLOCK_RE = re.compile(r"^```[^\n]*\n.*?^```", re.MULTILINE | re.DOTALL)
+
+
+class CodeClassification:
+    def __init__(self, language, evidence, scanned):
+        self.language = language  # "java", "python", "code" (language unclear) or "prose"
+        self.evidence = evidence  # {"java", "python", "code": scores, "fence": language or None, "fenced": bool}
+        self.scanned = scanned    # characters looked at
+
+    @property
+    def is_code(self):
+        return self.language != "prose"
+
+    def summary(self):
+        e = self.evidence
+        return (f"{self.language} (java {e['java']}, python {e['python']}, generic {e['code']}"
+                f"{', fenced ' + (e['fence'] or 'code') if e['fenced'] else ''}; {self.scanned} chars scanned)")
+
+
+def classify(text, max_chars=MAX_SCAN_CHARS):
+    """Whether text is code and in which language, from one pass over its first max_chars.
+
+    Each feature match adds its weight to the language it points at; generic
+    code features (calls, braces, assignments) only count towards "is code".
+    A ```java / ```python fence decides the language outright.
+    """
+    sample = text[:max_chars]
+    scores = {"java": 0, "python": 0, "code": 0}
+    fence, fenced = None, False
+    for match in FEATURE_RE.finditer(sample):
+        name = match.lastgroup
+        if name == "fence":
+            fenced = True
+            fence = fence or FENCE_LANGUAGES.get(match.group().strip("`\t ").lower())
+            continue
+        _, language, weight = FEATURES[name]
+        scores[language] += weight
+
+    evidence = dict(scores, fence=fence, fenced=fenced)
+    total = scores["java"] + scores["python"] + scores["code"]
+    if fence:
+        language = fence
+    elif not fenced and total < CODE_THRESHOLD:
+        language = "prose"
+    elif max(scores["java"], scores["python"]) >= 2 and scores["java"] != scores["python"]:
+        language = "java" if scores["java"] > scores["python"] else "python"
+    else:
+        language = "code"
+    return CodeClassification(language, evidence, len(sample))
+
+
+def is_code_input(text):
+    return classify(text).is_code
+
+
+def code_identifiers(text, limit=MAX_QUERY_TERMS, max_chars=MAX_SCAN_CHARS):
+    """Most frequent type names and called methods in a paste, e.g. ["ConcurrentHashMap", "computeIfAbsent"]."""
+    counts = Counter()
+    for match in IDENTIFIER_RE.finditer(text[:max_chars]):
+        name = match.group(1) or match.group()
+        if name not in COMMON_IDENTIFIERS:
+            counts[name] += 1
+    return [name for name, _ in counts.most_common(limit)]
+
+
+def retrieval_query(text, classification=None):
+    """What to search the knowledge base with for this input.
+
+    Prose is searched as is. For code, the embedding would only see the
+    first couple of hundred tokens of the paste, so the query is the user's
+    own sentences (outside fences, lines that don't look like code) followed
+    by the identifiers the code uses most.
+    """
+    classification = classification or classify(text)
+    if not classification.is_code:
+        return text
+    sample = text[:MAX_SCAN_CHARS]
+    code = FENCED_BLOCK_RE.findall(sample) if classification.evidence["fenced"] else []
+    prose = []
+    for line in FENCED_BLOCK_RE.sub("\n", sample).splitlines():
+        if len(line.split()) >= 3 and line.lstrip()[:1].isalpha() and not FEATURE_RE.search(line):
+            prose.append(line.strip())
+        else:
+            code.append(line)
+    query = " ".join(prose)[:MAX_QUERY_PROSE]
+    identifiers = " ".join(code_identifiers("\n".join(code)))
+    return " ".join(part for part in (query, identifiers) if part) or text[:MAX_QUERY_PROSE]
@@ -0,0 +1,97 @@
+import os
+import threading
+import yaml
+
+# 🔧 Config directory (agents.yaml, tasks.yaml)
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config")
+
+
+class ConfigRegistry:
+    """Parses YAML config files once and re-parses only when a file's mtime/size changes."""
+
+    def __init__(self, config_dir=CONFIG_DIR):
+        self.config_dir = config_dir
+        self._lock = threading.Lock()
+        self._cache = {}  # name -> (signature, parsed)
+        self.loads = 0
+
+    def _signature(self, path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, name):
+        """Parsed config/<name>.yaml (shared, treat as read-only)."""
+        path = os.path.join(self.config_dir, f"{name}.yaml")
+        signature = self._signature(path)
+        cached = self._cache.get(name)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        with self._lock:
+            cached = self._cache.get(name)
+            if cached is None or cached[0] != signature:
+                with open(path, "r") as f:
+                    cached = (signature, yaml.safe_load(f))
+                self._cache[name] = cached
+                self.loads += 1
+                print(f"📦 Loaded config/{name}.yaml")
+        return cached[1]
+
+    def version(self, name):
+        """Changes whenever the file is reloaded; used to invalidate derived objects."""
+        self.get(name)
+        return self._cache[name][0]
+
+
+class AgentFactory:
+    """Builds each persona's CrewAI Agent once and reuses it.
+
+    Agents are cached per thread (a Crew mutates the agents it runs, so one
+    instance must not be shared by concurrent requests), per LLM client and
+    per agents.yaml version.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self._local = threading.local()
+        self.built = 0
+
+    def get_agent(self, persona, llm):
+        agents_config = self.registry.get("agents")
+        agent_cfg = agents_config['agents'].get(persona)
+        if not agent_cfg:
+            raise ValueError(f"Unknown persona: {persona}")
+
+        cache = getattr(self._local, "agents", None)
+        if cache is None:
+            cache = self._local.agents = {}
+        key = (persona, id(llm), self.registry.version("agents"))
+        agent = cache.get(key)
+        if agent is None:
+            # Drop stale entries for this persona (old config version or LLM client)
+            for old_key in [k for k in cache if k[0] == persona]:
+                del cache[old_key]
+            from crewai import Agent  # imported lazily so app.py can read configs without crewai
+            agent = Agent(
+                role=agent_cfg["role"],
+                goal=agent_cfg["goal"],
+                backstory=agent_cfg["backstory"],
+                level=agent_cfg.get("level", "beginner"),
+                verbose=False,
+                llm=llm
+            )
+            cache[key] = agent
+            self.built += 1
+        return agent
+
+
+_registry = ConfigRegistry()
+_agent_factory = AgentFactory(_registry)
+
+
+def get_config(name):
+    """Process-wide cached config/<name>.yaml."""
+    return _registry.get(name)
+
+
+def get_agent_factory():
+    return _agent_factory
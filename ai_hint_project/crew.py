@@ -1,13 +1,22 @@
 import os
 import sys
 import re
-import yaml
+import time
+import threading
 import streamlit as st
-from crewai import Crew, Agent, Task
-from ai_hint_project.tools.rag_tool import build_rag_tool
-from langchain_openai import ChatOpenAI
-from langchain_huggingface import HuggingFaceEndpoint
-import requests
+from crewai import Crew, Task
+from ai_hint_project.tools.rag_registry import get_rag_tool
+from ai_hint_project.tools.metadata_filter import retrieval_tags
+from ai_hint_project.tools.context_assembly import ContextAssembler, DEFAULT_BUDGET
+from ai_hint_project.code_classifier import classify, retrieval_query
+from ai_hint_project.llm_pool import get_llm_pool
+from ai_hint_project.answer_cache import AnswerCache, DEFAULT_SIMILARITY_THRESHOLD, normalize_question
+from ai_hint_project.single_flight import SingleFlight
+from ai_hint_project.streaming import ThinkTagFilter, StreamMetrics
+from ai_hint_project.config_registry import get_config, get_agent_factory
+from ai_hint_project.crew_executor import (
+    CrewExecutor, DEFAULT_WORKERS, DEFAULT_QUEUE_SIZE, DEFAULT_PER_USER, DEFAULT_TIMEOUT_SECONDS
+)
 from . import levels
 
 print("✅ crew.py loaded")
@@ -16,52 +25,30 @@ print("✅ crew.py loaded")
 base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, base_dir)
 
-# Retrieve the Hugging Face Access Token from Streamlit secrets
-HF_ACCESS_TOKEN = st.secrets["HUGGINGFACE_ACCESS_TOKEN"]
+# LLM clients are pooled per process (see llm_pool.py)
+llm_pool = get_llm_pool()
 
+# Concurrent identical questions are coalesced (see single_flight.py)
+single_flight = SingleFlight()
 
-def get_llm():
-    """Create a proper LangChain LLM instance for CrewAI"""
-    try:
-        print("🔌 Creating Hugging Face LLM...")
-
-        # Use HuggingFaceEndpoint for proper LangChain integration
-        llm = HuggingFaceEndpoint(
-            repo_id="gpt2",  # or "mistralai/Mistral-7B-v0.1" for better results
-            huggingfacehub_api_token=HF_ACCESS_TOKEN,
-            max_length=512,
-            temperature=0.7,
-        )
-
-        print("✅ Hugging Face LLM successfully created!")
-        return llm
-
-    except Exception as e:
-        print(f"⚠️⚠️ Exception occurred: {e}")
-        print("⚠️⚠️ Falling back to ChatOpenAI")
-
-        # Fallback to OpenAI if you have that key
-        if "OPENAI_API_KEY" in st.secrets:
-            return ChatOpenAI(
-                model="gpt-3.5-turbo",
-                api_key=st.secrets["OPENAI_API_KEY"],
-                temperature=0.7
-            )
+# Retrieved chunks are deduplicated, merged and fit to a token budget (see context_assembly.py)
+context_assembler = ContextAssembler()
 
-        # Last resort: fake LLM for testing
-        from langchain_community.llms.fake import FakeListLLM
-        return FakeListLLM(responses=["This is a test response. AI is not properly configured."])
+# Parsed YAML configs and per-persona Agents are reused across requests (see config_registry.py)
+agent_factory = get_agent_factory()
 
+# Generated answers are cached on disk across restarts (see answer_cache.py)
+answer_cache = AnswerCache(
+    os.path.join(base_dir, "answer_cache.json"),
+    similarity_threshold=float(st.secrets.get("ANSWER_CACHE_THRESHOLD", DEFAULT_SIMILARITY_THRESHOLD))
+)
 
-# Rest of your code stays the same...
-# (persona_reactions, is_code_input, load_yaml, etc.)
 
-# ✅ Build RAG tool
-rag_folder = os.path.join(base_dir, "baeldung_scraper")
-rag_tool, _ = build_rag_tool(
-    index_path=os.path.join(rag_folder, "baeldung_scraper"),
-    chunks_path=os.path.join(rag_folder, "chunks.json")
-)
+def get_llm():
+    """Return the pooled LangChain LLM for the currently healthy backend"""
+    _, llm = llm_pool.acquire()
+    return llm
+
 
 # 🎭 Persona reactions
 persona_reactions = {
@@ -78,65 +65,207 @@ persona_reactions = {
 }
 
 
-# 🧠 Detect code input
-def is_code_input(text):
-    code_patterns = [
-        r"\bdef\b", r"\bclass\b", r"\bimport\b", r"\breturn\b",
-        r"\bif\b\s*\(?.*?\)?\s*:", r"\bfor\b\s*\(?.*?\)?\s*:", r"\bwhile\b\s*\(?.*?\)?\s*:",
-        r"\btry\b\s*:", r"\bexcept\b\s*:", r"\w+\s*=\s*.+", r"\w+\(.*?\)", r"{.*?}", r"<.*?>"
-    ]
-    return any(re.search(pattern, text) for pattern in code_patterns)
+# 🧠 What the agent is told about pasted code (see code_classifier.py)
+language_notes = {
+    "java": "The user pasted Java code.",
+    "python": "The user pasted Python code. The reference material covers Java, "
+              "so relate it to the Java equivalent where that helps.",
+    "code": "The user pasted code.",
+}
 
 
-# 📦 Load YAML
-def load_yaml(path):
-    with open(path, 'r') as f:
-        return yaml.safe_load(f)
+# 🧩 Shared request preparation
+def _context_budget():
+    """Context token budget for the LLM backend that will answer (config/context.yaml)."""
+    config = get_config('context')['context']
+    return config.get('budgets', {}).get(llm_pool.active_name(), config.get('default_budget', DEFAULT_BUDGET))
 
 
-# 🚀 Crew creation
-def create_crew(persona: str, user_question: str):
-    print(f"✅ create_crew() called with persona: {persona}")
+def _prepare_request(persona, user_question):
+    """Load configs, retrieve context and check the answer cache.
 
-    base_dir = os.path.dirname(__file__)
-    agents_config = load_yaml(os.path.join(base_dir, 'config/agents.yaml'))
-    tasks_config = load_yaml(os.path.join(base_dir, 'config/tasks.yaml'))
+    Returns a dict with everything create_crew/stream_crew need; "cached" holds
+    the cached answer (or None).
+    """
+    agents_config = get_config('agents')
+    tasks_config = get_config('tasks')
 
     agent_cfg = agents_config['agents'].get(persona)
     if not agent_cfg:
         raise ValueError(f"Unknown persona: {persona}")
 
-    # Get the LLM instance (now properly created)
-    llm = get_llm()
-    print("✅ LLM type:", type(llm))
-
-    agent = Agent(
-        role=agent_cfg["role"],
-        goal=agent_cfg["goal"],
-        backstory=agent_cfg["backstory"],
-        level=agent_cfg.get("level", "beginner"),
-        verbose=False,
-        llm=llm
-    )
+    # Pasted code is searched by the user's own words plus the identifiers it uses
+    # rather than by its first few hundred tokens
+    kind = classify(user_question)
+    query = retrieval_query(user_question, kind)
+    print(f"🧠 Input: {kind.summary()}")
+
+    # RAG tool is loaded once per process and shared across sessions;
+    # questions on one of the persona's topics only search chunks tagged with it,
+    # other detected topics are ranked higher
+    rag_tool = get_rag_tool()
+    tags, boost_tags = retrieval_tags(agent_cfg, query)
+    hits = rag_tool.search_many([query], tags=tags, boost_tags=boost_tags)[0]
+    assembled = context_assembler.assemble(hits, budget=_context_budget())
+    context = assembled.text
+    print(f"🧩 Context: {assembled.summary()}")
+
+    # Serve repeated / near-identical questions from the answer cache
+    # (the query vector comes from the RAG tool's embedding cache, so for prose it isn't recomputed)
+    question_vector = rag_tool.embed_query(user_question)
+    cached = answer_cache.get(persona, user_question, context, embedding=question_vector)
 
     reaction = persona_reactions.get(persona, "No reaction available.")
-    task_description = f"{reaction}\n\n{user_question}" if is_code_input(user_question) else user_question
+    task_description = user_question
+    if kind.is_code:
+        task_description = f"{reaction} {language_notes[kind.language]}\n\n{user_question}"
+
+    return {
+        "agent_cfg": agent_cfg,
+        "task_template": tasks_config['tasks']['explainer'],
+        "query": f"{task_description}\n\nRelevant context:\n{context}",
+        "context": context,
+        "context_stats": assembled.stats,
+        "language": kind.language,
+        "question_vector": question_vector,
+        "cached": cached,
+    }
+
+
+# 🚀 Crew creation
+def _flight_key(persona, user_question):
+    return persona, normalize_question(user_question)
+
+
+def create_crew(persona: str, user_question: str):
+    print(f"✅ create_crew() called with persona: {persona}")
+
+    # Identical questions already in flight share one retrieval + generation
+    result = single_flight.do(("crew",) + _flight_key(persona, user_question),
+                              lambda: _run_crew(persona, user_question))
+    levels.update_level(persona)
+    return result
 
-    context = rag_tool(user_question)
 
-    task_template = tasks_config['tasks']['explainer']
+def _run_crew(persona, user_question):
+    request = _prepare_request(persona, user_question)
+    if request["cached"] is not None:
+        print(f"⚡ Answer cache hit ({answer_cache.stats()})")
+        return request["cached"]
+
+    # Reuse the pooled LLM client instead of building one per question
+    backend_name, llm = llm_pool.acquire()
+    print(f"✅ LLM backend: {backend_name} ({type(llm).__name__})")
+
+    setup_started = time.perf_counter()
+    agent = agent_factory.get_agent(persona, llm)
+
+    task_template = request["task_template"]
     task = Task(
         name=task_template['name'],
-        description=task_template['description'].format(query=f"{task_description}\n\nRelevant context:\n{context}"),
+        description=task_template['description'].format(query=request["query"]),
         expected_output=task_template['expected_output'],
         agent=agent
     )
 
     crew = Crew(agents=[agent], tasks=[task], verbose=True)
-    result = crew.kickoff()
+    print(f"⏱️ Crew setup: {(time.perf_counter() - setup_started) * 1000:.1f} ms")
+    started = time.perf_counter()
+    try:
+        result = crew.kickoff()
+    except Exception:
+        llm_pool.record(backend_name, time.perf_counter() - started, ok=False)
+        raise
+    llm_pool.record(backend_name, time.perf_counter() - started, ok=True)
+
+    cleaned_content = re.sub(r"<think>.*?</think>\n?", "", result.tasks_output[0].raw, flags=re.DOTALL)
+
+    answer_cache.put(persona, user_question, request["context"], cleaned_content,
+                     embedding=request["question_vector"])
+    return cleaned_content
+
+
+# 🌊 Streaming variant
+def _build_stream_prompt(agent_cfg, task_template, query):
+    """Single-agent prompt equivalent to what the crew sends for the explainer task."""
+    return (
+        f"You are {agent_cfg['role']}. {agent_cfg['backstory']}\n"
+        f"Your personal goal is: {agent_cfg['goal']}\n\n"
+        f"Current Task: {task_template['description'].format(query=query)}\n\n"
+        f"This is the expected criteria for your final answer: {task_template['expected_output']}"
+    )
+
+
+def stream_crew(persona: str, user_question: str):
+    """Generator variant of create_crew that yields answer text as tokens arrive.
 
+    <think> blocks are stripped incrementally, time-to-first-token is recorded
+    (see streaming.stream_summary) and the full answer is cached at the end.
+    """
+    print(f"✅ stream_crew() called with persona: {persona}")
+
+    # Followers of an identical in-flight question receive the leader's chunks
+    yield from single_flight.stream(("stream",) + _flight_key(persona, user_question),
+                                    lambda: _stream_answer(persona, user_question))
     levels.update_level(persona)
 
-    cleaned_content = re.sub(r"<think>.*?</think>\n?", "", result.tasks_output[0].raw, flags=re.DOTALL)
 
-    return cleaned_content
\ No newline at end of file
+def _stream_answer(persona, user_question):
+    metrics = StreamMetrics(label=persona)
+
+    request = _prepare_request(persona, user_question)
+    if request["cached"] is not None:
+        print(f"⚡ Answer cache hit ({answer_cache.stats()})")
+        metrics.mark(request["cached"])
+        metrics.finish()
+        yield request["cached"]
+        return
+
+    backend_name, llm = llm_pool.acquire()
+    prompt = _build_stream_prompt(request["agent_cfg"], request["task_template"], request["query"])
+
+    think_filter = ThinkTagFilter()
+    parts = []
+    started = time.perf_counter()
+    try:
+        for chunk in llm.stream(prompt):
+            # Chat models yield message chunks, completion models yield strings
+            visible = think_filter.feed(getattr(chunk, "content", chunk) or "")
+            if visible:
+                metrics.mark(visible)
+                parts.append(visible)
+                yield visible
+        tail = think_filter.flush()
+        if tail:
+            metrics.mark(tail)
+            parts.append(tail)
+            yield tail
+    except Exception:
+        llm_pool.record(backend_name, time.perf_counter() - started, ok=False)
+        raise
+    llm_pool.record(backend_name, time.perf_counter() - started, ok=True)
+    metrics.finish()
+    print(f"⏱️ Stream finished: ttft={metrics.ttft}s total={metrics.total:.2f}s")
+
+    answer_cache.put(persona, user_question, request["context"], "".join(parts),
+                     embedding=request["question_vector"])
+
+
+# 🧵 Background execution
+_crew_executor = None
+_crew_executor_lock = threading.Lock()
+
+
+def get_crew_executor():
+    """Process-wide bounded pool that runs stream_crew jobs off the Streamlit script thread"""
+    global _crew_executor
+    with _crew_executor_lock:
+        if _crew_executor is None:
+            _crew_executor = CrewExecutor(
+                stream_crew,
+                workers=int(st.secrets.get("CREW_WORKERS", DEFAULT_WORKERS)),
+                queue_size=int(st.secrets.get("CREW_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)),
+                per_user=int(st.secrets.get("CREW_PER_USER", DEFAULT_PER_USER)),
+                timeout=float(st.secrets.get("CREW_TIMEOUT_SECONDS", DEFAULT_TIMEOUT_SECONDS)),
+            )
+    return _crew_executor
@@ -0,0 +1,210 @@
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Defaults (overridable from st.secrets, see crew.get_crew_executor)
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_PER_USER = 1
+DEFAULT_TIMEOUT_SECONDS = 120
+FINISHED_JOB_TTL = 600  # keep finished jobs around this long for late polls
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED, TIMED_OUT = "queued", "running", "done", "failed", "cancelled", "timeout"
+FINISHED = (DONE, FAILED, CANCELLED, TIMED_OUT)
+
+
+class ExecutorBusyError(RuntimeError):
+    """The job was rejected (queue full or the user already has too many jobs in flight)."""
+
+
+class CrewJob:
+    """One crew request. Partial output is appended as the runner yields it."""
+
+    def __init__(self, owner, persona, question):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.persona = persona
+        self.question = question
+        self.status = QUEUED
+        self.parts = []
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.occupied = False  # a worker thread is still inside _run (even after a timeout)
+        self.cancel_event = threading.Event()
+
+    @property
+    def partial(self):
+        return "".join(self.parts)
+
+    def snapshot(self, position=None):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "partial": self.partial,
+            "result": self.result,
+            "error": self.error,
+            "position": position,
+            "waited": round((self.started_at or time.time()) - self.submitted_at, 2),
+        }
+
+
+class CrewExecutor:
+    """Bounded worker pool for crew requests.
+
+    Jobs run on at most `workers` threads; at most `queue_size` more wait in
+    line and each owner (session) may have `per_user` jobs queued or running.
+    Anything beyond that is rejected with ExecutorBusyError so callers see
+    back-pressure instead of piling up outbound LLM calls.
+
+    `runner(persona, question)` is a generator of text chunks (stream_crew).
+    Cancellation and timeouts are checked between chunks; a job whose runner
+    is stuck in a blocking call is reported as timed out by poll() and its
+    late output is discarded. Its worker thread still counts as busy (stats'
+    "running", the owner's per_user limit) until the runner actually returns.
+    """
+
+    def __init__(self, runner, workers=DEFAULT_WORKERS, queue_size=DEFAULT_QUEUE_SIZE,
+                 per_user=DEFAULT_PER_USER, timeout=DEFAULT_TIMEOUT_SECONDS):
+        self.runner = runner
+        self.workers = workers
+        self.queue_size = queue_size
+        self.per_user = per_user
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crew-worker")
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()  # id -> CrewJob, in submission order
+        self._counters = {"submitted": 0, "rejected": 0, DONE: 0, FAILED: 0, CANCELLED: 0, TIMED_OUT: 0}
+        self._started = 0
+        self._wait_total = 0.0
+        self._run_total = 0.0
+
+    def _active(self):
+        return [job for job in self._jobs.values() if job.status in (QUEUED, RUNNING)]
+
+    def _occupied(self):
+        """Jobs holding a worker thread, including timed-out ones whose runner hasn't returned yet."""
+        return [job for job in self._jobs.values() if job.occupied]
+
+    def _expire(self, now):
+        for job_id in [j.id for j in self._jobs.values()
+                       if j.status in FINISHED and not j.occupied and now - j.finished_at > FINISHED_JOB_TTL]:
+            del self._jobs[job_id]
+
+    def submit(self, owner, persona, question):
+        """Queue a job and return its id, or raise ExecutorBusyError."""
+        with self._lock:
+            self._expire(time.time())
+            active = self._active()
+            queued = sum(1 for job in active if job.status == QUEUED)
+            # a timed-out job still holding a worker keeps counting against its owner
+            held = {job.id: job for job in active + self._occupied()}.values()
+            if sum(1 for job in held if job.owner == owner) >= self.per_user:
+                self._counters["rejected"] += 1
+                raise ExecutorBusyError("You already have a question in progress, please wait for it to finish.")
+            if queued >= self.queue_size:
+                self._counters["rejected"] += 1
+                raise ExecutorBusyError("The tutors are busy right now, please try again in a moment.")
+            job = CrewJob(owner, persona, question)
+            self._jobs[job.id] = job
+            self._counters["submitted"] += 1
+        self._pool.submit(self._run, job)
+        return job.id
+
+    def _finish_locked(self, job, status, result=None, error=None):
+        """Record the outcome once (the caller holds self._lock); False if the job had already finished."""
+        if job.status in FINISHED:
+            return False  # already timed out / cancelled by poll() or cancel()
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        self._counters[status] += 1
+        if job.started_at:
+            self._run_total += job.finished_at - job.started_at
+        return True
+
+    def _finish(self, job, status, result=None, error=None):
+        with self._lock:
+            return self._finish_locked(job, status, result, error)
+
+    def _run(self, job):
+        with self._lock:
+            if job.status != QUEUED:
+                return  # cancelled while waiting
+            job.status = RUNNING
+            job.started_at = time.time()
+            job.occupied = True
+            self._started += 1
+            self._wait_total += job.started_at - job.submitted_at
+        try:
+            self._drive(job)
+        finally:
+            with self._lock:
+                job.occupied = False
+
+    def _drive(self, job):
+        deadline = job.started_at + self.timeout
+        chunks = self.runner(job.persona, job.question)
+        try:
+            for chunk in chunks:
+                if job.cancel_event.is_set():
+                    self._finish(job, CANCELLED)
+                    return
+                if time.time() > deadline:
+                    self._finish(job, TIMED_OUT, error=f"Timed out after {self.timeout}s")
+                    return
+                job.parts.append(chunk)
+        except Exception as e:
+            print(f"❌ Crew job {job.id} failed: {e}")
+            self._finish(job, FAILED, error=str(e))
+            return
+        finally:
+            chunks.close()  # stops the LLM stream early on cancel/timeout
+        self._finish(job, DONE, result=job.partial)
+
+    def poll(self, job_id):
+        """Snapshot of a job (status, partial text, result/error, queue position) or None."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            position = None
+            if job.status == QUEUED:
+                position = sum(1 for j in self._active() if j.status == QUEUED and j.submitted_at <= job.submitted_at)
+            if job.status == RUNNING and time.time() > job.started_at + self.timeout:
+                job.cancel_event.set()
+                self._finish_locked(job, TIMED_OUT, error=f"Timed out after {self.timeout}s")
+            return job.snapshot(position)
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED:
+                return False
+            job.cancel_event.set()
+            return self._finish_locked(job, CANCELLED)
+
+    def stats(self):
+        with self._lock:
+            active = self._active()
+            finished = sum(self._counters[s] for s in FINISHED)
+            return dict(
+                self._counters,
+                workers=self.workers,
+                queue_size=self.queue_size,
+                running=len(self._occupied()),
+                stuck=sum(1 for job in self._occupied() if job.status in FINISHED),
+                queued=sum(1 for job in active if job.status == QUEUED),
+                avg_wait=round(self._wait_total / self._started, 3) if self._started else None,
+                avg_run=round(self._run_total / finished, 3) if finished else None,
+            )
+
+    def shutdown(self):
+        for job in self._active():
+            job.cancel_event.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -1,10 +1,14 @@
 import json
 import os
+import threading
 
 # Base directory and path to the levels file
 base_dir = os.path.dirname(__file__)
 path = os.path.join(base_dir, 'config/agent_levels.json')
 
+# Crew jobs run on worker threads; serialize the read-modify-write below
+_update_lock = threading.Lock()
+
 
 def load_levels():
     """Loads the levels from the JSON file."""
@@ -26,6 +30,11 @@ def save_levels(data):
 
 def update_level(agent_name):
     """Updates the agent's level based on tasks completed."""
+    with _update_lock:
+        _update_level(agent_name)
+
+
+def _update_level(agent_name):
     # Load the levels at the start of the function
     levels = load_levels()
 
@@ -0,0 +1,169 @@
+import threading
+import time
+
+import httpx
+import streamlit as st
+from langchain_openai import ChatOpenAI
+from langchain_huggingface import HuggingFaceEndpoint
+
+# Circuit breaker / re-probe tuning
+FAILURE_THRESHOLD = 3        # consecutive failures before a backend is skipped
+COOLDOWN_SECONDS = 60        # how long an open breaker stays open
+REPROBE_SECONDS = 300        # how often to retry a preferred backend while on a fallback
+
+# Shared keep-alive HTTP client so OpenAI calls reuse TLS connections
+_http_client = httpx.Client(
+    limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=120),
+    timeout=httpx.Timeout(60.0, connect=10.0),
+)
+
+
+def _build_huggingface():
+    return HuggingFaceEndpoint(
+        repo_id="gpt2",  # or "mistralai/Mistral-7B-v0.1" for better results
+        huggingfacehub_api_token=st.secrets["HUGGINGFACE_ACCESS_TOKEN"],
+        max_length=512,
+        temperature=0.7,
+    )
+
+
+def _build_openai():
+    if "OPENAI_API_KEY" not in st.secrets:
+        raise RuntimeError("OPENAI_API_KEY not configured")
+    return ChatOpenAI(
+        model="gpt-3.5-turbo",
+        api_key=st.secrets["OPENAI_API_KEY"],
+        temperature=0.7,
+        http_client=_http_client,
+    )
+
+
+def _build_fake():
+    # Last resort: fake LLM for testing
+    from langchain_community.llms.fake import FakeListLLM
+    return FakeListLLM(responses=["This is a test response. AI is not properly configured."])
+
+
+class LLMBackend:
+    """One LLM provider: a cached client, a circuit breaker and latency stats."""
+
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+        self.llm = None
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.total_latency = 0.0
+        self.last_latency = None
+
+    def is_open(self, now):
+        return now < self.open_until
+
+    def get_client(self):
+        if self.llm is None:
+            self.llm = self.factory()
+        return self.llm
+
+    def record(self, latency, ok):
+        self.calls += 1
+        self.total_latency += latency
+        self.last_latency = latency
+        if ok:
+            self.consecutive_failures = 0
+            return
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= FAILURE_THRESHOLD:
+            self.open_until = time.time() + COOLDOWN_SECONDS
+            self.llm = None  # rebuild the client when the breaker closes
+            print(f"⚠️ Circuit open for {self.name} ({self.consecutive_failures} failures)")
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "avg_latency": self.total_latency / self.calls if self.calls else None,
+            "last_latency": self.last_latency,
+            "circuit_open": self.is_open(time.time()),
+        }
+
+
+class LLMPool:
+    """Hands out long-lived LLM clients and remembers which backend is healthy.
+
+    Backends are tried in preference order. The chosen backend is cached so the
+    fallback probe doesn't run on every question; while serving from a fallback,
+    the preferred backends are re-probed every REPROBE_SECONDS.
+    """
+
+    def __init__(self, backends):
+        self.backends = backends
+        self._lock = threading.Lock()
+        self._active = None
+        self._last_probe = 0.0
+
+    def _select(self, now):
+        for backend in self.backends:
+            if backend.is_open(now):
+                continue
+            try:
+                backend.get_client()
+            except Exception as e:
+                print(f"⚠️⚠️ Could not create {backend.name} LLM: {e}")
+                backend.record(0.0, ok=False)
+                continue
+            if backend is not self._active:
+                print(f"✅ Using {backend.name} LLM")
+            return backend
+        raise RuntimeError("No LLM backend available")
+
+    def acquire(self):
+        """Return (backend_name, llm) for the currently healthy backend."""
+        now = time.time()
+        with self._lock:
+            active = self._active
+            needs_probe = (
+                active is None
+                or active.is_open(now)
+                or (active is not self.backends[0] and now - self._last_probe > REPROBE_SECONDS)
+            )
+            if needs_probe:
+                self._active = self._select(now)
+                self._last_probe = now
+            return self._active.name, self._active.get_client()
+
+    def active_name(self):
+        """Backend acquire() will most likely return, without probing (for sizing prompts)."""
+        with self._lock:
+            return (self._active or self.backends[0]).name
+
+    def record(self, backend_name, latency, ok=True):
+        """Report the outcome of a call so latency and breaker state stay current."""
+        with self._lock:
+            for backend in self.backends:
+                if backend.name == backend_name:
+                    backend.record(latency, ok)
+                    if not ok and backend is self._active and backend.is_open(time.time()):
+                        self._active = None
+                    return
+
+    def stats(self):
+        with self._lock:
+            return {
+                "active": self._active.name if self._active else None,
+                "backends": {b.name: b.stats() for b in self.backends},
+            }
+
+
+_pool = LLMPool([
+    LLMBackend("huggingface", _build_huggingface),
+    LLMBackend("openai", _build_openai),
+    LLMBackend("fake", _build_fake),
+])
+
+
+def get_llm_pool():
+    """Process-wide LLM pool shared by every session."""
+    return _pool
@@ -1,7 +1,31 @@
-import time
+"""
+Scrape Baeldung articles into baeldung_articles/*.txt.
+
+Each URL is first fetched over plain HTTP and extracted with newspaper3k; only
+pages where that yields no real article (JS-rendered or bot-check pages) go
+through headless Chrome. Browsers come from a small reusable pool and wait for
+the article to be ready instead of sleeping a fixed time. Pages are scraped in
+parallel and throughput is reported as pages/min.
+
+Offline run against the fixture pages:
+
+    python -m http.server 8766 -d ai_hint_project/scrapers/fixtures/baeldung
+    python ai_hint_project/scrapers/baeldung_scraper.py \\
+        http://127.0.0.1:8766/static-article.html http://127.0.0.1:8766/js-article.html
+"""
 import os
+import time
+import queue
+import argparse
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from newspaper import Article
 
 # List of Baeldung article URLs to scrape
@@ -13,20 +37,136 @@ java_sources = [
     "https://www.baeldung.com/get-started-with-java-series"
 ]
 
-# Step 1: Use Selenium to fetch full HTML
-def get_html_with_selenium(url, wait_time=5):
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+MIN_ARTICLE_CHARS = 500          # shorter extractions are treated as "needs a browser"
+ARTICLE_SELECTORS = "article, .post-content, .entry-content, main"
+BOT_CHECK_MARKERS = ("Just a moment...", "cf-browser-verification", "Enable JavaScript and cookies")
+PAGE_TIMEOUT = 20
+MAX_PAGES_PER_BROWSER = 50       # recycle long-lived browsers to cap memory growth
+
+
+# Step 1a: Plain HTTP fast path
+_http = threading.local()
+
+
+def get_html_with_http(url, timeout=PAGE_TIMEOUT):
+    session = getattr(_http, "session", None)
+    if session is None:
+        session = _http.session = requests.Session()
+        session.headers["User-Agent"] = USER_AGENT
+    resp = session.get(url, timeout=timeout)
+    resp.raise_for_status()
+    return resp.text
+
+
+# Step 1b: Pooled Selenium browsers for pages that need JavaScript
+def make_driver():
     options = Options()
     options.add_argument("--headless=new")
     options.add_argument("--disable-blink-features=AutomationControlled")
     options.add_argument("--window-size=1280,800")
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64)")
-    
+    options.add_argument(f"user-agent={USER_AGENT}")
     driver = webdriver.Chrome(options=options)
-    driver.get(url)
-    time.sleep(wait_time)
-    html = driver.page_source
-    driver.quit()
-    return html
+    driver.set_page_load_timeout(PAGE_TIMEOUT)
+    return driver
+
+
+class BrowserPool:
+    """Up to `size` headless Chrome sessions, started lazily and reused across pages."""
+
+    def __init__(self, size=2, driver_factory=make_driver, max_pages=MAX_PAGES_PER_BROWSER):
+        self.size = size
+        self.driver_factory = driver_factory
+        self.max_pages = max_pages
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = 0
+        self._uses = {}
+        self.launches = 0
+
+    @contextmanager
+    def driver(self):
+        driver = self._acquire()
+        healthy = True
+        try:
+            yield driver
+        except WebDriverException:
+            healthy = False
+            raise
+        finally:
+            self._release(driver, healthy)
+
+    def _acquire(self):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                start_new = self._started < self.size
+                if start_new:
+                    self._started += 1
+            if start_new:
+                break
+            try:
+                # Wait for a driver to come back (re-check capacity if one was quit instead)
+                return self._idle.get(timeout=0.5)
+            except queue.Empty:
+                continue
+        try:
+            driver = self.driver_factory()
+        except Exception:
+            with self._lock:
+                self._started -= 1
+            raise
+        self.launches += 1
+        self._uses[id(driver)] = 0
+        return driver
+
+    def _release(self, driver, healthy):
+        self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+        if healthy and self._uses[id(driver)] < self.max_pages:
+            self._idle.put(driver)
+            return
+        # Broken or worn out: quit it and let the next caller start a fresh one
+        self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._lock:
+            self._started -= 1
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().quit()
+            except queue.Empty:
+                break
+            except Exception:
+                pass
+
+
+def _article_ready(driver):
+    """Page finished loading and an article container has rendered some text."""
+    if driver.execute_script("return document.readyState") != "complete":
+        return False
+    return driver.execute_script(
+        "return Array.from(document.querySelectorAll(arguments[0]))"
+        ".some(el => el.innerText.trim().length > arguments[1]);",
+        ARTICLE_SELECTORS, MIN_ARTICLE_CHARS // 2
+    )
+
+
+def get_html_with_selenium(url, pool, timeout=PAGE_TIMEOUT):
+    with pool.driver() as driver:
+        driver.get(url)
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=0.2).until(_article_ready)
+        except TimeoutException:
+            print(f"⚠️ Article not detected after {timeout}s, using page as-is: {url}")
+        return driver.page_source
+
 
 # Step 2: Use newspaper3k to extract title and text
 def extract_article_from_html(url, html):
@@ -37,6 +177,12 @@ def extract_article_from_html(url, html):
     article.parse()
     return article.title, article.text
 
+
+def looks_complete(html, content):
+    """Whether a plain-HTTP extraction is a real article rather than a JS shell or bot check."""
+    return len(content or "") >= MIN_ARTICLE_CHARS and not any(marker in html for marker in BOT_CHECK_MARKERS)
+
+
 # Step 3: Save article to disk
 def save_article(title, content, folder="baeldung_articles"):
     os.makedirs(folder, exist_ok=True)
@@ -46,23 +192,62 @@ def save_article(title, content, folder="baeldung_articles"):
         f.write(content)
     print(f"📁 Saved: {filepath}")
 
-# Step 4: Loop through URLs and extract content
-def scrape_baeldung_articles(urls):
-    results = []
-    for url in urls:
+
+# Step 4: Scrape one URL (HTTP first, browser if needed)
+def scrape_article(url, pool, use_http=True):
+    if use_http:
         try:
-            html = get_html_with_selenium(url)
+            html = get_html_with_http(url)
             title, content = extract_article_from_html(url, html)
-            save_article(title, content)
-            results.append({"url": url, "title": title, "content": content})
-            print(f"✅ Scraped: {title}")
+            if looks_complete(html, content):
+                return title, content, "http"
         except Exception as e:
-            print(f"❌ Failed to scrape {url}: {e}")
+            print(f"↪️ HTTP fast path failed for {url}: {e}")
+    html = get_html_with_selenium(url, pool)
+    title, content = extract_article_from_html(url, html)
+    return title, content, "browser"
+
+
+# Step 5: Scrape URLs in parallel
+def scrape_baeldung_articles(urls, workers=4, browsers=2, use_http=True, folder="baeldung_articles"):
+    results = []
+    counts = {"http": 0, "browser": 0, "failed": 0}
+    pool = BrowserPool(size=browsers)
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(scrape_article, url, pool, use_http): url for url in urls}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    title, content, via = future.result()
+                    save_article(title, content, folder)
+                    results.append({"url": url, "title": title, "content": content, "via": via})
+                    counts[via] += 1
+                    print(f"✅ Scraped ({via}): {title}")
+                except Exception as e:
+                    counts["failed"] += 1
+                    print(f"❌ Failed to scrape {url}: {e}")
+    finally:
+        pool.close()
+    elapsed = time.perf_counter() - start
+    pages_per_min = len(results) / elapsed * 60 if elapsed else 0.0
+    print(f"⏱️ {len(results)} pages in {elapsed:.1f}s ({pages_per_min:.1f} pages/min) — "
+          f"{counts}, {pool.launches} browser launches")
     return results
 
-# Step 5: Run the scraper
+
+# Step 6: Run the scraper
 if __name__ == "__main__":
-    articles = scrape_baeldung_articles(java_sources)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("urls", nargs="*", default=java_sources)
+    parser.add_argument("--workers", type=int, default=4, help="pages scraped in parallel")
+    parser.add_argument("--browsers", type=int, default=2, help="max concurrent Chrome sessions")
+    parser.add_argument("--no-http", action="store_true", help="always render with the browser")
+    parser.add_argument("--output-dir", default="baeldung_articles")
+    args = parser.parse_args()
+
+    articles = scrape_baeldung_articles(args.urls, args.workers, args.browsers, not args.no_http, args.output_dir)
     for article in articles:
         print("\n---")
         print(f"Title: {article['title']}")
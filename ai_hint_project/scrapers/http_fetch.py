@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import random
+import asyncio
+import hashlib
+from urllib.parse import urlsplit
+
+import aiohttp
+
+DEFAULT_USER_AGENT = "ai-java-tutor-crawler/1.0"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HttpCache:
+    """On-disk cache of response bodies plus their ETag / Last-Modified validators.
+
+    One <sha1(url)>.json (metadata) and .body file per URL.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key + ".json"), os.path.join(self.cache_dir, key + ".body")
+
+    def get(self, url):
+        """(metadata, body) for a cached URL, or (None, None)."""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                return meta, f.read()
+        except (FileNotFoundError, ValueError):
+            return None, None
+
+    def put(self, url, headers, body):
+        meta_path, body_path = self._paths(url)
+        meta = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "content_type": headers.get("Content-Type"),
+            "fetched_at": time.time(),
+        }
+        for path, data, mode in ((body_path, body, "wb"), (meta_path, json.dumps(meta), "w")):
+            with open(path + ".tmp", mode) as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+
+    @staticmethod
+    def validators(meta):
+        """Conditional request headers for a cached response."""
+        headers = {}
+        if meta and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+
+class HostLimiter:
+    """Per-host concurrency cap plus a minimum interval between request starts."""
+
+    def __init__(self, concurrency=4, rate=5.0):
+        self.concurrency = concurrency
+        self.interval = 1.0 / rate if rate else 0.0
+        self._semaphores = {}
+        self._locks = {}
+        self._next_start = {}
+
+    def _for(self, host):
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.concurrency)
+            self._locks[host] = asyncio.Lock()
+            self._next_start[host] = 0.0
+        return self._semaphores[host], self._locks[host]
+
+    async def acquire(self, host):
+        semaphore, lock = self._for(host)
+        await semaphore.acquire()
+        async with lock:
+            now = time.monotonic()
+            wait = self._next_start[host] - now
+            self._next_start[host] = max(now, self._next_start[host]) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def release(self, host):
+        self._semaphores[host].release()
+
+
+class FetchResult:
+    def __init__(self, url, status, text, changed, from_cache):
+        self.url = url
+        self.status = status
+        self.text = text
+        self.changed = changed        # False when the server answered 304 Not Modified
+        self.from_cache = from_cache
+
+
+class AsyncFetcher:
+    """aiohttp client with a pooled session, per-host limits, retries with backoff and an HTTP cache.
+
+    Use as `async with AsyncFetcher(...) as fetcher: await fetcher.fetch(url)`.
+    """
+
+    def __init__(self, cache_dir, concurrency=4, rate=5.0, retries=3, backoff=0.5, timeout=20,
+                 user_agent=DEFAULT_USER_AGENT):
+        self.cache = HttpCache(cache_dir)
+        self.limiter = HostLimiter(concurrency, rate)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.user_agent = user_agent
+        self.session = None
+        self.stats = {"requests": 0, "fetched": 0, "not_modified": 0, "retries": 0, "failed": 0, "bytes": 0}
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=0, limit_per_host=self.limiter.concurrency, ttl_dns_cache=300)
+        self.session = aiohttp.ClientSession(
+            connector=connector, timeout=self.timeout, headers={"User-Agent": self.user_agent}
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    def _delay(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.backoff * (2 ** attempt) * (0.5 + random.random())
+
+    async def fetch(self, url):
+        """GET a URL, revalidating against the cache. Raises after the last failed retry."""
+        host = urlsplit(url).netloc
+        meta, cached_body = self.cache.get(url)
+        headers = HttpCache.validators(meta) if cached_body is not None else {}
+
+        for attempt in range(self.retries + 1):
+            await self.limiter.acquire(host)
+            retry_after = None
+            try:
+                self.stats["requests"] += 1
+                async with self.session.get(url, headers=headers) as resp:
+                    if resp.status == 304 and cached_body is not None:
+                        self.stats["not_modified"] += 1
+                        return FetchResult(url, 304, cached_body.decode("utf-8", "replace"), False, True)
+                    if resp.status in RETRY_STATUSES and attempt < self.retries:
+                        retry_after = resp.headers.get("Retry-After")
+                        raise aiohttp.ClientResponseError(resp.request_info, resp.history, status=resp.status)
+                    resp.raise_for_status()
+                    body = await resp.read()
+                    self.cache.put(url, resp.headers, body)
+                    self.stats["fetched"] += 1
+                    self.stats["bytes"] += len(body)
+                    return FetchResult(url, resp.status, body.decode(resp.charset or "utf-8", "replace"), True, False)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                retryable = not isinstance(e, aiohttp.ClientResponseError) or e.status in RETRY_STATUSES
+                if not retryable or attempt == self.retries:
+                    self.stats["failed"] += 1
+                    raise
+                self.stats["retries"] += 1
+                delay = self._delay(attempt, retry_after)
+            finally:
+                self.limiter.release(host)
+            await asyncio.sleep(delay)
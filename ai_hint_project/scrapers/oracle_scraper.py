@@ -1,58 +1,143 @@
+"""
+Crawl the Oracle Java tutorials (trails -> lessons) into oracle_articles/*.txt.
+
+Requests go through an aiohttp session with per-host concurrency and rate
+limits, retries with backoff and an on-disk HTTP cache (ETag/Last-Modified),
+so a re-crawl only downloads and rewrites pages that changed. Lesson URLs
+linked from several trails are fetched once.
+
+Offline run against the fixture pages:
+
+    python -m http.server 8765 -d ai_hint_project/scrapers/fixtures/oracle
+    python ai_hint_project/scrapers/oracle_scraper.py --base-url http://127.0.0.1:8765/
+"""
 import os
-import requests
+import sys
+import time
+import asyncio
+import argparse
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urldefrag
 
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BASE_DIR)
 
-print("📍 Current working directory:", os.getcwd())
+from ai_hint_project.scrapers.http_fetch import AsyncFetcher
 
 BASE_URL = "https://docs.oracle.com/javase/tutorial/"
 OUTPUT_DIR = "oracle_articles"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+CACHE_DIR = ".http_cache/oracle"
 
-def get_trail_links():
-    resp = requests.get(BASE_URL)
-    soup = BeautifulSoup(resp.text, "html.parser")
+
+def get_trail_links(html, base_url):
+    soup = BeautifulSoup(html, "html.parser")
     links = []
     for a in soup.find_all("a", href=True):
         href = a["href"]
         if href.startswith("java/") and href.endswith("index.html"):
-            full_url = urljoin(BASE_URL, href)
-            links.append(full_url)
-    return links
+            links.append(urljoin(base_url, href))
+    return list(dict.fromkeys(links))
+
 
-def get_lesson_links(trail_url):
-    resp = requests.get(trail_url)
-    soup = BeautifulSoup(resp.text, "html.parser")
+def get_lesson_links(html, trail_url):
+    soup = BeautifulSoup(html, "html.parser")
     base = trail_url.rsplit("/", 1)[0] + "/"
     lessons = []
     for a in soup.find_all("a", href=True):
-        href = a["href"]
+        href = urldefrag(a["href"])[0]
         if href.endswith(".html") and not href.startswith("http"):
             lessons.append(urljoin(base, href))
     return lessons
 
-def scrape_lesson(url):
-    try:
-        resp = requests.get(url)
-        soup = BeautifulSoup(resp.text, "html.parser")
-        title = soup.title.string.strip() if soup.title else "Untitled"
-        text = soup.get_text(separator="\n", strip=True)
-        filename = os.path.join(OUTPUT_DIR, title.replace(" ", "_")[:50] + ".txt")
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(text)
-        print(f"✅ Saved: {title}")
-    except Exception as e:
-        print(f"❌ Failed: {url} — {e}")
+
+def lesson_filename(output_dir, title):
+    return os.path.join(output_dir, title.replace(" ", "_").replace("/", "_")[:50] + ".txt")
+
+
+def save_lesson(html, output_dir, force=False):
+    """Write the lesson text; returns the title (None if unchanged and already on disk)."""
+    soup = BeautifulSoup(html, "html.parser")
+    title = soup.title.string.strip() if soup.title and soup.title.string else "Untitled"
+    filename = lesson_filename(output_dir, title)
+    if not force and os.path.exists(filename):
+        return None
+    text = soup.get_text(separator="\n", strip=True)
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(text)
+    return title
+
+
+class OracleCrawler:
+    def __init__(self, fetcher, base_url=BASE_URL, output_dir=OUTPUT_DIR):
+        self.fetcher = fetcher
+        self.base_url = base_url
+        self.output_dir = output_dir
+        self.seen = set()
+        self.stats = {"trails": 0, "lessons": 0, "duplicates": 0, "saved": 0, "unchanged": 0, "errors": 0}
+
+    async def crawl_lesson(self, url):
+        try:
+            result = await self.fetcher.fetch(url)
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"❌ Failed: {url} — {e}")
+            return
+        # Unchanged pages (304) are only rewritten if their output file is missing
+        title = save_lesson(result.text, self.output_dir, force=result.changed)
+        if title:
+            self.stats["saved"] += 1
+            print(f"✅ Saved: {title}")
+        else:
+            self.stats["unchanged"] += 1
+
+    async def crawl_trail(self, trail_url):
+        try:
+            result = await self.fetcher.fetch(trail_url)
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"❌ Failed: {trail_url} — {e}")
+            return
+        lessons = get_lesson_links(result.text, trail_url)
+        new = [url for url in dict.fromkeys(lessons) if url not in self.seen]
+        self.stats["duplicates"] += len(lessons) - len(new)
+        self.seen.update(new)
+        self.stats["lessons"] += len(new)
+        print(f"📚 Trail: {trail_url} — {len(lessons)} lessons ({len(new)} new)")
+        await asyncio.gather(*(self.crawl_lesson(url) for url in new))
+
+    async def crawl(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        index = await self.fetcher.fetch(self.base_url)
+        trails = get_trail_links(index.text, self.base_url)
+        self.stats["trails"] = len(trails)
+        print(f"🔗 Found {len(trails)} trails")
+        await asyncio.gather(*(self.crawl_trail(trail) for trail in trails))
+        return self.stats
+
+
+async def run(args):
+    async with AsyncFetcher(args.cache_dir, concurrency=args.concurrency, rate=args.rate,
+                            retries=args.retries, timeout=args.timeout) as fetcher:
+        crawler = OracleCrawler(fetcher, args.base_url, args.output_dir)
+        start = time.perf_counter()
+        stats = await crawler.crawl()
+        elapsed = time.perf_counter() - start
+    print(f"⏱️ {elapsed:.1f}s — crawl {stats} — http {fetcher.stats}")
+
 
 def main():
-    trails = get_trail_links()
-    print(f"🔗 Found {len(trails)} trails")
-    for trail in trails:
-        lessons = get_lesson_links(trail)
-        print(f"📚 Trail: {trail} — {len(lessons)} lessons")
-        for lesson in lessons:
-            scrape_lesson(lesson)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent requests per host")
+    parser.add_argument("--rate", type=float, default=5.0, help="request starts per second per host")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=20.0)
+    args = parser.parse_args()
+    print("📍 Current working directory:", os.getcwd())
+    asyncio.run(run(args))
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,85 @@
+"""
+Recall-vs-latency report for FAISS index types, measured against the exact flat index.
+
+Uses the vectors stored by build_rag_store.py (vectors.npy / vector_ids.npy),
+so nothing is re-embedded. Queries are stored vectors with a little noise.
+
+    python ai_hint_project/scripts/benchmark_ann.py --queries 500 --k 4
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import faiss
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BASE_DIR)
+
+from ai_hint_project.tools.faiss_index import index_spec, build_index, apply_search_params
+
+RAG_FOLDER = os.path.join(BASE_DIR, "baeldung_scraper")
+
+# Candidate settings: (index type, build params, list of search-time params to sweep)
+CANDIDATES = [
+    ("ivf-flat", {"nlist": 64}, [{"nprobe": p} for p in (1, 4, 8, 16, 32)]),
+    ("ivf-flat", {"nlist": 256}, [{"nprobe": p} for p in (4, 16, 32, 64)]),
+    ("hnsw", {"m": 16}, [{"ef_search": e} for e in (16, 32, 64, 128)]),
+    ("hnsw", {"m": 32}, [{"ef_search": e} for e in (16, 32, 64, 128)]),
+    ("ivf-pq", {"nlist": 64, "pq_m": 48}, [{"nprobe": p} for p in (4, 16, 32)]),
+]
+
+
+def timed_search(index, queries, k):
+    start = time.perf_counter()
+    _, ids = index.search(queries, k)
+    return ids, (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def recall(ids, truth):
+    k = truth.shape[1]
+    hits = sum(len(set(row[row != -1]) & set(true_row)) for row, true_row in zip(ids, truth))
+    return hits / (len(truth) * k)
+
+
+def index_bytes(index):
+    return len(faiss.serialize_index(index))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folder", default=RAG_FOLDER)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--noise", type=float, default=0.05, help="relative noise added to query vectors")
+    args = parser.parse_args()
+
+    vectors = np.load(os.path.join(args.folder, "vectors.npy"), mmap_mode="r")
+    ids = np.load(os.path.join(args.folder, "vector_ids.npy"))
+    print(f"📦 {len(ids)} vectors, dim {vectors.shape[1]}")
+
+    rng = np.random.default_rng(0)
+    sample = rng.choice(len(ids), size=min(args.queries, len(ids)), replace=False)
+    queries = np.ascontiguousarray(vectors[sample], dtype="float32")
+    queries += rng.normal(scale=args.noise * np.abs(queries).mean(), size=queries.shape).astype("float32")
+
+    flat, _ = build_index(index_spec("flat"), vectors, ids)
+    truth, flat_ms = timed_search(flat, queries, args.k)
+    print(f"\n{'index':<32}{'search':<18}{'recall@' + str(args.k):>10}{'ms/query':>10}{'MB':>8}")
+    print(f"{'flat':<32}{'-':<18}{1.0:>10.3f}{flat_ms:>10.3f}{index_bytes(flat) / 1e6:>8.1f}")
+
+    for index_type, build_params, sweep in CANDIDATES:
+        index, spec = build_index(index_spec(index_type, **build_params), vectors, ids)
+        if spec["type"] != index_type:
+            continue  # corpus too small to train this one
+        label = f"{index_type} " + ",".join(f"{k}={spec[k]}" for k in build_params)
+        size_mb = index_bytes(index) / 1e6
+        for params in sweep:
+            apply_search_params(index, dict(spec, **params))
+            found, ms = timed_search(index, queries, args.k)
+            search = ",".join(f"{k}={v}" for k, v in params.items())
+            print(f"{label:<32}{search:<18}{recall(found, truth):>10.3f}{ms:>10.3f}{size_mb:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
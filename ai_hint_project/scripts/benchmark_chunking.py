@@ -0,0 +1,118 @@
+"""
+Compare chunking strategies on the article corpus: index size, build time and retrieval hit-rate.
+
+Each strategy chunks every article, embeds the chunks with the RAG model and
+searches an exact (flat) index with the questions in eval_questions.json.
+"truncated" counts chunks longer than the model's token limit, whose tail is
+dropped at embedding time. hit@k is the share of questions with a chunk from
+the expected article in the top k; answer@k additionally requires that chunk
+to contain the expected answer passage intact.
+
+    python ai_hint_project/scripts/benchmark_chunking.py --k 4
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import faiss
+from sentence_transformers import SentenceTransformer
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BASE_DIR)
+
+from ai_hint_project.tools.chunking import MAX_CHUNK_TOKENS, chunker_spec, make_chunker, token_counter
+
+SOURCE_DIRS = [
+    os.path.join(BASE_DIR, "oracle_articles"),
+    os.path.join(BASE_DIR, "baeldung_scraper", "baeldung_articles")
+]
+QUESTIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "eval_questions.json")
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+STRATEGIES = [
+    ("words 150/30", chunker_spec("words")),
+    ("words 150/0", chunker_spec("words", overlap=0)),
+    ("structured 200", chunker_spec("structured")),
+    ("structured 128", chunker_spec("structured", max_tokens=128)),
+    ("structured 200+40", chunker_spec("structured", overlap_tokens=40)),
+    ("structured 254", chunker_spec("structured", max_tokens=MAX_CHUNK_TOKENS)),
+]
+
+
+def normalize(text):
+    text = re.sub(r"\s+([,.;:!?)])", r"\1", " ".join(text.split()))
+    return text.lower()
+
+
+def load_articles():
+    articles = []
+    for folder in SOURCE_DIRS:
+        if not os.path.isdir(folder):
+            continue
+        for filename in sorted(os.listdir(folder)):
+            if filename.endswith(".txt"):
+                with open(os.path.join(folder, filename), "r", encoding="utf-8") as f:
+                    articles.append((filename, f.read()))
+    return articles
+
+
+def evaluate(name, spec, articles, questions, query_vectors, model, count_tokens, k):
+    start = time.perf_counter()
+    chunker = make_chunker(spec)
+    chunks = [(filename, text) for filename, article in articles for _, text in chunker.split(article)]
+    chunk_seconds = time.perf_counter() - start
+
+    tokens = np.array([count_tokens(text) for _, text in chunks])
+    over = np.maximum(tokens - MAX_CHUNK_TOKENS, 0)
+
+    start = time.perf_counter()
+    vectors = np.asarray(model.encode([text for _, text in chunks], batch_size=64), dtype="float32")
+    index = faiss.IndexIDMap2(faiss.IndexFlatL2(vectors.shape[1]))
+    index.add_with_ids(vectors, np.arange(len(chunks), dtype="int64"))
+    build_seconds = chunk_seconds + time.perf_counter() - start
+
+    index_bytes = len(faiss.serialize_index(index))
+    text_bytes = sum(len(json.dumps({"text": text, "source": source}).encode("utf-8")) for source, text in chunks)
+
+    _, found = index.search(query_vectors, k)
+    hits = answers = 0
+    for question, row in zip(questions, found):
+        retrieved = [chunks[i] for i in row if i != -1]
+        from_source = [text for source, text in retrieved if source == question["source"]]
+        hits += bool(from_source)
+        answers += any(normalize(question["answer"]) in normalize(text) for text in from_source)
+
+    print(f"{name:<20}{len(chunks):>7}{tokens.mean():>8.0f}{tokens.max():>7}{int((over > 0).sum()):>7}"
+          f"{over.sum() / tokens.sum():>8.1%}{(index_bytes + text_bytes) / 1024:>9.1f}{build_seconds:>8.2f}"
+          f"{hits / len(questions):>8.2f}{answers / len(questions):>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", default=QUESTIONS_FILE)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--strategies", nargs="+", help="subset of strategy names to run")
+    args = parser.parse_args()
+
+    articles = load_articles()
+    with open(args.questions, "r", encoding="utf-8") as f:
+        questions = json.load(f)
+    print(f"📚 {len(articles)} articles, {len(questions)} questions")
+
+    model = SentenceTransformer(MODEL_NAME)
+    count_tokens = token_counter()
+    query_vectors = np.asarray(model.encode([q["question"] for q in questions]), dtype="float32")
+
+    print(f"\n{'strategy':<20}{'chunks':>7}{'avg tok':>8}{'max':>7}{'trunc':>7}{'lost':>8}"
+          f"{'size KB':>9}{'build s':>8}{'hit@' + str(args.k):>8}{'answer@' + str(args.k):>9}")
+    for name, spec in STRATEGIES:
+        if args.strategies and name not in args.strategies:
+            continue
+        evaluate(name, spec, articles, questions, query_vectors, model, count_tokens, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Time code detection on large pasted inputs and check its labels.
+
+Compares the old is_code_input of crew.py (13 patterns compiled and searched
+one by one on every call, several with lazy .*? scans) with
+code_classifier.classify (one precompiled pattern over at most
+MAX_SCAN_CHARS). Inputs are Java, Python and prose pastes of growing size,
+plus unclosed "f(" and "<" runs that make the lazy patterns rescan the rest
+of the input from every start position. A short labelled set checks the
+java / python / prose calls.
+
+    python ai_hint_project/scripts/benchmark_code_classifier.py --sizes 1000 8000 64000
+"""
+import os
+import re
+import sys
+import time
+import argparse
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BASE_DIR)
+
+from ai_hint_project.code_classifier import classify, retrieval_query
+
+LEGACY_UNCLOSED_LIMIT = 16000  # above this the old patterns take minutes on the unclosed runs
+
+JAVA = """import java.util.concurrent.ConcurrentHashMap;
+
+public class WordCounter {
+    private final Map<String, Integer> counts = new ConcurrentHashMap<>();
+
+    public void add(String word) {
+        counts.merge(word, 1, Integer::sum);  // atomic per key
+    }
+}
+"""
+PYTHON = """from collections import Counter
+
+def count_words(path):
+    with open(path) as f:
+        counts = Counter(f.read().split())
+    if not counts:
+        return None
+    return counts.most_common(10)
+"""
+PROSE = ("I am learning Java and I do not understand when to use an interface and when an abstract class. "
+         "The tutorial says an interface defines behaviour while an abstract class shares state, but in my "
+         "project both seem to work. Which one should I pick for a plugin system?\n")
+
+LABELLED = [
+    ("What is a class in Java?", "prose"),
+    ("Why is my HashMap slower than a TreeMap for small maps?", "prose"),
+    ("When should I prefer Map<String, List<Integer>> over a custom class?", "prose"),
+    (PROSE, "prose"),
+    ("for (int i = 0; i < n; i++) { total += prices[i]; }", "java"),
+    (JAVA, "java"),
+    ("Why does this hang?\n```java\npool.submit(() -> latch.await());\n```", "java"),
+    ("def add(a, b): return a + b", "python"),
+    (PYTHON, "python"),
+    ("Can you review this?\n```python\nitems = sorted(items, key=len)\n```", "python"),
+]
+
+
+def legacy_is_code_input(text):
+    """is_code_input as it was in crew.py."""
+    code_patterns = [
+        r"\bdef\b", r"\bclass\b", r"\bimport\b", r"\breturn\b",
+        r"\bif\b\s*\(?.*?\)?\s*:", r"\bfor\b\s*\(?.*?\)?\s*:", r"\bwhile\b\s*\(?.*?\)?\s*:",
+        r"\btry\b\s*:", r"\bexcept\b\s*:", r"\w+\s*=\s*.+", r"\w+\(.*?\)", r"{.*?}", r"<.*?>"
+    ]
+    return any(re.search(pattern, text) for pattern in code_patterns)
+
+
+def paste(unit, size):
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+def timed(function, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function(text)
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 8000, 64000], help="paste sizes in characters")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'input':<16}{'chars':>8}{'old ms':>10}{'new ms':>10}{'query ms':>10}  label")
+    for size in args.sizes:
+        inputs = (("java", paste(JAVA, size)), ("python", paste(PYTHON, size)), ("prose", paste(PROSE, size)),
+                  ("unclosed f(", paste("f(", size)), ("unclosed <", paste("< ", size)))
+        for name, text in inputs:
+            # the unclosed runs are quadratic for the old patterns: time them once, and only up to a size
+            unclosed = name.startswith("unclosed")
+            old = "-" if unclosed and size > LEGACY_UNCLOSED_LIMIT else \
+                f"{timed(legacy_is_code_input, text, 1 if unclosed else args.repeat):.2f}"
+            new_ms = timed(classify, text, args.repeat)
+            query_ms = timed(retrieval_query, text, args.repeat)
+            print(f"{name:<16}{size:>8}{old:>10}{new_ms:>10.3f}{query_ms:>10.3f}  {classify(text).language}")
+
+    correct = 0
+    print()
+    for text, expected in LABELLED:
+        got = classify(text)
+        correct += got.language == expected
+        old = "code" if legacy_is_code_input(text) else "prose"
+        print(f"{'ok ' if got.language == expected else 'BAD'} expected {expected:<7} got {got.language:<7} "
+              f"old {old:<6} {text.splitlines()[0][:50]!r}")
+    print(f"\n{correct}/{len(LABELLED)} labelled inputs classified correctly")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Per-request crew setup time: re-parsing YAML + building a new Agent (old path)
+versus the config registry + per-persona agent factory (current path).
+
+Only setup is timed (config load, Agent/Task/Crew construction); no LLM call
+or retrieval is made, a FakeListLLM stands in for the pooled client.
+
+    python ai_hint_project/scripts/benchmark_crew_setup.py --requests 200
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BASE_DIR)
+
+from crewai import Agent, Crew, Task
+from langchain_community.llms.fake import FakeListLLM
+from ai_hint_project.config_registry import ConfigRegistry, AgentFactory
+
+
+def build_crew(agent, task_template, query):
+    task = Task(
+        name=task_template['name'],
+        description=task_template['description'].format(query=query),
+        expected_output=task_template['expected_output'],
+        agent=agent
+    )
+    return Crew(agents=[agent], tasks=[task], verbose=False)
+
+
+def setup_uncached(persona, llm, query):
+    registry = ConfigRegistry()  # a fresh registry re-parses both files, like the old per-request load
+    agents_config = registry.get('agents')
+    tasks_config = registry.get('tasks')
+    agent_cfg = agents_config['agents'][persona]
+    agent = Agent(
+        role=agent_cfg["role"],
+        goal=agent_cfg["goal"],
+        backstory=agent_cfg["backstory"],
+        level=agent_cfg.get("level", "beginner"),
+        verbose=False,
+        llm=llm
+    )
+    return build_crew(agent, tasks_config['tasks']['explainer'], query)
+
+
+def make_setup_cached():
+    registry = ConfigRegistry()
+    factory = AgentFactory(registry)
+
+    def setup_cached(persona, llm, query):
+        agent = factory.get_agent(persona, llm)
+        return build_crew(agent, registry.get('tasks')['tasks']['explainer'], query)
+
+    return setup_cached
+
+
+def measure(setup, personas, llm, requests):
+    times = []
+    for i in range(requests):
+        persona = personas[i % len(personas)]
+        start = time.perf_counter()
+        setup(persona, llm, f"What is a HashMap? ({i})")
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    personas = list(ConfigRegistry().get('agents')['agents'])
+    llm = FakeListLLM(responses=["ok"])
+
+    print(f"\n{'path':<12}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for label, setup in (("uncached", setup_uncached), ("registry", make_setup_cached())):
+        times = sorted(measure(setup, personas, llm, args.requests))
+        p95 = times[int(0.95 * (len(times) - 1))]
+        print(f"{label:<12}{statistics.mean(times):>10.2f}{statistics.median(times):>10.2f}{p95:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
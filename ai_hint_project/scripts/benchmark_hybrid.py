@@ -0,0 +1,102 @@
+"""
+Compare vector-only, BM25-only and hybrid (reciprocal rank fusion) retrieval on a RAG store.
+
+Questions come from eval_questions.json. hit@k: a chunk of the expected
+article is in the top k; answer@k: that chunk contains the expected answer
+passage; MRR is over the first chunk of the expected article. ms/query is
+search time only (query vectors are embedded up front) and the BM25 index is
+built in memory if the store has none.
+
+    python ai_hint_project/scripts/benchmark_hybrid.py --k 4 --backend faiss
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BASE_DIR)
+
+from ai_hint_project.tools.retrievers import BACKENDS, open_backend
+from ai_hint_project.tools.bm25_index import BM25Index, build_bm25, has_bm25_index, reciprocal_rank_fusion
+
+RAG_FOLDER = os.path.join(BASE_DIR, "baeldung_scraper")
+QUESTIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "eval_questions.json")
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+
+def normalize(text):
+    return re.sub(r"\s+([,.;:!?)])", r"\1", " ".join(text.split())).lower()
+
+
+def load_chunks(folder):
+    with open(os.path.join(folder, "chunks.json"), "r", encoding="utf-8") as f:
+        chunks = json.load(f)
+    return {chunk.get("id", position): dict(chunk, id=chunk.get("id", position)) for position, chunk in enumerate(chunks)}
+
+
+def score(name, rankings, questions, chunks, seconds, k):
+    hits = answers = reciprocal = 0.0
+    for question, ranking in zip(questions, rankings):
+        retrieved = [chunks[i] for i in ranking[:k] if i in chunks]
+        first = next((rank for rank, chunk in enumerate(retrieved) if chunk["source"] == question["source"]), None)
+        hits += first is not None
+        reciprocal += 1.0 / (first + 1) if first is not None else 0.0
+        answers += any(chunk["source"] == question["source"] and normalize(question["answer"]) in normalize(chunk["text"])
+                       for chunk in retrieved)
+    n = len(questions)
+    print(f"{name:<10}{hits / n:>8.2f}{answers / n:>10.2f}{reciprocal / n:>8.3f}{seconds * 1000 / n:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folder", default=RAG_FOLDER)
+    parser.add_argument("--questions", default=QUESTIONS_FILE)
+    parser.add_argument("--backend", default="faiss", choices=list(BACKENDS))
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--depth", type=int, default=20, help="candidates per ranking fed to the fusion")
+    parser.add_argument("--repeat", type=int, default=20, help="timing repetitions per method")
+    args = parser.parse_args()
+
+    with open(args.questions, "r", encoding="utf-8") as f:
+        questions = json.load(f)
+    texts = [q["question"] for q in questions]
+    chunks = load_chunks(args.folder)
+    retriever = open_backend(args.folder, args.backend)
+    if has_bm25_index(args.folder):
+        lexical = BM25Index.load(args.folder)
+    else:
+        print("⚠️ No bm25.npz in the store, building the BM25 index in memory")
+        lexical = BM25Index(build_bm25(list(chunks.values())))
+    vectors = np.asarray(SentenceTransformer(MODEL_NAME).encode(texts), dtype="float32")
+    print(f"📚 {len(chunks)} chunks, {len(questions)} questions")
+
+    def vector():
+        return [row.tolist() for row in retriever.search(vectors, args.k)[1]]
+
+    def bm25():
+        return [row.tolist() for row in lexical.search(texts, args.k)[1]]
+
+    def hybrid():
+        vector_ids = retriever.search(vectors, args.depth)[1]
+        lexical_ids = lexical.search(texts, args.depth)[1]
+        return [[doc for doc, _ in reciprocal_rank_fusion([v.tolist(), l.tolist()])[:args.k]]
+                for v, l in zip(vector_ids, lexical_ids)]
+
+    print(f"\n{'method':<10}{'hit@' + str(args.k):>8}{'answer@' + str(args.k):>10}{'MRR':>8}{'ms/query':>10}")
+    for name, method in (("vector", vector), ("bm25", bm25), ("hybrid", hybrid)):
+        rankings = method()
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            method()
+        seconds = (time.perf_counter() - start) / args.repeat
+        score(name, rankings, questions, chunks, seconds, args.k)
+    retriever.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Writes/sec for user progress under concurrent sessions.
+
+Compares the old approach (rewrite the whole user_progress.json per event)
+with the SQLite progress store (atomic increments, optionally batched so the
+XP + affinity of one question share a commit) and with the write-behind event
+log in front of it (timed until the final flush has committed). "caller us"
+is the time a session spends per write, i.e. what the request path pays.
+Sessions are spread over processes x threads; each session is its own user
+id, except with --shared where all sessions hit one user to check no
+increment is lost.
+
+    python ai_hint_project/scripts/benchmark_progress_store.py --processes 4 --threads 4
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BASE_DIR)
+
+from utils.progress_store import ProgressStore, default_progress
+from utils.progress_events import ProgressEventLog
+
+_json_lock = threading.Lock()
+
+
+def json_session(path, user_id, events):
+    progress = default_progress()
+    for i in range(events):
+        progress['xp'] += 10
+        progress['affinity']['Yoda'] = progress['affinity'].get('Yoda', 0) + 10
+        for _ in range(2):  # add_xp and add_affinity each rewrote the file
+            with _json_lock, open(path, "w") as f:
+                json.dump(progress, f, indent=2)
+    return events * 2
+
+
+def sqlite_session(store, user_id, events, batched):
+    for i in range(events):
+        if batched:
+            with store.batch():
+                store.increment_xp(user_id, 10)
+                store.increment_affinity(user_id, 'Yoda', 10)
+        else:
+            store.increment_xp(user_id, 10)
+            store.increment_affinity(user_id, 'Yoda', 10)
+    return events * 2
+
+
+def events_session(log, user_id, events):
+    for i in range(events):
+        log.record(user_id, 'xp', amount=10, level=1)
+        log.record(user_id, 'affinity', persona='Yoda', amount=10)
+    return events * 2
+
+
+def run_process(mode, path, process_id, threads, events, shared):
+    store = ProgressStore(path) if mode != "json" else None
+    log = ProgressEventLog(store, path + ".journal") if mode == "events" else None
+    results = []
+
+    def session(thread_id):
+        user_id = "shared" if shared else f"user-{process_id}-{thread_id}"
+        start = time.perf_counter()
+        if mode == "json":
+            writes = json_session(path, user_id, events)
+        elif mode == "events":
+            writes = events_session(log, user_id, events)
+        else:
+            writes = sqlite_session(store, user_id, events, batched=(mode == "sqlite-batch"))
+        results.append((writes, time.perf_counter() - start))
+
+    workers = [threading.Thread(target=session, args=(t,)) for t in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if log is not None:
+        log.close()
+    return sum(w for w, _ in results), sum(t for _, t in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--events", type=int, default=200, help="questions answered per session")
+    parser.add_argument("--shared", action="store_true", help="all sessions update the same user")
+    args = parser.parse_args()
+
+    print(f"\n{'mode':<14}{'writes':>10}{'seconds':>10}{'writes/s':>12}{'caller us':>12}{'check':>10}")
+    for mode in ("json", "sqlite", "sqlite-batch", "events"):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "progress.json" if mode == "json" else "progress.db")
+            if mode != "json":
+                ProgressStore(path).close()  # create the schema before the workers race for it
+            start = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=args.processes) as pool:
+                futures = [pool.submit(run_process, mode, path, p, args.threads, args.events, args.shared)
+                           for p in range(args.processes)]
+                results = [f.result() for f in futures]
+            writes = sum(w for w, _ in results)
+            caller_us = sum(t for _, t in results) / writes * 1e6
+            elapsed = time.perf_counter() - start
+
+            check = "-"
+            if mode != "json" and args.shared:
+                expected = args.processes * args.threads * args.events * 10
+                check = "ok" if ProgressStore(path).load("shared")['xp'] == expected else "LOST"
+            print(f"{mode:<14}{writes:>10}{elapsed:>10.2f}{writes / elapsed:>12.0f}{caller_us:>12.1f}{check:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Measure what cross-encoder re-ranking buys over bi-encoder order, and what it costs.
+
+For each candidate depth N the top N chunks of the vector search are
+re-scored by the cross-encoder and cut to k, and compared with the plain
+top k on the questions of eval_questions.json (hit@k, answer@k and MRR as in
+benchmark_hybrid.py). Latency is per question: search ms is the vector search,
+rerank p50/p95 the cross-encoder stage alone. "fallback" counts the
+questions where the --budget-ms budget (0: no budget) left the bi-encoder
+order in place; quality is scored on what was actually returned.
+
+    python ai_hint_project/scripts/benchmark_rerank.py --k 4 --depths 10 20 40 --budget-ms 300
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BASE_DIR)
+
+from ai_hint_project.tools.retrievers import BACKENDS, open_backend
+from ai_hint_project.tools.reranker import CrossEncoderReranker, DEFAULT_RERANK_MODEL, DEFAULT_BATCH_SIZE
+from ai_hint_project.scripts.benchmark_hybrid import QUESTIONS_FILE, RAG_FOLDER, MODEL_NAME, load_chunks, normalize
+
+
+def quality(rankings, questions, k):
+    """(hit@k, answer@k, MRR) of rankings, each a list of chunk dicts best first."""
+    hits = answers = reciprocal = 0.0
+    for question, retrieved in zip(questions, rankings):
+        retrieved = retrieved[:k]
+        first = next((rank for rank, chunk in enumerate(retrieved) if chunk["source"] == question["source"]), None)
+        hits += first is not None
+        reciprocal += 1.0 / (first + 1) if first is not None else 0.0
+        answers += any(chunk["source"] == question["source"] and normalize(question["answer"]) in normalize(chunk["text"])
+                       for chunk in retrieved)
+    n = len(questions)
+    return hits / n, answers / n, reciprocal / n
+
+
+def row(name, scores, search_ms, rerank_ms=None, fallbacks=None):
+    hit, answer, mrr = scores
+    p50 = f"{np.percentile(rerank_ms, 50):>8.1f}" if rerank_ms else f"{'-':>8}"
+    p95 = f"{np.percentile(rerank_ms, 95):>8.1f}" if rerank_ms else f"{'-':>8}"
+    fallback = f"{fallbacks:>10}" if fallbacks is not None else f"{'-':>10}"
+    print(f"{name:<14}{hit:>8.2f}{answer:>10.2f}{mrr:>8.3f}{search_ms:>10.2f}{p50}{p95}{fallback}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folder", default=RAG_FOLDER)
+    parser.add_argument("--questions", default=QUESTIONS_FILE)
+    parser.add_argument("--backend", default="faiss", choices=list(BACKENDS))
+    parser.add_argument("--model", default=DEFAULT_RERANK_MODEL)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--depths", type=int, nargs="+", default=[10, 20, 40], help="candidates re-ranked per question")
+    parser.add_argument("--budget-ms", type=float, default=0, help="per-question re-ranking budget (0: unlimited)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    with open(args.questions, "r", encoding="utf-8") as f:
+        questions = json.load(f)
+    chunks = load_chunks(args.folder)
+    retriever = open_backend(args.folder, args.backend)
+    vectors = np.asarray(SentenceTransformer(MODEL_NAME).encode([q["question"] for q in questions]), dtype="float32")
+    reranker = CrossEncoderReranker(args.model, budget_ms=args.budget_ms or float("inf"), batch_size=args.batch_size)
+    reranker.warm_up(background=False)
+    if reranker.model is None:
+        sys.exit(f"Could not load {args.model}")
+    print(f"📚 {len(chunks)} chunks, {len(questions)} questions, re-ranker {args.model}")
+
+    def candidates(depth):
+        start = time.perf_counter()
+        ids = [retriever.search(vector[None, :], depth)[1][0] for vector in vectors]
+        search_ms = (time.perf_counter() - start) * 1000 / len(questions)
+        return [[chunks[int(i)] for i in row_ids if int(i) in chunks] for row_ids in ids], search_ms
+
+    print(f"\n{'method':<14}{'hit@' + str(args.k):>8}{'answer@' + str(args.k):>10}{'MRR':>8}{'search ms':>10}"
+          f"{'p50 ms':>8}{'p95 ms':>8}{'fallback':>10}")
+    baseline, search_ms = candidates(args.k)
+    row("bi-encoder", quality(baseline, questions, args.k), search_ms)
+    for depth in args.depths:
+        pool, search_ms = candidates(depth)
+        reranked, rerank_ms, fallbacks = [], [], 0
+        for question, hits in zip(questions, pool):
+            top, info = reranker.rerank(question["question"], hits, args.k)
+            reranked.append(top)
+            rerank_ms.append(info["ms"])
+            fallbacks += not info["reranked"]
+        row(f"rerank@{depth}", quality(reranked, questions, args.k), search_ms, rerank_ms, fallbacks)
+    retriever.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Compare retriever backends (faiss / numpy / chroma) on the same RAG store.
+
+Reports open time, ms/query and agreement@k with exact NumPy search. Queries
+are stored chunk vectors with a little noise, so no embedding model is needed.
+
+    python ai_hint_project/scripts/benchmark_retrievers.py --backends faiss numpy chroma
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BASE_DIR)
+
+from ai_hint_project.tools.retrievers import BACKENDS, VECTORS_FILE, open_backend
+
+RAG_FOLDER = os.path.join(BASE_DIR, "baeldung_scraper")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folder", default=RAG_FOLDER)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=1, help="queries per search call")
+    args = parser.parse_args()
+
+    vectors = np.load(os.path.join(args.folder, VECTORS_FILE), mmap_mode="r")
+    rng = np.random.default_rng(0)
+    sample = rng.choice(len(vectors), size=min(args.queries, len(vectors)), replace=False)
+    queries = np.ascontiguousarray(vectors[np.sort(sample)], dtype="float32")
+    queries += rng.normal(scale=0.05 * np.abs(queries).mean(), size=queries.shape).astype("float32")
+
+    _, truth = open_backend(args.folder, "numpy").search(queries, args.k)
+
+    print(f"\n{'backend':<10}{'open ms':>10}{'ms/query':>10}{'agree@' + str(args.k):>10}")
+    for name in args.backends:
+        try:
+            start = time.perf_counter()
+            backend = open_backend(args.folder, name)
+            open_ms = (time.perf_counter() - start) * 1000
+        except Exception as e:
+            print(f"{name:<10}unavailable: {e}")
+            continue
+        found = []
+        start = time.perf_counter()
+        for offset in range(0, len(queries), args.batch):
+            found.append(backend.search(queries[offset:offset + args.batch], args.k)[1])
+        ms = (time.perf_counter() - start) * 1000 / len(queries)
+        found = np.concatenate(found)
+        agree = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(found, truth)])
+        print(f"{name:<10}{open_ms:>10.1f}{ms:>10.3f}{agree:>10.3f}")
+        backend.close()
+
+
+if __name__ == "__main__":
+    main()
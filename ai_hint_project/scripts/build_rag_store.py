@@ -3,118 +3,508 @@ print("🚀 Script started")
 
 import os
 import json
+import hashlib
+import argparse
+import time
+from datetime import datetime
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import sys
 import numpy as np
 import faiss
 from sentence_transformers import SentenceTransformer
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Repository root (this script lives in ai_hint_project/scripts/)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BASE_DIR)
+
+from ai_hint_project.tools.faiss_index import (
+    INDEX_DEFAULTS, DEFAULT_TRAIN_SAMPLE, index_spec, create_index, build_index,
+    needs_training, supports_removal, apply_search_params
+)
+from ai_hint_project.tools.chunk_store import write_chunk_store
+from ai_hint_project.tools.bm25_index import write_bm25_index
+from ai_hint_project.tools.metadata_filter import write_filter_index
+from ai_hint_project.tools.chunking import CHUNKER_DEFAULTS, DEFAULT_CHUNKER, chunker_spec, get_chunker
 SOURCE_DIRS = [
     os.path.join(BASE_DIR, "oracle_articles"),
     os.path.join(BASE_DIR, "baeldung_scraper", "baeldung_articles")
 ]
+# Per-article URL and tags; tags back the filtered retrieval in tools/metadata_filter.py
 SOURCE_METADATA = {
-    "Intro_to_Java.txt": {
-        "url": "https://docs.oracle.com/javase/tutorial/java/concepts/index.html",
-        "tags": ["java", "OOP", "oracle"]
+    "Bounded_Type_Parameters_(The_Java™_Tutorials_>____.txt": {
+        "url": "https://docs.oracle.com/javase/tutorial/java/generics/bounded.html",
+        "tags": ["java", "generics", "oracle"]
+    },
+    "Lesson:_Annotations_(The_Java™_Tutorials_>_Learnin.txt": {
+        "url": "https://docs.oracle.com/javase/tutorial/java/annotations/index.html",
+        "tags": ["java", "annotations", "oracle"]
+    },
+    "Lesson:_Interfaces_and_Inheritance_(The_Java™_Tuto.txt": {
+        "url": "https://docs.oracle.com/javase/tutorial/java/IandI/index.html",
+        "tags": ["java", "oop", "oracle"]
+    },
+    "Get Started with Java.txt": {
+        "url": "https://www.baeldung.com/get-started-with-java-series",
+        "tags": ["java", "basics", "baeldung"]
     },
-    "Java_Streams.txt": {
-        "url": "https://www.baeldung.com/java-8-streams",
+    "Java _Back to Basics_ Tutorial.txt": {
+        "url": "https://www.baeldung.com/java-tutorial",
+        "tags": ["java", "basics", "oop", "baeldung"]
+    },
+    "Java Collections Series.txt": {
+        "url": "https://www.baeldung.com/java-collections",
+        "tags": ["java", "collections", "baeldung"]
+    },
+    "Java Concurrency Series.txt": {
+        "url": "https://www.baeldung.com/java-concurrency",
+        "tags": ["java", "concurrency", "baeldung"]
+    },
+    "Java Streams Series.txt": {
+        "url": "https://www.baeldung.com/java-streams",
         "tags": ["java", "streams", "baeldung"]
     },
-    # Add more entries as needed
 }
 
 print("📂 Resolved source directories:")
 for path in SOURCE_DIRS:
     print("   -", path)
 
-OUTPUT_DIR = "baeldung_scraper"
-
+OUTPUT_DIR = os.path.join(BASE_DIR, "baeldung_scraper")
+INDEX_FILE = "baeldung_index.faiss"
+CHUNKS_FILE = "chunks.json"
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.npy"
+VECTOR_IDS_FILE = "vector_ids.npy"
+# Spec keys that can change without rebuilding the index
+SEARCH_PARAMS = ("nprobe", "ef_search")
+MODEL_NAME = "all-MiniLM-L6-v2"
 
-CHUNK_SIZE = 150
-OVERLAP = 30
 
-def chunk_text(text, max_words=CHUNK_SIZE, overlap=OVERLAP):
-    words = text.split()
-    chunks = []
-    start = 0
-    while start < len(words):
-        end = start + max_words
-        chunk = ' '.join(words[start:end])
-        chunks.append(chunk)
-        start += max_words - overlap
-    return chunks
+def content_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
 
-def load_and_chunk_articles(source_dirs):
-    all_chunks = []
-    total_files = 0
+def list_source_files(source_dirs):
+    """Return (key, path, filename) for every .txt article, key being the path relative to BASE_DIR."""
+    files = []
     for folder in source_dirs:
         print(f"📁 Scanning folder: {folder}")
         if not os.path.exists(folder):
             print(f"❌ Folder not found: {folder}")
             continue
-        for filename in os.listdir(folder):
-            if filename.endswith(".txt"):
-                total_files += 1
-                print(f"🔍 Found file: {filename}")
-    print(f"📦 Total .txt files found: {total_files}")
-
-    for folder in source_dirs:
-        print(f"📁 Scanning folder: {folder}")
-        for filename in os.listdir(folder):
+        for filename in sorted(os.listdir(folder)):
             if filename.endswith(".txt"):
                 path = os.path.join(folder, filename)
-                with open(path, "r", encoding="utf-8") as f:
-                    text = f.read()
-                    chunks = chunk_text(text)
-                    print(f"📄 {filename}: {len(chunks)} chunks")
-                    meta = SOURCE_METADATA.get(filename, {})
-                    for i, chunk in enumerate(chunks):
-                        all_chunks.append({
-                            "text": chunk,
-                            "source": filename,
-                            "source_url": meta.get("url", ""),
-                            "tags": meta.get("tags", []),
-                            "chunk_index": i
-                        })
-
-
-    print(f"✅ Total chunks collected: {len(all_chunks)}")
-    return all_chunks
-
-def embed_chunks(chunks, model):
-    texts = [chunk["text"] for chunk in chunks]
-    return model.encode(texts)
-
-def build_index(embeddings):
-    dim = embeddings.shape[1]
-    index = faiss.IndexFlatL2(dim)
-    index.add(embeddings)
-    return index
-
-def save_rag_store(index, chunks, folder=OUTPUT_DIR):
+                files.append((os.path.relpath(path, BASE_DIR), path, filename))
+    print(f"📦 Total .txt files found: {len(files)}")
+    return files
+
+def read_article(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def source_fields(filename):
+    meta = SOURCE_METADATA.get(filename, {})
+    return {"source_url": meta.get("url", ""), "tags": meta.get("tags", [])}
+
+def make_chunk_records(text, filename, spec=None):
+    chunker = get_chunker(spec or chunker_spec())
+    return [{
+        "text": chunk,
+        "source": filename,
+        **source_fields(filename),
+        "section": section,
+        "chunk_index": i
+    } for i, (section, chunk) in enumerate(chunker.split(text))]
+
+def load_rag_store(folder=OUTPUT_DIR):
+    """Load (index, chunks, manifest, vectors, vector_ids) from a previous build.
+
+    Returns None if there is no manifest or the store can't be updated in place.
+    The stored vectors are memory-mapped, not read into RAM.
+    """
+    manifest_path = os.path.join(folder, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("model") != MODEL_NAME:
+        print(f"⚠️ Manifest was built with {manifest.get('model')}, rebuilding from scratch")
+        return None
+    if not os.path.exists(os.path.join(folder, VECTORS_FILE)):
+        print("⚠️ No stored vectors for this build, rebuilding from scratch")
+        return None
+    index = faiss.read_index(os.path.join(folder, INDEX_FILE))
+    with open(os.path.join(folder, CHUNKS_FILE), "r", encoding="utf-8") as f:
+        chunks = json.load(f)
+    vectors = np.load(os.path.join(folder, VECTORS_FILE), mmap_mode="r")
+    vector_ids = np.load(os.path.join(folder, VECTOR_IDS_FILE))
+    return index, chunks, manifest, vectors, vector_ids
+
+def save_rag_store(index, chunks, folder=OUTPUT_DIR, manifest=None):
     os.makedirs(folder, exist_ok=True)
-    faiss.write_index(index, os.path.join(folder, "baeldung_index.faiss"))
-    with open(os.path.join(folder, "chunks.json"), "w", encoding="utf-8") as f:
+    # Write-then-replace: running apps may have the previous index memory-mapped
+    index_path = os.path.join(folder, INDEX_FILE)
+    faiss.write_index(index, index_path + ".tmp")
+    os.replace(index_path + ".tmp", index_path)
+    write_chunk_store(folder, chunks)
+    with open(os.path.join(folder, CHUNKS_FILE), "w", encoding="utf-8") as f:
         json.dump(chunks, f, indent=2)
+    if manifest is not None:
+        with open(os.path.join(folder, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
     print(f"✅ RAG store saved in folder: {folder}")
-    
+
+
+class VectorStoreWriter:
+    """Keeps every chunk vector on disk (vectors.npy + vector_ids.npy).
+
+    New vectors are appended to a scratch file as they are produced; commit()
+    merges them with the surviving rows of the previous build. The stored
+    vectors let the index be retrained or rebuilt without re-embedding.
+    """
+
+    def __init__(self, folder=OUTPUT_DIR):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+        self._vectors_path = os.path.join(folder, VECTORS_FILE + ".append")
+        self._ids_path = os.path.join(folder, VECTOR_IDS_FILE + ".append")
+        self._vectors_file = open(self._vectors_path, "wb")
+        self._ids_file = open(self._ids_path, "wb")
+        self.dim = None
+        self.count = 0
+
+    def append(self, vectors, ids):
+        self.dim = vectors.shape[1]
+        self._vectors_file.write(np.ascontiguousarray(vectors, dtype="float32").tobytes())
+        self._ids_file.write(np.ascontiguousarray(ids, dtype="int64").tobytes())
+        self.count += len(ids)
+
+    def abort(self):
+        """Drop the scratch files without touching the stored vectors."""
+        self._vectors_file.close()
+        self._ids_file.close()
+        for path in (self._vectors_path, self._ids_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def commit(self, removed_ids, old_vectors=None, old_ids=None, block=65536):
+        """Write the merged vector files and return them (vectors memory-mapped)."""
+        self._vectors_file.close()
+        self._ids_file.close()
+        if old_vectors is not None and len(old_ids):
+            keep = np.flatnonzero(~np.isin(old_ids, np.asarray(removed_ids, dtype="int64")))
+            self.dim = old_vectors.shape[1]
+        else:
+            keep = np.empty(0, dtype="int64")
+        if self.dim is None:
+            self.abort()
+            raise ValueError("No vectors to store")
+
+        new_vectors = np.fromfile(self._vectors_path, dtype="float32").reshape(-1, self.dim)
+        new_ids = np.fromfile(self._ids_path, dtype="int64")
+        total = len(keep) + len(new_ids)
+
+        vectors_path = os.path.join(self.folder, VECTORS_FILE)
+        out = np.lib.format.open_memmap(vectors_path + ".tmp", mode="w+", dtype="float32", shape=(total, self.dim))
+        for start in range(0, len(keep), block):
+            rows = keep[start:start + block]
+            out[start:start + len(rows)] = old_vectors[rows]
+        out[len(keep):] = new_vectors
+        out.flush()
+        del out
+        ids = np.concatenate([old_ids[keep], new_ids]) if len(keep) else new_ids
+        np.save(os.path.join(self.folder, VECTOR_IDS_FILE), ids)
+        os.replace(vectors_path + ".tmp", vectors_path)
+        os.remove(self._vectors_path)
+        os.remove(self._ids_path)
+        return np.load(vectors_path, mmap_mode="r"), ids
+
+
+def process_file(task):
+    """Pool worker: read and hash one article, chunking it only if it changed."""
+    key, path, filename, old_hash, spec = task
+    text = read_article(path)
+    file_hash = content_hash(text)
+    if file_hash == old_hash:
+        return key, filename, file_hash, None
+    records = make_chunk_records(text, filename, spec)
+    hashes = [content_hash(record["text"]) for record in records]
+    return key, filename, file_hash, list(zip(records, hashes))
+
+def iter_processed_files(tasks, workers):
+    """Yield process_file results in order, keeping at most a few files in flight per worker."""
+    if workers <= 1:
+        yield from map(process_file, tasks)
+        return
+    window = workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(process_file, task))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class BatchEmbedder:
+    """Loads the SentenceTransformer on first use and encodes in fixed-size batches.
+
+    With workers > 1 encoding is spread over a SentenceTransformer
+    multi-process pool (one CPU process per worker).
+    """
+
+    def __init__(self, model_name=MODEL_NAME, batch_size=64, workers=1):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.workers = workers
+        self.model = None
+        self.pool = None
+
+    def encode(self, texts):
+        if self.model is None:
+            self.model = SentenceTransformer(self.model_name)
+            if self.workers > 1:
+                self.pool = self.model.start_multi_process_pool(["cpu"] * self.workers)
+        if self.pool is not None:
+            vectors = self.model.encode_multi_process(texts, self.pool, batch_size=self.batch_size)
+        else:
+            vectors = self.model.encode(texts, batch_size=self.batch_size)
+        return np.asarray(vectors, dtype="float32")
+
+    def close(self):
+        if self.pool is not None:
+            self.model.stop_multi_process_pool(self.pool)
+            self.pool = None
+
+
+class IndexWriter:
+    """Buffers chunks that need vectors and adds them to the index batch by batch.
+
+    Every batch is written to the vector store. It is also added to the live
+    index when that can take vectors without training (flat/HNSW, or an IVF
+    index loaded from a previous build); otherwise the index is built from the
+    stored vectors after ingestion.
+    """
+
+    def __init__(self, index, embedder, vector_store, spec, flush_size=512):
+        self.index = index
+        self.embedder = embedder
+        self.vector_store = vector_store
+        self.spec = spec
+        self.flush_size = flush_size
+        self.pending = []
+        self.embedded = 0
+        self.embed_seconds = 0.0
+
+    def add(self, record):
+        self.pending.append(record)
+        if len(self.pending) >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        start = time.perf_counter()
+        vectors = self.embedder.encode([record["text"] for record in self.pending])
+        ids = np.array([record["id"] for record in self.pending], dtype="int64")
+        self.vector_store.append(vectors, ids)
+        if self.index is None and not needs_training(self.spec):
+            self.index = create_index(self.spec, vectors.shape[1])
+        if self.index is not None:
+            self.index.add_with_ids(vectors, ids)
+        self.embed_seconds += time.perf_counter() - start
+        self.embedded += len(self.pending)
+        print(f"🧠 Embedded {self.embedded} chunks ({self.embedded / self.embed_seconds:.1f} chunks/sec)")
+        self.pending = []
+
+
+def ingest(source_files, old_chunks, manifest, writer, workers=1, spec=None):
+    """Diff the corpus against the manifest and stream changed chunks into the writer.
+
+    Returns (chunks, removed_ids, manifest): the full new chunk list (each with
+    an "id"), the ids whose vectors must be dropped and the new manifest.
+    Unchanged files are not re-chunked; changed files reuse the ids (and
+    vectors) of chunks whose text is identical. A different chunker spec
+    than the previous build's re-chunks every file.
+    """
+    spec = spec or chunker_spec()
+    old_files = manifest.get("files", {})
+    if old_files and manifest.get("chunker") != spec:
+        print(f"✂️ Chunker changed to {spec}, re-chunking every file")
+        old_files = {key: dict(entry, hash=None) for key, entry in old_files.items()}
+    old_by_id = {chunk["id"]: chunk for chunk in old_chunks}
+    next_id = manifest.get("next_id", 0)
+
+    chunks, files = [], {}
+    removed_ids = set()
+
+    tasks = [(key, path, filename, old_files.get(key, {}).get("hash"), spec) for key, path, filename in source_files]
+    for key, filename, file_hash, records in iter_processed_files(tasks, workers):
+        old_entry = old_files.get(key)
+
+        if records is None:
+            # Metadata edits apply without re-chunking
+            chunks.extend(dict(old_by_id[c["id"]], **source_fields(filename)) for c in old_entry["chunks"])
+            files[key] = old_entry
+            continue
+
+        # Changed or new file: keep vectors for chunks whose text didn't change
+        reusable = {}
+        for c in (old_entry or {}).get("chunks", []):
+            reusable.setdefault(c["hash"], []).append(c["id"])
+
+        entry_chunks = []
+        new_count = 0
+        for record, chunk_hash in records:
+            if reusable.get(chunk_hash):
+                record["id"] = reusable[chunk_hash].pop(0)
+            else:
+                record["id"] = next_id
+                next_id += 1
+                writer.add(record)
+                new_count += 1
+            chunks.append(record)
+            entry_chunks.append({"id": record["id"], "hash": chunk_hash})
+        for ids in reusable.values():
+            removed_ids.update(ids)
+
+        files[key] = {"hash": file_hash, "chunks": entry_chunks}
+        status = "changed" if old_entry else "new"
+        print(f"📄 {filename} ({status}): {len(entry_chunks)} chunks, {new_count} to embed")
+
+    writer.flush()
+
+    for key, entry in old_files.items():
+        if key not in files:
+            print(f"🗑️ Removed: {key} ({len(entry['chunks'])} chunks)")
+            removed_ids.update(c["id"] for c in entry["chunks"])
+
+    manifest = {"model": MODEL_NAME, "chunker": spec, "next_id": next_id, "files": files}
+    return chunks, sorted(removed_ids), manifest
+
+def requested_spec(args, previous=None):
+    """Index spec from the CLI, falling back to what the previous build asked for."""
+    previous = previous or {}
+    index_type = args.index_type or previous.get("type", "flat")
+    same_type = previous.get("type") == index_type
+    params = {key: getattr(args, key) for key in ("nlist", "nprobe", "m", "ef_construction", "ef_search", "pq_m", "pq_bits")}
+    for key, value in params.items():
+        if value is None and same_type:
+            params[key] = previous.get(key)
+    return index_spec(index_type, **params)
+
+def requested_chunker(args, previous=None):
+    """Chunker spec from the CLI, falling back to what the previous build used."""
+    previous = previous or {}
+    chunker_type = args.chunker or previous.get("type", DEFAULT_CHUNKER)
+    same_type = previous.get("type") == chunker_type
+    params = {key: getattr(args, key) for key in ("max_tokens", "overlap_tokens", "min_tokens", "max_words", "overlap")}
+    for key, value in params.items():
+        if value is None and same_type:
+            params[key] = previous.get(key)
+    return chunker_spec(chunker_type, **params)
+
+def structure(spec):
+    return {k: v for k, v in spec.items() if k not in SEARCH_PARAMS}
+
 def main():
-    print("🔍 Loading and chunking articles...")
-    chunks = load_and_chunk_articles(SOURCE_DIRS)
+    parser = argparse.ArgumentParser(description="Build or update the RAG vector store")
+    parser.add_argument("--full", action="store_true", help="ignore the manifest and rebuild everything")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes for reading/chunking articles")
+    parser.add_argument("--encode-workers", type=int, default=1,
+                        help="CPU processes for embedding (SentenceTransformer multi-process pool)")
+    parser.add_argument("--batch-size", type=int, default=64, help="encoder batch size")
+    parser.add_argument("--flush-size", type=int, default=512,
+                        help="chunks buffered before they are embedded and added to the index")
+    parser.add_argument("--index-type", choices=list(INDEX_DEFAULTS),
+                        help="FAISS index type (default: previous build, else flat)")
+    parser.add_argument("--nlist", type=int, help="IVF: number of inverted lists")
+    parser.add_argument("--nprobe", type=int, help="IVF: lists scanned per query")
+    parser.add_argument("--m", type=int, help="HNSW: neighbours per node")
+    parser.add_argument("--ef-construction", type=int, help="HNSW: build-time beam width")
+    parser.add_argument("--ef-search", type=int, help="HNSW: query-time beam width")
+    parser.add_argument("--pq-m", type=int, help="IVF-PQ: sub-quantizers (must divide the dimension)")
+    parser.add_argument("--pq-bits", type=int, help="IVF-PQ: bits per sub-quantizer code")
+    parser.add_argument("--train-sample", type=int, default=DEFAULT_TRAIN_SAMPLE,
+                        help="vectors sampled to train IVF indexes")
+    parser.add_argument("--chunker", choices=list(CHUNKER_DEFAULTS),
+                        help=f"chunking strategy (default: previous build, else {DEFAULT_CHUNKER})")
+    parser.add_argument("--max-tokens", type=int, help="structured: tokenizer tokens per chunk")
+    parser.add_argument("--overlap-tokens", type=int, help="structured: trailing sentences repeated, in tokens")
+    parser.add_argument("--min-tokens", type=int, help="structured: smallest chunk a heading may close")
+    parser.add_argument("--max-words", type=int, help="words: words per chunk")
+    parser.add_argument("--overlap", type=int, help="words: words shared between chunks")
+    args = parser.parse_args()
+
+    existing = None if args.full else load_rag_store()
+    if existing is None:
+        print("🧱 Full rebuild")
+        index, old_chunks, manifest, old_vectors, old_ids = None, [], {}, None, None
+    else:
+        index, old_chunks, manifest, old_vectors, old_ids = existing
+        print(f"♻️ Incremental update over {len(old_chunks)} existing chunks")
+
+    chunking = requested_chunker(args, manifest.get("chunker"))
+    spec = requested_spec(args, manifest.get("index_request"))
+    rebuild = index is not None and structure(spec) != structure(manifest.get("index_request", {}))
+    if rebuild:
+        print(f"🔁 Index settings changed, rebuilding {spec['type']} index from stored vectors")
+        index = None
+
+    started = time.perf_counter()
+    embedder = BatchEmbedder(batch_size=args.batch_size, workers=args.encode_workers)
+    vector_store = VectorStoreWriter()
+    writer = IndexWriter(index, embedder, vector_store, spec, flush_size=args.flush_size)
+    print("🔍 Loading, diffing and embedding articles...")
+    try:
+        chunks, removed_ids, new_manifest = ingest(
+            list_source_files(SOURCE_DIRS), old_chunks, manifest, writer, workers=args.workers, spec=chunking
+        )
+    except BaseException:
+        vector_store.abort()
+        raise
+    finally:
+        embedder.close()
+
+    if not chunks:
+        print("❌ No chunks to index")
+        vector_store.abort()
+        return
+    vectors, vector_ids = vector_store.commit(removed_ids, old_vectors, old_ids)
+
+    index = writer.index
+    if rebuild or index is None or (removed_ids and not supports_removal(spec)):
+        print(f"📦 Building {spec['type']} index from {len(vector_ids)} stored vectors...")
+        index, effective = build_index(spec, vectors, vector_ids, train_sample=args.train_sample)
+    else:
+        if removed_ids:
+            index.remove_ids(np.array(removed_ids, dtype="int64"))
+        # Search-time knobs can change without touching the index structure
+        effective = dict(manifest.get("index") or spec)
+        effective.update({k: spec[k] for k in SEARCH_PARAMS if k in spec and k in effective})
+        apply_search_params(index, effective)
 
-    print("🧠 Embedding chunks...")
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    embeddings = embed_chunks(chunks, model)
+    elapsed = time.perf_counter() - started
+    print(f"✅ {len(chunks)} chunks total, {writer.embedded} embedded, {len(removed_ids)} removed")
+    if writer.embedded:
+        print(f"⏱️ Embedding: {writer.embedded / writer.embed_seconds:.1f} chunks/sec, "
+              f"overall: {writer.embedded / elapsed:.1f} chunks/sec ({elapsed:.1f}s)")
 
-    print("📦 Building FAISS index...")
-    index = build_index(np.array(embeddings))
+    new_manifest["built_at"] = datetime.now().isoformat()
+    new_manifest["index_request"] = spec
+    new_manifest["index"] = dict(effective, dim=int(vectors.shape[1]), ntotal=int(index.ntotal))
+    print(f"🧭 Index: {new_manifest['index']}")
+    new_manifest["bm25"] = write_bm25_index(OUTPUT_DIR, chunks, built_at=new_manifest["built_at"])
+    new_manifest["filters"] = write_filter_index(OUTPUT_DIR, chunks, built_at=new_manifest["built_at"])
 
     print("💾 Saving RAG store...")
-    save_rag_store(index, chunks)
+    save_rag_store(index, chunks, manifest=new_manifest)
 
     print("✅ RAG store built and saved.")
 
 if __name__ == "__main__":
     main()
-print("🚀 Script finished")
\ No newline at end of file
+print("🚀 Script finished")
@@ -0,0 +1,93 @@
+"""
+Regression check for SingleFlight.stream when a follower joins before the
+leader's generator exists.
+
+The leader publishes the flight and only then calls gen_fn(); a follower
+arriving in that window must wait for the generator instead of pulling from
+it. Each case holds gen_fn() open until a follower has joined, then checks
+that both callers got every chunk (or both got gen_fn's error). Exits
+non-zero on a failure.
+
+    python ai_hint_project/scripts/check_single_flight.py --rounds 50
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BASE_DIR)
+
+from ai_hint_project.single_flight import SingleFlight
+
+CHUNKS = ["Use ", "a ", "ConcurrentHashMap."]
+
+
+def wait_for_follower(flights, timeout=5):
+    deadline = time.monotonic() + timeout
+    while flights.stats()["waiting"] == 0:
+        if time.monotonic() > deadline:
+            raise RuntimeError("no follower joined")
+        time.sleep(0.001)
+    time.sleep(0.01)  # give the follower time to reach its wait
+
+
+def run_case(fail):
+    flights = SingleFlight(wait_timeout=5)
+    calls = []
+
+    def gen_fn():
+        calls.append(threading.get_ident())
+        if len(calls) == 1:
+            wait_for_follower(flights)
+        if fail:
+            raise ValueError("model unavailable")
+        return iter(CHUNKS)
+
+    outcomes = {}
+
+    def consume(name):
+        try:
+            outcomes[name] = list(flights.stream("question", gen_fn))
+        except Exception as e:
+            outcomes[name] = e
+
+    leader = threading.Thread(target=consume, args=("leader",))
+    leader.start()
+    while not calls:
+        time.sleep(0.001)
+    follower = threading.Thread(target=consume, args=("follower",))
+    follower.start()
+    leader.join()
+    follower.join()
+
+    expected = "ValueError" if fail else CHUNKS
+    got = {name: type(value).__name__ if isinstance(value, Exception) else value
+           for name, value in outcomes.items()}
+    problems = [f"{name} got {value!r}" for name, value in got.items() if value != expected]
+    if len(calls) != 1:
+        problems.append(f"gen_fn called {len(calls)} times")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    failures = 0
+    for case, fail in (("chunks", False), ("gen_fn error", True)):
+        for _ in range(args.rounds):
+            problems = run_case(fail)
+            if problems:
+                failures += 1
+                print(f"BAD {case}: {'; '.join(problems)}")
+        print(f"{case:<14}{args.rounds} rounds checked")
+    if failures:
+        sys.exit(f"{failures} failing rounds")
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import threading
+
+DEFAULT_WAIT_TIMEOUT_SECONDS = 180
+
+
+class FlightAbandonedError(RuntimeError):
+    """A shared stream stopped before it finished and this caller had already received part of it."""
+
+
+class _Flight:
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.chunks = []
+        self.done = False
+        self.abandoned = False  # stopped without a result or error: followers retry
+        self.result = None
+        self.error = None
+        self.followers = 0
+        self.consumers = 1      # stream(): callers still reading the flight
+        self.source = None      # stream(): the shared generator
+        self.driver = None      # stream(): caller currently pulling the next chunk from source
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one in-flight computation.
+
+    The first caller for a key (the leader) runs the work; callers arriving
+    while it is in flight (followers) wait for and share its outcome, including
+    its exception. Nothing is cached once the flight lands; that's the answer
+    cache's job.
+
+    A leader that stops without an outcome (a BaseException such as
+    Streamlit's stop/rerun, or a closed stream) doesn't fail its followers:
+    do() followers retry, one of them becoming the new leader, and stream()
+    followers keep pulling from the same generator. Followers wait at most
+    wait_timeout seconds before running the work on their own.
+    """
+
+    def __init__(self, wait_timeout=DEFAULT_WAIT_TIMEOUT_SECONDS):
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.retries = 0
+        self.timeouts = 0
+
+    def _join(self, key, driving=False):
+        """(flight, is_leader). With driving, a new flight starts with its leader as stream driver."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.followers += 1
+                flight.consumers += 1
+                self.coalesced += 1
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            if driving:
+                # Followers must not pull before the leader has created the generator
+                flight.driver = threading.get_ident()
+            self.leaders += 1
+            return flight, True
+
+    def _land(self, key, flight, result=None, error=None, abandoned=False):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        with flight.cond:
+            flight.result = result
+            flight.error = error
+            flight.abandoned = abandoned
+            flight.done = True
+            flight.cond.notify_all()
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def do(self, key, fn):
+        """Return fn() for the leader, or the leader's result/exception for followers."""
+        while True:
+            flight, leader = self._join(key)
+            if leader:
+                try:
+                    result = fn()
+                except Exception as e:
+                    self._land(key, flight, error=e)
+                    raise
+                except BaseException:
+                    self._land(key, flight, abandoned=True)
+                    raise
+                self._land(key, flight, result=result)
+                return result
+            with flight.cond:
+                landed = flight.cond.wait_for(lambda: flight.done, timeout=self.wait_timeout)
+            if not landed:
+                print(f"⚠️ Shared request still running after {self.wait_timeout}s, running it separately")
+                self._count("timeouts")
+                return fn()
+            if not flight.abandoned:
+                break
+            self._count("retries")
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def stream(self, key, gen_fn):
+        """Generator variant: every caller receives all chunks of one shared gen_fn() generator.
+
+        The chunks are pulled by whichever caller is free, so the stream
+        carries on when the caller that started it goes away; the generator
+        is closed once no caller is left.
+        """
+        flight, leader = self._join(key, driving=True)
+        seen = 0
+        try:
+            if leader:
+                try:
+                    source = gen_fn()
+                except Exception as e:
+                    self._land(key, flight, error=e)
+                    raise
+                except BaseException:
+                    self._land(key, flight, abandoned=True)
+                    raise
+                with flight.cond:
+                    flight.source = source
+                    flight.driver = None
+                    flight.cond.notify_all()
+            while True:
+                with flight.cond:
+                    ready = flight.cond.wait_for(
+                        lambda: flight.done or len(flight.chunks) > seen or flight.driver is None,
+                        timeout=self.wait_timeout)
+                    chunks, done = flight.chunks[seen:], flight.done
+                    drive = ready and not chunks and not done
+                    if drive:
+                        flight.driver = threading.get_ident()
+                if chunks:
+                    seen += len(chunks)
+                    yield from chunks
+                elif done:
+                    break
+                elif drive:
+                    self._pull(key, flight)
+                else:
+                    self._count("timeouts")
+                    if seen:
+                        raise FlightAbandonedError(f"Shared stream stalled for {self.wait_timeout}s")
+                    print(f"⚠️ Shared stream stalled for {self.wait_timeout}s, streaming it separately")
+                    yield from gen_fn()
+                    return
+        finally:
+            self._leave(key, flight)
+        if flight.abandoned:
+            if seen:
+                raise FlightAbandonedError("The shared stream stopped before it finished")
+            self._count("retries")
+            yield from self.stream(key, gen_fn)
+            return
+        if flight.error is not None:
+            raise flight.error
+
+    def _pull(self, key, flight):
+        """Move one chunk from the shared generator to the flight (the caller holds flight.driver)."""
+        try:
+            chunk = next(flight.source)
+        except StopIteration:
+            self._land(key, flight, result="".join(flight.chunks))
+        except Exception as e:
+            self._land(key, flight, error=e)
+            raise
+        except BaseException:
+            self._land(key, flight, abandoned=True)
+            raise
+        else:
+            with flight.cond:
+                flight.chunks.append(chunk)
+                flight.driver = None
+                flight.cond.notify_all()
+
+    def _leave(self, key, flight):
+        """A caller stopped reading; the last one out closes an unfinished generator."""
+        with self._lock:
+            flight.consumers -= 1
+            last = flight.consumers == 0 and not flight.done
+            if last and self._flights.get(key) is flight:
+                del self._flights[key]  # nobody can join a flight that is about to close
+        if last:
+            self._land(key, flight, abandoned=True)
+            if flight.source is not None:
+                flight.source.close()
+
+    def stats(self):
+        with self._lock:
+            in_flight = len(self._flights)
+            waiting = sum(flight.followers for flight in self._flights.values())
+        total = self.leaders + self.coalesced
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "in_flight": in_flight,
+            "waiting": waiting,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "coalesce_rate": round(self.coalesced / total, 3) if total else 0.0,
+        }
@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import deque
+
+OPEN_TAG = "<think>"
+CLOSE_TAG = "</think>"
+
+
+def _partial_suffix(text, tag):
+    """Length of the longest suffix of text that is a proper prefix of tag."""
+    for size in range(min(len(tag) - 1, len(text)), 0, -1):
+        if text.endswith(tag[:size]):
+            return size
+    return 0
+
+
+class ThinkTagFilter:
+    """Incrementally strips <think>…</think> blocks from a token stream.
+
+    Equivalent to re.sub(r"<think>.*?</think>\\n?", "", text, flags=re.DOTALL) on
+    the concatenated stream, but works chunk by chunk: tags split across chunks
+    are held back until they can be resolved, and an unclosed <think> block is
+    emitted verbatim by flush() just as the regex would leave it.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._in_think = False
+        self._skip_newline = False
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        out = []
+        while self._buffer:
+            if self._skip_newline:
+                if self._buffer.startswith("\n"):
+                    self._buffer = self._buffer[1:]
+                self._skip_newline = False
+                continue
+            if not self._in_think:
+                start = self._buffer.find(OPEN_TAG)
+                if start == -1:
+                    keep = _partial_suffix(self._buffer, OPEN_TAG)
+                    out.append(self._buffer[:len(self._buffer) - keep])
+                    self._buffer = self._buffer[len(self._buffer) - keep:]
+                    break
+                out.append(self._buffer[:start])
+                self._buffer = self._buffer[start:]
+                self._in_think = True
+            end = self._buffer.find(CLOSE_TAG)
+            if end == -1:
+                break  # keep buffering the think block until it closes
+            self._buffer = self._buffer[end + len(CLOSE_TAG):]
+            self._in_think = False
+            self._skip_newline = True
+        return "".join(out)
+
+    def flush(self):
+        rest, self._buffer = self._buffer, ""
+        self._in_think = False
+        return rest
+
+
+class StreamMetrics:
+    """Timing for one streamed answer: time-to-first-token and total duration."""
+
+    def __init__(self, label=""):
+        self.label = label
+        self.started = time.perf_counter()
+        self.first_token_at = None
+        self.finished_at = None
+        self.chunks = 0
+        self.chars = 0
+
+    def mark(self, text):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.chunks += 1
+        self.chars += len(text)
+
+    def finish(self):
+        self.finished_at = time.perf_counter()
+        _history.add(self)
+
+    @property
+    def ttft(self):
+        return None if self.first_token_at is None else self.first_token_at - self.started
+
+    @property
+    def total(self):
+        return None if self.finished_at is None else self.finished_at - self.started
+
+    def as_dict(self):
+        return {
+            "label": self.label,
+            "ttft": self.ttft,
+            "total": self.total,
+            "chunks": self.chunks,
+            "chars": self.chars,
+        }
+
+
+class _MetricsHistory:
+    def __init__(self, size=200):
+        self._lock = threading.Lock()
+        self._items = deque(maxlen=size)
+
+    def add(self, metrics):
+        with self._lock:
+            self._items.append(metrics.as_dict())
+
+    def summary(self):
+        with self._lock:
+            ttfts = sorted(m["ttft"] for m in self._items if m["ttft"] is not None)
+            totals = [m["total"] for m in self._items if m["total"] is not None]
+        if not ttfts:
+            return {"streams": len(totals), "ttft_avg": None, "ttft_p50": None, "ttft_p95": None, "total_avg": None}
+        return {
+            "streams": len(totals),
+            "ttft_avg": sum(ttfts) / len(ttfts),
+            "ttft_p50": ttfts[len(ttfts) // 2],
+            "ttft_p95": ttfts[min(len(ttfts) - 1, int(len(ttfts) * 0.95))],
+            "total_avg": sum(totals) / len(totals) if totals else None,
+        }
+
+
+_history = _MetricsHistory()
+
+
+def stream_summary():
+    """Aggregate time-to-first-token stats over recent streamed answers."""
+    return _history.summary()
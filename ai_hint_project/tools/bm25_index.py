@@ -0,0 +1,190 @@
+import os
+import re
+import json
+import numpy as np
+
+from ai_hint_project.tools.metadata_filter import allowed_ids
+
+# Files written next to the vector index by scripts/build_rag_store.py
+POSTINGS_FILE = "bm25.npz"
+BM25_META_FILE = "bm25.json"
+DEFAULT_K1 = 1.2
+DEFAULT_B = 0.75
+
+IDENTIFIER_RE = re.compile(r"[A-Za-z_$][\w$]*(?:\.[A-Za-z_$][\w$]*)*|\d+")
+CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from how i if in is it its of on or so that the their "
+    "then there these this to was what when where which while who why will with you your".split()
+)
+
+
+def tokenize(text):
+    """Lower-cased terms with Java identifiers kept whole and also split into their parts.
+
+    "Collectors.groupingBy" gives collectors.groupingby, collectors, groupingby
+    and grouping ("by" is a stopword); "ConcurrentHashMap" gives concurrenthashmap, concurrent,
+    hash and map. Exact identifiers match exactly, partial ones still score.
+    """
+    terms = []
+    for match in IDENTIFIER_RE.finditer(text):
+        word = match.group()
+        lower = word.lower()
+        if "." in word:
+            terms.append(lower)
+            parts = word.split(".")
+        else:
+            parts = [word]
+        for part in parts:
+            lower_part = part.lower()
+            if lower_part not in STOPWORDS:
+                terms.append(lower_part)
+            pieces = CAMEL_RE.findall(part)
+            if len(pieces) > 1:
+                terms.extend(p.lower() for p in pieces if p.lower() not in STOPWORDS)
+    return terms
+
+
+def build_bm25(chunks, k1=DEFAULT_K1, b=DEFAULT_B):
+    """Postings for chunks (dicts with "id" and "text") with BM25 weights precomputed.
+
+    Returns a dict of arrays in CSR layout: the postings of vocab[t] are
+    rows[offsets[t]:offsets[t + 1]] (positions in chunk_ids) and weights[...]
+    is each posting's full BM25 contribution (idf * saturated,
+    length-normalized tf). A query is then scored by summing a few weight
+    slices.
+    """
+    term_ids = {}
+    doc_terms = []
+    lengths = np.empty(len(chunks), dtype="float32")
+    for row, chunk in enumerate(chunks):
+        counts = {}
+        terms = tokenize(chunk["text"])
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        doc_terms.append(counts)
+        lengths[row] = len(terms)
+        for term in counts:
+            term_ids.setdefault(term, len(term_ids))
+
+    vocab = sorted(term_ids)
+    order = {term: i for i, term in enumerate(vocab)}
+    postings = [[] for _ in vocab]
+    for row, counts in enumerate(doc_terms):
+        for term, tf in counts.items():
+            postings[order[term]].append((row, tf))
+
+    n = len(chunks)
+    avg_length = float(lengths.mean()) if n else 0.0
+    offsets = np.zeros(len(vocab) + 1, dtype="int64")
+    offsets[1:] = np.cumsum([len(p) for p in postings])
+    rows = np.empty(offsets[-1], dtype="int32")
+    tfs = np.empty(offsets[-1], dtype="float32")
+    for t, plist in enumerate(postings):
+        if plist:
+            rows[offsets[t]:offsets[t + 1]], tfs[offsets[t]:offsets[t + 1]] = zip(*plist)
+    df = np.diff(offsets).astype("float32")
+    idf = np.log(1.0 + (n - df + 0.5) / (df + 0.5))
+    norm = k1 * (1.0 - b + b * lengths[rows] / avg_length) if n else np.empty(0, dtype="float32")
+    weights = np.repeat(idf, np.diff(offsets)) * tfs * (k1 + 1.0) / (tfs + norm)
+    return {
+        "vocab": np.array(vocab, dtype=str),
+        "offsets": offsets,
+        "rows": rows,
+        "chunk_ids": np.array([chunk["id"] for chunk in chunks], dtype="int64"),
+        "weights": weights.astype("float32"),
+    }
+
+
+def write_bm25_index(folder, chunks, built_at=None, k1=DEFAULT_K1, b=DEFAULT_B):
+    """Build and save the BM25 postings for a RAG store; returns its metadata for the manifest."""
+    arrays = build_bm25(chunks, k1=k1, b=b)
+    path = os.path.join(folder, POSTINGS_FILE)
+    with open(path + ".tmp", "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(path + ".tmp", path)
+    meta = {"k1": k1, "b": b, "chunks": len(chunks), "terms": len(arrays["vocab"]),
+            "postings": int(arrays["offsets"][-1]), "built_at": built_at}
+    with open(os.path.join(folder, BM25_META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    print(f"✅ BM25 index: {meta['terms']} terms, {meta['postings']} postings")
+    return meta
+
+
+def has_bm25_index(folder):
+    return os.path.exists(os.path.join(folder, POSTINGS_FILE))
+
+
+class BM25Index:
+    """In-memory BM25 postings (see build_bm25); search() returns chunk ids like a RetrieverBackend.
+
+    Scores are sums of precomputed posting weights, so a query touches only
+    the postings of its own terms.
+    """
+
+    def __init__(self, arrays, meta=None):
+        self.offsets = arrays["offsets"]
+        self.rows = arrays["rows"]
+        self.chunk_ids = arrays["chunk_ids"]
+        self.weights = arrays["weights"]
+        self.term_ids = {term: i for i, term in enumerate(arrays["vocab"].tolist())}
+        self.meta = meta or {}
+
+    @classmethod
+    def load(cls, folder):
+        with np.load(os.path.join(folder, POSTINGS_FILE)) as data:
+            arrays = {name: data[name] for name in data.files}
+        meta_path = os.path.join(folder, BM25_META_FILE)
+        meta = None
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        return cls(arrays, meta)
+
+    def _postings(self, query):
+        """(rows, weights) of every posting of the query's terms."""
+        slices = [slice(self.offsets[t], self.offsets[t + 1])
+                  for t in (self.term_ids.get(term) for term in set(tokenize(query))) if t is not None]
+        if not slices:
+            return None, None
+        if len(slices) == 1:
+            return self.rows[slices[0]], self.weights[slices[0]]
+        return np.concatenate([self.rows[s] for s in slices]), np.concatenate([self.weights[s] for s in slices])
+
+    def search(self, queries, k, id_filter=None):
+        """(scores, ids), both (n, k), best first; -1 ids where fewer than k chunks match.
+
+        id_filter is an optional FilterIndex bitmap of the chunk ids allowed.
+        """
+        out_scores = np.zeros((len(queries), k), dtype="float32")
+        out_ids = np.full((len(queries), k), -1, dtype="int64")
+        for row, query in enumerate(queries):
+            rows, weights = self._postings(query)
+            if rows is None:
+                continue
+            matched, inverse = np.unique(rows, return_inverse=True)
+            scores = np.bincount(inverse, weights=weights)
+            if id_filter is not None:
+                keep = allowed_ids(id_filter, self.chunk_ids[matched])
+                matched, scores = matched[keep], scores[keep]
+            top = np.argsort(-scores, kind="stable")[:k] if len(scores) <= k else \
+                np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            out_ids[row, :len(top)] = self.chunk_ids[matched[top]]
+            out_scores[row, :len(top)] = scores[top]
+        return out_scores, out_ids
+
+
+def reciprocal_rank_fusion(rankings, k=60, weights=None):
+    """Merge ranked id lists: each id scores sum(weight / (k + rank)); returns [(id, score)] best first.
+
+    Only ranks are used, so BM25 scores and L2 distances need no calibration.
+    """
+    weights = weights or [1.0] * len(rankings)
+    fused = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc in enumerate(ranking):
+            if doc == -1:
+                continue
+            fused[doc] = fused.get(doc, 0.0) + weight / (k + rank + 1)
+    return sorted(fused.items(), key=lambda item: -item[1])
@@ -0,0 +1,84 @@
+import os
+import json
+import mmap
+import numpy as np
+
+# On-disk layout: a UTF-8 blob of compact JSON records plus a sorted offsets table
+BLOB_FILE = "chunks.bin"
+OFFSETS_FILE = "chunks_idx.npy"
+OFFSETS_DTYPE = np.dtype([("id", "<i8"), ("offset", "<i8"), ("length", "<i8")])
+
+
+def write_chunk_store(folder, chunks):
+    """Write chunks (dicts with an "id") as blob + offsets table, replacing files atomically."""
+    ordered = sorted(chunks, key=lambda chunk: chunk["id"])
+    table = np.zeros(len(ordered), dtype=OFFSETS_DTYPE)
+    blob_path = os.path.join(folder, BLOB_FILE)
+    offset = 0
+    with open(blob_path + ".tmp", "wb") as f:
+        for row, chunk in enumerate(ordered):
+            data = json.dumps(chunk, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            f.write(data)
+            table[row] = (chunk["id"], offset, len(data))
+            offset += len(data)
+    offsets_path = os.path.join(folder, OFFSETS_FILE)
+    with open(offsets_path + ".tmp", "wb") as f:
+        np.save(f, table)
+    # Readers may have the old files mapped; replacing keeps their view valid
+    os.replace(blob_path + ".tmp", blob_path)
+    os.replace(offsets_path + ".tmp", offsets_path)
+
+
+def has_chunk_store(folder):
+    return os.path.exists(os.path.join(folder, BLOB_FILE)) and os.path.exists(os.path.join(folder, OFFSETS_FILE))
+
+
+class ChunkStore:
+    """Read-only, memory-mapped chunk lookup by id.
+
+    Opening is O(1): nothing is parsed until a chunk is requested, and the
+    pages are shared by every process on the host that maps the same files.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self._table = np.load(os.path.join(folder, OFFSETS_FILE), mmap_mode="r")
+        self._file = open(os.path.join(folder, BLOB_FILE), "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._blob = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self):
+        return len(self._table)
+
+    @property
+    def ids(self):
+        return self._table["id"]
+
+    def _row(self, row):
+        offset, length = int(self._table["offset"][row]), int(self._table["length"][row])
+        return json.loads(self._blob[offset:offset + length].decode("utf-8"))
+
+    def get(self, chunk_id, default=None):
+        row = int(np.searchsorted(self._table["id"], chunk_id))
+        if row < len(self._table) and self._table["id"][row] == chunk_id:
+            return self._row(row)
+        return default
+
+    def __getitem__(self, chunk_id):
+        chunk = self.get(chunk_id)
+        if chunk is None:
+            raise KeyError(chunk_id)
+        return chunk
+
+    def get_many(self, chunk_ids):
+        """Chunks for the given ids in the same order, skipping unknown ids (e.g. FAISS's -1)."""
+        return [chunk for chunk in (self.get(int(i)) for i in chunk_ids) if chunk is not None]
+
+    def __iter__(self):
+        for row in range(len(self._table)):
+            yield self._row(row)
+
+    def close(self):
+        if isinstance(self._blob, mmap.mmap):
+            self._blob.close()
+        self._file.close()
@@ -0,0 +1,274 @@
+import re
+from functools import lru_cache
+
+# all-MiniLM-L6-v2 embeds at most 256 word pieces, [CLS] and [SEP] included;
+# anything past that is silently dropped at encode time.
+TOKENIZER_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+MODEL_MAX_TOKENS = 256
+SPECIAL_TOKENS = 2
+MAX_CHUNK_TOKENS = MODEL_MAX_TOKENS - SPECIAL_TOKENS
+
+# Chunker types and their defaults
+CHUNKER_DEFAULTS = {
+    "words": {"max_words": 150, "overlap": 30},
+    "structured": {"max_tokens": 200, "overlap_tokens": 0, "min_tokens": 40},
+}
+DEFAULT_CHUNKER = "structured"
+
+FENCE_RE = re.compile(r"^\s*(```|~~~)")
+MARKDOWN_HEADING_RE = re.compile(r"^#{1,6}\s+\S")
+CODE_LINE_RE = re.compile(
+    r"[;{}]\s*(//.*)?$"                                   # statement / block delimiters
+    r"|^\s*(//|/\*|\*\s|\*/|@[A-Za-z]\w*)"                # comments, annotations
+    r"|^\s*(import|package|public|private|protected|class|interface|enum|return|def)\b.*[;:{(]"
+    r"|^( {4}|\t)\S"                                      # indented block
+)
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+APPROX_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def approximate_tokens(text):
+    """Rough WordPiece count: words and punctuation, long words counted as several pieces."""
+    return sum(1 + (len(piece) - 1) // 8 for piece in APPROX_TOKEN_RE.findall(text))
+
+
+@lru_cache(maxsize=None)
+def token_counter(tokenizer_name=TOKENIZER_NAME):
+    """Token-counting function using the embedding model's tokenizer.
+
+    Falls back to approximate_tokens() when transformers or the tokenizer files
+    aren't available, so chunking still works offline.
+    """
+    try:
+        from transformers import AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+        tokenizer.model_max_length = 1 << 30  # counting only: don't warn about long inputs
+    except Exception as e:
+        print(f"⚠️ Tokenizer {tokenizer_name} unavailable ({e}), approximating token counts")
+        return approximate_tokens
+
+    def count(text):
+        return len(tokenizer.encode(text, add_special_tokens=False))
+    return count
+
+
+def chunker_spec(chunker_type=DEFAULT_CHUNKER, **params):
+    """Full parameter dict for a chunker type, with defaults filled in and None values dropped."""
+    if chunker_type not in CHUNKER_DEFAULTS:
+        raise ValueError(f"Unknown chunker: {chunker_type} (choose from {', '.join(CHUNKER_DEFAULTS)})")
+    spec = {"type": chunker_type, **CHUNKER_DEFAULTS[chunker_type]}
+    spec.update({k: v for k, v in params.items() if v is not None and k in CHUNKER_DEFAULTS[chunker_type]})
+    if chunker_type == "structured" and not 0 < spec["max_tokens"] <= MAX_CHUNK_TOKENS:
+        raise ValueError(f"max_tokens must be between 1 and {MAX_CHUNK_TOKENS} for {TOKENIZER_NAME}")
+    return spec
+
+
+class WordChunker:
+    """Fixed windows of max_words whitespace-separated words, `overlap` words shared between windows."""
+
+    def __init__(self, max_words=150, overlap=30):
+        if not 0 <= overlap < max_words:
+            raise ValueError("overlap must be smaller than max_words")
+        self.max_words = max_words
+        self.overlap = overlap
+
+    def split(self, text):
+        """List of (section, text) pairs; this chunker doesn't track sections."""
+        words = text.split()
+        chunks = []
+        start = 0
+        while start < len(words):
+            chunks.append((None, " ".join(words[start:start + self.max_words])))
+            start += self.max_words - self.overlap
+        return chunks
+
+
+class StructuredChunker:
+    """Splits along the document's structure and packs the pieces into token-budgeted chunks.
+
+    Text is parsed into headings, code blocks (fenced, or runs of code-looking
+    lines) and paragraphs; paragraphs are split into sentences. Pieces are
+    packed greedily up to max_tokens as counted by the embedding tokenizer, so
+    nothing is truncated when the chunk is embedded. A heading closes the
+    current chunk (unless it is still under min_tokens) and is repeated at the
+    start of each of its chunks; code blocks are only split, on line
+    boundaries, when a single block is over budget. overlap_tokens carries
+    whole trailing sentences into the next chunk of the same section.
+    """
+
+    def __init__(self, max_tokens=200, overlap_tokens=0, min_tokens=40, count_tokens=None):
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.min_tokens = min_tokens
+        self.count_tokens = count_tokens or token_counter()
+
+    # ---- parsing ----------------------------------------------------------
+
+    def blocks(self, text):
+        """Yield (kind, text) with kind in heading / code / paragraph."""
+        lines = text.splitlines()
+        paragraph, code = [], []
+        in_fence = False
+
+        def flush():
+            if paragraph:
+                yield "paragraph", _join_lines(paragraph)
+                paragraph.clear()
+            if code:
+                yield "code", "\n".join(code).strip("\n")
+                code.clear()
+
+        for i, line in enumerate(lines):
+            if FENCE_RE.match(line):
+                if not in_fence:
+                    yield from flush()
+                else:
+                    yield "code", "\n".join(code).strip("\n")
+                    code.clear()
+                in_fence = not in_fence
+                continue
+            if in_fence:
+                code.append(line)
+                continue
+            stripped = line.strip()
+            if not stripped:
+                yield from flush()
+            elif self._is_heading(stripped, lines, i):
+                yield from flush()
+                yield "heading", stripped.lstrip("#").strip()
+            elif CODE_LINE_RE.search(line):
+                if paragraph:
+                    yield "paragraph", _join_lines(paragraph)
+                    paragraph.clear()
+                code.append(line.rstrip())
+            else:
+                if code:
+                    yield "code", "\n".join(code).strip("\n")
+                    code.clear()
+                paragraph.append(stripped)
+        yield from flush()
+
+    @staticmethod
+    def _is_heading(stripped, lines, i):
+        if MARKDOWN_HEADING_RE.match(stripped):
+            return True
+        # Short title-like line introducing real prose (scraped pages have no markup)
+        words = stripped.split()
+        if not 0 < len(words) <= 10 or stripped[-1] in ".,;:!?)»>|" or not stripped[0].isupper():
+            return False
+        following = next((line.strip() for line in lines[i + 1:i + 3] if line.strip()), "")
+        return len(following.split()) >= 12 and following[0].isupper() and not CODE_LINE_RE.search(following)
+
+    # ---- packing ----------------------------------------------------------
+
+    def _pieces(self, kind, text):
+        """Units that may not be split further unless they exceed the budget on their own."""
+        if kind == "code":
+            return [text]
+        return [s for s in SENTENCE_END_RE.split(text) if s.strip()]
+
+    def _split_oversized(self, text, budget, code):
+        """Break one piece that alone exceeds the budget: code by lines, prose by words."""
+        sep = "\n" if code else " "
+        parts = text.split("\n") if code else text.split()
+        out, current = [], []
+        for part in parts:
+            candidate = sep.join(current + [part])
+            if current and self.count_tokens(candidate) > budget:
+                out.append(sep.join(current))
+                current = [part]
+            else:
+                current.append(part)
+        if current:
+            out.append(sep.join(current))
+        # A single line/word can still be too long (minified code, URLs): cut by characters
+        return [piece for chunk in out for piece in self._hard_split(chunk, budget)]
+
+    def _hard_split(self, text, budget):
+        if self.count_tokens(text) <= budget:
+            return [text]
+        half = len(text) // 2
+        return self._hard_split(text[:half], budget) + self._hard_split(text[half:], budget)
+
+    def split(self, text):
+        """List of (section, text) pairs, each text within max_tokens."""
+        chunks = []
+        section = None
+        current, current_tokens = [], 0
+
+        def emit():
+            body = "\n".join(text for text, _ in current)
+            if body.strip():
+                prefix = f"{section}\n" if section and not body.startswith(section) else ""
+                chunks.append((section, prefix + body))
+
+        def header_tokens():
+            return self.count_tokens(section) + 1 if section else 0
+
+        for kind, block in self.blocks(text):
+            if kind == "heading":
+                if current and current_tokens >= self.min_tokens:
+                    emit()
+                    current, current_tokens = [], 0
+                elif current:
+                    # Too little text to stand alone: keep it and label the chunk with the new heading
+                    current.append((block, self.count_tokens(block)))
+                    current_tokens += current[-1][1]
+                section = block
+                continue
+
+            budget = self.max_tokens - header_tokens()
+            for piece in self._pieces(kind, block):
+                tokens = self.count_tokens(piece)
+                pieces = [(piece, tokens)] if tokens <= budget else [
+                    (part, self.count_tokens(part)) for part in self._split_oversized(piece, budget, kind == "code")
+                ]
+                for part, part_tokens in pieces:
+                    if current and current_tokens + part_tokens > budget:
+                        emit()
+                        current = self._overlap(current) if kind != "code" else []
+                        current_tokens = sum(t for _, t in current)
+                        if current_tokens + part_tokens > budget:
+                            current, current_tokens = [], 0
+                    current.append((part, part_tokens))
+                    current_tokens += part_tokens
+        if current:
+            emit()
+        return chunks
+
+    def _overlap(self, current):
+        """Trailing sentences of the chunk just emitted, up to overlap_tokens."""
+        kept, total = [], 0
+        for text, tokens in reversed(current):
+            if total + tokens > self.overlap_tokens:
+                break
+            kept.insert(0, (text, tokens))
+            total += tokens
+        return kept
+
+
+def _join_lines(lines):
+    # get_text("\n") splits inline elements onto their own lines ("Annotations\n, a form of ...")
+    text = " ".join(lines)
+    return re.sub(r"\s+([,.;:!?)])", r"\1", text)
+
+
+CHUNKERS = {
+    "words": WordChunker,
+    "structured": StructuredChunker,
+}
+
+
+def make_chunker(spec):
+    params = {k: v for k, v in spec.items() if k != "type"}
+    return CHUNKERS[spec["type"]](**params)
+
+
+@lru_cache(maxsize=8)
+def _cached_chunker(items):
+    return make_chunker(dict(items))
+
+
+def get_chunker(spec):
+    """Chunker for a spec, built once per process (tokenizer loading is not free)."""
+    return _cached_chunker(tuple(sorted(spec.items())))
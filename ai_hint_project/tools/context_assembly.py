@@ -0,0 +1,156 @@
+import re
+import hashlib
+
+from ai_hint_project.tools.chunking import SENTENCE_END_RE, token_counter
+
+DEFAULT_BUDGET = 800
+MIN_PASSAGE_TOKENS = 40  # a trimmed passage shorter than this is dropped instead
+MAX_OVERLAP_WORDS = 64   # longest repeated run looked for between neighbouring chunks
+
+
+class AssembledContext:
+    def __init__(self, text, passages, stats):
+        self.text = text
+        self.passages = passages  # [{"source", "chunk_indexes", "text", "tokens"}] in prompt order
+        self.stats = stats
+
+    def summary(self):
+        s = self.stats
+        return (f"{s['chunks']} chunks → {s['passages']} passages, {s['tokens_before']} → {s['tokens_after']} "
+                f"tokens (budget {s['budget']}, {s['duplicates']} duplicates, {s['overlap_words']} overlap words"
+                f"{', trimmed' if s['trimmed'] else ''})")
+
+
+def _overlap(previous, following, limit=MAX_OVERLAP_WORDS):
+    """Number of words at the start of `following` that repeat the end of `previous`."""
+    for size in range(min(len(previous), len(following), limit), 0, -1):
+        if previous[-size:] == following[:size]:
+            return size
+    return 0
+
+
+def _drop_words(text, count):
+    """text without its first `count` whitespace-separated words, keeping the remaining layout."""
+    if not count:
+        return text
+    match = re.match(r"\s*(?:\S+\s+){%d}" % count, text)
+    return text[match.end():] if match else ""
+
+
+def _strip_section(chunk):
+    """Chunk text without the section heading the structured chunker repeats on every chunk."""
+    text, section = chunk["text"], chunk.get("section")
+    if section and text.startswith(section + "\n"):
+        return text[len(section) + 1:]
+    return text
+
+
+class ContextAssembler:
+    """Turns retrieved chunks into the context block of the prompt.
+
+    Exact duplicates are dropped; chunks of the same source whose
+    chunk_index values are consecutive are merged into one passage, with the
+    words the chunker repeated between them (window overlap, repeated section
+    headings) removed. Passages keep the rank of their best chunk and are
+    added until the token budget is reached, the last one trimmed (at a
+    sentence boundary when possible). Tokens are counted with the embedding tokenizer, a
+    close enough proxy for the LLM's to size prompts.
+    """
+
+    def __init__(self, count_tokens=None, min_passage_tokens=MIN_PASSAGE_TOKENS):
+        self._count_tokens = count_tokens
+        self.min_passage_tokens = min_passage_tokens
+
+    def count_tokens(self, text):
+        if self._count_tokens is None:
+            self._count_tokens = token_counter()  # tokenizer loads on first use
+        return self._count_tokens(text)
+
+    def passages(self, hits):
+        """(passages in rank order, duplicates dropped, overlapping words removed)."""
+        seen, unique = set(), []
+        for rank, hit in enumerate(hits):
+            key = hit.get("id", hashlib.sha1(hit["text"].encode("utf-8")).hexdigest())
+            if key in seen:
+                continue
+            seen.add(key)
+            unique.append((rank, hit))
+        duplicates = len(hits) - len(unique)
+
+        by_source = {}
+        for rank, hit in unique:
+            by_source.setdefault(hit.get("source"), []).append((rank, hit))
+
+        passages, overlap_words = [], 0
+        for source, group in by_source.items():
+            group.sort(key=lambda item: (item[1].get("chunk_index") is None, item[1].get("chunk_index", 0)))
+            current = None
+            for rank, hit in group:
+                index = hit.get("chunk_index")
+                adjacent = (current is not None and index is not None and current["chunk_indexes"][-1] is not None
+                            and index - current["chunk_indexes"][-1] == 1)
+                if adjacent:
+                    text = _strip_section(hit) if hit.get("section") == current["section"] else hit["text"]
+                    repeated = _overlap(current["text"].split()[-MAX_OVERLAP_WORDS:], text.split())
+                    overlap_words += repeated
+                    rest = _drop_words(text, repeated)
+                    if rest:
+                        current["text"] += "\n" + rest
+                    current["chunk_indexes"].append(index)
+                    current["rank"] = min(current["rank"], rank)
+                else:
+                    current = {"source": source, "section": hit.get("section"), "chunk_indexes": [index],
+                               "text": hit["text"], "rank": rank}
+                    passages.append(current)
+        passages.sort(key=lambda passage: passage["rank"])
+        return passages, duplicates, overlap_words
+
+    def _trim(self, text, budget):
+        """Longest prefix within budget tokens, cut back to a sentence end if that keeps most of it."""
+        def prefix(words):
+            match = re.match(r"(?:\s*\S+){%d}" % words, text)
+            return match.group() if match else ""
+
+        low, high = 0, len(text.split())
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.count_tokens(prefix(middle)) <= budget:
+                low = middle
+            else:
+                high = middle - 1
+        kept = prefix(low)
+        ends = [match.start() for match in SENTENCE_END_RE.finditer(kept)]
+        if ends and ends[-1] >= 0.6 * len(kept):
+            return kept[:ends[-1]]
+        return kept
+
+    def assemble(self, hits, budget=DEFAULT_BUDGET):
+        tokens_before = self.count_tokens("\n".join(hit["text"] for hit in hits)) if hits else 0
+        passages, duplicates, overlap_words = self.passages(hits)
+
+        selected, used, trimmed = [], 0, False
+        for passage in passages:
+            text = passage["text"]
+            tokens = self.count_tokens(text)
+            remaining = budget - used
+            if tokens > remaining:
+                trimmed = True
+                if remaining < self.min_passage_tokens:
+                    break
+                text = self._trim(text, remaining)
+                tokens = self.count_tokens(text)
+                if tokens < self.min_passage_tokens:
+                    break
+            selected.append({"source": passage["source"], "chunk_indexes": passage["chunk_indexes"],
+                             "text": text, "tokens": tokens})
+            used += tokens
+            if trimmed:
+                break
+
+        text = "\n\n".join(passage["text"] for passage in selected)
+        stats = {
+            "chunks": len(hits), "passages": len(selected), "duplicates": duplicates,
+            "overlap_words": overlap_words, "tokens_before": tokens_before,
+            "tokens_after": self.count_tokens(text) if text else 0, "budget": budget, "trimmed": trimmed,
+        }
+        return AssembledContext(text, selected, stats)
@@ -0,0 +1,141 @@
+import numpy as np
+import faiss
+
+# Supported index types and their defaults. All indexes are addressed by chunk id.
+INDEX_DEFAULTS = {
+    "flat": {},
+    "ivf-flat": {"nlist": 256, "nprobe": 16},
+    "hnsw": {"m": 32, "ef_construction": 80, "ef_search": 64},
+    "ivf-pq": {"nlist": 256, "nprobe": 16, "pq_m": 48, "pq_bits": 8},
+}
+DEFAULT_TRAIN_SAMPLE = 20000
+MIN_POINTS_PER_CENTROID = 39  # below this faiss k-means warns about poor clustering
+MIN_PQ_BITS = 4
+
+
+def index_spec(index_type="flat", **params):
+    """Full parameter dict for an index type, with defaults filled in and None values dropped."""
+    if index_type not in INDEX_DEFAULTS:
+        raise ValueError(f"Unknown index type: {index_type} (choose from {', '.join(INDEX_DEFAULTS)})")
+    spec = {"type": index_type, **INDEX_DEFAULTS[index_type]}
+    spec.update({k: v for k, v in params.items() if v is not None and k in INDEX_DEFAULTS[index_type]})
+    return spec
+
+
+def needs_training(spec):
+    return spec["type"] in ("ivf-flat", "ivf-pq")
+
+
+def supports_removal(spec):
+    return spec["type"] != "hnsw"
+
+
+def _factory_string(spec, dim):
+    kind = spec["type"]
+    if kind == "flat":
+        return "IDMap2,Flat"
+    if kind == "hnsw":
+        return f"IDMap2,HNSW{spec['m']},Flat"
+    if kind == "ivf-flat":
+        return f"IVF{spec['nlist']},Flat"
+    if dim % spec["pq_m"]:
+        raise ValueError(f"pq_m={spec['pq_m']} must divide the vector dimension {dim}")
+    return f"IVF{spec['nlist']},PQ{spec['pq_m']}x{spec['pq_bits']}"
+
+
+def create_index(spec, dim):
+    index = faiss.index_factory(dim, _factory_string(spec, dim), faiss.METRIC_L2)
+    if spec["type"] == "hnsw":
+        faiss.downcast_index(index.index).hnsw.efConstruction = spec["ef_construction"]
+    return index
+
+
+def fit_spec_to_sample(spec, n_train):
+    """Shrink nlist / PQ bits so training on n_train points is meaningful.
+
+    Returns the adjusted spec, or a flat spec when there is too little data to
+    train an IVF index at all.
+    """
+    spec = dict(spec)
+    if not needs_training(spec):
+        return spec
+    max_nlist = n_train // MIN_POINTS_PER_CENTROID
+    max_pq_bits = int(np.log2(max_nlist)) if max_nlist >= 1 else 0
+    if max_nlist < 1 or (spec["type"] == "ivf-pq" and max_pq_bits < MIN_PQ_BITS):
+        print(f"⚠️ {n_train} vectors is too few to train {spec['type']}, using a flat index")
+        return index_spec("flat")
+    if spec["nlist"] > max_nlist:
+        print(f"⚠️ Reducing nlist from {spec['nlist']} to {max_nlist} for {n_train} training vectors")
+        spec["nlist"] = max_nlist
+    if spec["type"] == "ivf-pq" and spec["pq_bits"] > max_pq_bits:
+        print(f"⚠️ Reducing pq_bits from {spec['pq_bits']} to {max_pq_bits} for {n_train} training vectors")
+        spec["pq_bits"] = max_pq_bits
+    spec["nprobe"] = min(spec["nprobe"], spec["nlist"])
+    return spec
+
+
+def build_index(spec, vectors, ids, train_sample=DEFAULT_TRAIN_SAMPLE, batch_size=65536, seed=0):
+    """Create, train (on a random sample) and fill an index from stored vectors.
+
+    vectors may be a read-only memmap; rows are added in batches so the full
+    matrix never needs to be resident. Returns (index, effective_spec).
+    """
+    n, dim = vectors.shape
+    spec = fit_spec_to_sample(spec, min(n, train_sample))
+    index = create_index(spec, dim)
+    if needs_training(spec):
+        rng = np.random.default_rng(seed)
+        sample = np.sort(rng.choice(n, size=min(n, train_sample), replace=False))
+        index.train(np.ascontiguousarray(vectors[sample], dtype="float32"))
+        spec["train_size"] = int(len(sample))
+    for start in range(0, n, batch_size):
+        stop = min(start + batch_size, n)
+        index.add_with_ids(
+            np.ascontiguousarray(vectors[start:stop], dtype="float32"),
+            np.ascontiguousarray(ids[start:stop], dtype="int64"),
+        )
+    apply_search_params(index, spec)
+    return index, spec
+
+
+def apply_search_params(index, spec):
+    """Set query-time knobs (nprobe / efSearch) recorded in the manifest."""
+    params = faiss.ParameterSpace()
+    if "nprobe" in spec:
+        params.set_index_parameter(index, "nprobe", spec["nprobe"])
+    if "ef_search" in spec:
+        params.set_index_parameter(index, "efSearch", spec["ef_search"])
+    return index
+
+
+def filtered_search_parameters(index, spec, bitmap):
+    """SearchParameters restricting a search to the ids set in `bitmap` (uint8, little bit order).
+
+    The right parameter class is needed per index type, carrying the
+    manifest's nprobe / efSearch. Returns (params, selector): keep both and the
+    bitmap alive until the search returns.
+    """
+    bitmap = np.ascontiguousarray(bitmap, dtype="uint8")
+    selector = faiss.IDSelectorBitmap(len(bitmap) * 8, faiss.swig_ptr(bitmap))
+    kind = spec.get("type", "flat")
+    if kind in ("ivf-flat", "ivf-pq"):
+        nprobe = spec.get("nprobe") or faiss.extract_index_ivf(index).nprobe
+        params = faiss.SearchParametersIVF(sel=selector, nprobe=nprobe)
+    elif kind == "hnsw":
+        params = faiss.SearchParametersHNSW(sel=selector, efSearch=spec.get("ef_search", 16))
+    else:
+        params = faiss.SearchParameters(sel=selector)
+    return params, (selector, bitmap)
+
+
+def read_index_mmap(path):
+    """Open an index memory-mapped and read-only so processes on a host share its pages.
+
+    Falls back to a regular read if this faiss build can't map the index type.
+    """
+    flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+    try:
+        return faiss.read_index(path, flags)
+    except RuntimeError as e:
+        print(f"⚠️ Could not memory-map {path} ({e}), reading it into RAM")
+        return faiss.read_index(path)
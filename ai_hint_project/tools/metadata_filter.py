@@ -0,0 +1,138 @@
+import os
+import re
+import json
+import numpy as np
+
+# Files written next to the vector index by scripts/build_rag_store.py
+BITSETS_FILE = "filters.npz"
+FILTERS_META_FILE = "filters.json"
+
+# Question wording that points at one of the corpus tags (see SOURCE_METADATA in build_rag_store.py).
+# Only specific terms: a match restricts or boosts that topic's chunks in retrieval (see retrieval_tags).
+TOPIC_PATTERNS = {
+    "concurrency": r"\bthreads?\b|multi-?thread|concurren|synchroni[sz]|reentrantlock|executorservice|"
+                   r"completablefuture|\batomic(integer|long|reference)\b|deadlock|race condition|\bvolatile\b",
+    "streams": r"\bstreams? api\b|\.stream\(\)|\bcollectors\b|\bflatmap\b|functional interfaces?|"
+               r"lambda expressions?|\bparallel ?streams?\b",
+    "collections": r"collections? framework|\b(array|linked)list\b|hash(map|set|table)\b|tree(map|set)\b|"
+                   r"\bdeque\b|\biterator\b|\b(list|map|set|queue)\s*<",
+    "generics": r"\bgenerics?\b|type parameters?|bounded type|wildcards?\b|<\s*\?\s*(extends|super)\b|type erasure",
+    "annotations": r"\bannotations?\b|@override|@deprecated|@functionalinterface|@suppresswarnings",
+    "oop": r"\binheritance\b|\binherit|abstract class|polymorphi|\bsubclass|\bsuperclass|overrid|encapsulat|"
+           r"\bimplements\b",
+    "basics": r"\bsyntax\b|primitive types?|hello world|\bbeginners?\b|\bmain method\b",
+}
+TOPIC_RES = {tag: re.compile(pattern, re.IGNORECASE) for tag, pattern in TOPIC_PATTERNS.items()}
+
+
+def question_topics(question):
+    """Corpus tags whose patterns appear in the question, e.g. {"concurrency"} for thread questions."""
+    return {tag for tag, pattern in TOPIC_RES.items() if pattern.search(question)}
+
+
+def retrieval_tags(agent_cfg, question):
+    """(tags to restrict retrieval to, tags to boost) for this persona and question.
+
+    When the question touches one of the persona's `topics` (agents.yaml),
+    only chunks of those topics are searched, e.g. Spider-Gwen's thread
+    questions only search concurrency chunks. Topics outside the persona's
+    list are only a ranking prior.
+    """
+    detected = question_topics(question)
+    own = detected & set((agent_cfg or {}).get("topics", []))
+    if own:
+        return sorted(own), []
+    return [], sorted(detected)
+
+
+def _bitset(ids, size):
+    allowed = np.zeros(size, dtype=bool)
+    allowed[np.asarray(ids, dtype="int64")] = True
+    return np.packbits(allowed, bitorder="little")  # faiss.IDSelectorBitmap bit order
+
+
+def write_filter_index(folder, chunks, built_at=None):
+    """Per-tag and per-source chunk-id bitsets for a RAG store; returns metadata for the manifest."""
+    groups = {}
+    for chunk in chunks:
+        for tag in chunk.get("tags", []):
+            groups.setdefault(f"tag:{tag}", []).append(chunk["id"])
+        groups.setdefault(f"source:{chunk['source']}", []).append(chunk["id"])
+    size = max((chunk["id"] for chunk in chunks), default=-1) + 1
+    names = sorted(groups)
+    bitsets = np.stack([_bitset(groups[name], size) for name in names]) if names else \
+        np.zeros((0, (size + 7) // 8), dtype="uint8")
+    path = os.path.join(folder, BITSETS_FILE)
+    with open(path + ".tmp", "wb") as f:
+        np.savez(f, bitsets=bitsets)
+    os.replace(path + ".tmp", path)
+    meta = {"names": names, "size": size, "counts": {name: len(groups[name]) for name in names},
+            "built_at": built_at}
+    with open(os.path.join(folder, FILTERS_META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    print(f"✅ Filter index: {len(names)} tag/source bitsets over {size} ids")
+    return {"filters": len(names), "size": size, "built_at": built_at}
+
+
+def has_filter_index(folder):
+    return os.path.exists(os.path.join(folder, BITSETS_FILE))
+
+
+class FilterIndex:
+    """Precomputed chunk-id bitsets per tag and per source.
+
+    select() ORs the bitsets within tags and within sources and ANDs the two
+    groups, giving one bitmap (bit i set = chunk id i allowed) that backends
+    pass to the search itself rather than post-filtering the top k. RagTool
+    uses them as a restriction and, for boost tags, as a ranking prior.
+    """
+
+    def __init__(self, bitsets, meta):
+        self.bitsets = bitsets
+        self.meta = meta
+        self.size = meta["size"]
+        self.rows = {name: row for row, name in enumerate(meta["names"])}
+
+    @classmethod
+    def load(cls, folder):
+        with np.load(os.path.join(folder, BITSETS_FILE)) as data:
+            bitsets = data["bitsets"]
+        with open(os.path.join(folder, FILTERS_META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        return cls(bitsets, meta)
+
+    @property
+    def tags(self):
+        return [name[4:] for name in self.rows if name.startswith("tag:")]
+
+    def _union(self, names):
+        rows = [self.rows[name] for name in names if name in self.rows]
+        if not rows:
+            return np.zeros(self.bitsets.shape[1], dtype="uint8")
+        return np.bitwise_or.reduce(self.bitsets[rows], axis=0)
+
+    def select(self, tags=None, sources=None):
+        """Bitmap of allowed chunk ids, or None when no filter was asked for."""
+        if not tags and not sources:
+            return None
+        bitmap = None
+        if tags:
+            bitmap = self._union(f"tag:{tag}" for tag in tags)
+        if sources:
+            by_source = self._union(f"source:{source}" for source in sources)
+            bitmap = by_source if bitmap is None else bitmap & by_source
+        return bitmap
+
+    @staticmethod
+    def count(bitmap):
+        return int(np.unpackbits(bitmap).sum())
+
+
+def allowed_ids(bitmap, ids):
+    """Boolean mask of which ids have their bit set (ids outside the bitmap are not allowed)."""
+    ids = np.asarray(ids, dtype="int64")
+    inside = (ids >= 0) & (ids < len(bitmap) * 8)
+    mask = np.zeros(len(ids), dtype=bool)
+    safe = ids[inside]
+    mask[inside] = (bitmap[safe >> 3] >> (safe & 7)) & 1
+    return mask
@@ -0,0 +1,134 @@
+import os
+import threading
+import time
+
+from ai_hint_project.tools.rag_tool import build_rag_tool
+
+# 🔧 Default RAG store location (shared by every session in this process)
+base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+RAG_FOLDER = os.path.join(base_dir, "baeldung_scraper")
+
+
+class RagRegistry:
+    """Lazily builds the RAG tool once per process and shares it across sessions.
+
+    Loading the embedding model and opening the vector store takes several
+    seconds, so the first caller pays it (or a background warm-up does) and
+    every later caller gets the same instance.
+    """
+
+    def __init__(self, index_path, chunks_path):
+        self.index_path = index_path
+        self.chunks_path = chunks_path
+        self._lock = threading.Lock()
+        self._rag_tool = None
+        self._chunks = None
+        self._error = None
+        self._load_seconds = None
+        self._loaded_at = None
+        self._warmup_thread = None
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            rag_tool, chunks = build_rag_tool(
+                index_path=self.index_path,
+                chunks_path=self.chunks_path
+            )
+        except Exception as e:
+            self._error = str(e)
+            print(f"❌ RAG registry load failed: {e}")
+            raise
+        self._rag_tool, self._chunks = rag_tool, chunks
+        self._error = None
+        self._load_seconds = time.perf_counter() - start
+        self._loaded_at = time.time()
+        print(f"✅ RAG tool loaded in {self._load_seconds:.2f}s")
+
+    def get(self):
+        """Return the shared rag_tool, loading it on first use."""
+        if self._rag_tool is None:
+            with self._lock:
+                if self._rag_tool is None:
+                    self._load()
+        return self._rag_tool
+
+    def get_chunks(self):
+        self.get()
+        return self._chunks
+
+    def warm_up(self, background=True):
+        """Start loading ahead of the first question.
+
+        With background=True the load runs in a daemon thread and this returns
+        immediately; repeated calls while a warm-up is running are no-ops.
+        """
+        if self._rag_tool is not None:
+            return
+        if not background:
+            self.get()
+            return
+        with self._lock:
+            if self._warmup_thread is not None and self._warmup_thread.is_alive():
+                return
+            self._warmup_thread = threading.Thread(
+                target=self._safe_get, name="rag-warmup", daemon=True
+            )
+            self._warmup_thread.start()
+
+    def _safe_get(self):
+        try:
+            self.get()
+        except Exception:
+            pass  # recorded in self._error and reported by health()
+
+    def health(self):
+        """Report whether the retriever is loaded, loading or failed."""
+        if self._rag_tool is not None:
+            status = "ready"
+        elif self._warmup_thread is not None and self._warmup_thread.is_alive():
+            status = "loading"
+        elif self._error:
+            status = "error"
+        else:
+            status = "cold"
+        return {
+            "status": status,
+            "load_seconds": self._load_seconds,
+            "loaded_at": self._loaded_at,
+            "error": self._error,
+            "index_path": self.index_path,
+        }
+
+    def reset(self):
+        """Drop the loaded tool so the next call reloads it (e.g. after a rebuild)."""
+        with self._lock:
+            self._rag_tool = None
+            self._chunks = None
+            self._error = None
+            self._load_seconds = None
+            self._loaded_at = None
+
+
+# build_rag_store.py writes its index and manifest straight into RAG_FOLDER
+_registry = RagRegistry(
+    index_path=RAG_FOLDER,
+    chunks_path=os.path.join(RAG_FOLDER, "chunks.json")
+)
+
+
+def get_rag_tool():
+    """Process-wide rag_tool, built on first use."""
+    return _registry.get()
+
+
+def warm_up_rag(background=True):
+    _registry.warm_up(background=background)
+
+
+def rag_health():
+    return _registry.health()
+
+
+def reset_rag():
+    _registry.reset()
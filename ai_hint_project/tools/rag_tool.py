@@ -1,9 +1,25 @@
 import os
 import json
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
 import streamlit as st
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS, Chroma
+from ai_hint_project.tools.chunk_store import ChunkStore, has_chunk_store
+from ai_hint_project.tools.retrievers import open_backend
+from ai_hint_project.tools.bm25_index import BM25Index, has_bm25_index, reciprocal_rank_fusion
+from ai_hint_project.tools.metadata_filter import FilterIndex, has_filter_index
+from ai_hint_project.tools.reranker import CrossEncoderReranker, DEFAULT_RERANK_MODEL, DEFAULT_BUDGET_MS, DEFAULT_DEPTH
+
+RETRIEVAL_MODES = ("vector", "bm25", "hybrid")
+# Embedding models whose tokenizer lowercases its input (any "*uncased*" model counts too)
+UNCASED_MODELS = {
+    "sentence-transformers/all-MiniLM-L6-v2", "sentence-transformers/all-MiniLM-L12-v2",
+    "sentence-transformers/paraphrase-MiniLM-L6-v2",
+}
+DEFAULT_TOPIC_WEIGHT = 0.1  # on-topic ranking weight in the fusion: lifts a tagged chunk about five places
 
 def get_embeddings():
     use_openai = st.secrets.get("USE_OPENAI", "false").lower() == "true"
@@ -17,33 +33,289 @@ def get_embeddings():
 
     return HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
 
-def build_rag_tool(index_path, chunks_path):
-    embeddings = get_embeddings()
-
-    vectorstore = None
-    try:
-        vectorstore = Chroma(
-            persist_directory=index_path,
-            embedding_function=embeddings
-        )
-        print("✅ Loaded Chroma index")
-    except Exception as e:
-        print(f"⚠️ Chroma load failed: {e}")
-        try:
-            vectorstore = FAISS.load_local(
-                folder_path=index_path,
-                embeddings=embeddings
-            )
-            print("✅ Fallback to FAISS index")
-        except Exception as e2:
-            print(f"❌ FAISS load failed: {e2}")
-            raise RuntimeError("No valid vectorstore found")
+def embedding_model_name(embeddings):
+    return getattr(embeddings, "model_name", None) or getattr(embeddings, "model", None)
 
+def load_chunks(folder, chunks_path):
+    """Memory-mapped chunk store if the build has one, else chunks.json keyed by id (or position)."""
+    if has_chunk_store(folder):
+        return ChunkStore(folder)
     with open(chunks_path, "r") as f:
         chunks = json.load(f)
+    return {chunk.get("id", position): chunk for position, chunk in enumerate(chunks)}
+
+def is_uncased(embeddings):
+    """Whether case never changes this model's embedding (unknown models are treated as cased)."""
+    name = embedding_model_name(embeddings) or ""
+    return name in UNCASED_MODELS or "uncased" in name.lower()
+
+def normalize_query(text, lowercase=False):
+    """Cache key for a query: spacing never changes the embedding, case only doesn't for uncased models."""
+    text = " ".join(text.split())
+    return text.lower() if lowercase else text
+
+
+class QueryEmbeddingCache:
+    """LRU cache of query vectors keyed on normalized text (lowercased only for uncased models).
+
+    Misses from a batch are embedded together in a single embed_documents call.
+    """
+
+    def __init__(self, embeddings, max_size=2048):
+        self.embeddings = embeddings
+        self.max_size = max_size
+        self.lowercase = is_uncased(embeddings)
+        self._lock = threading.Lock()
+        self._vectors = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def embed(self, queries):
+        keys = [normalize_query(q, self.lowercase) for q in queries]
+        with self._lock:
+            found = {key: self._vectors[key] for key in keys if key in self._vectors}
+            for key in found:
+                self._vectors.move_to_end(key)
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        if missing:
+            vectors = np.asarray(self.embeddings.embed_documents(missing), dtype="float32")
+            with self._lock:
+                for key, vector in zip(missing, vectors):
+                    self._vectors[key] = vector
+                    found[key] = vector
+                while len(self._vectors) > self.max_size:
+                    self._vectors.popitem(last=False)
+        with self._lock:
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+        return np.stack([found[key] for key in keys])
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"size": len(self._vectors), "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+class RagTool:
+    """Retrieval over one backend: rag_tool(query) returns context text.
+
+    search_many() embeds and searches a batch of queries in one vectorized
+    call. Time spent embedding, searching and fetching chunks is accumulated
+    in timings (and the last call in last_timings).
+
+    With a BM25 index (lexical) the mode can be "bm25" or "hybrid": hybrid
+    takes the top fusion_depth of both the vector and the BM25 ranking and
+    merges them with reciprocal rank fusion, so exact identifiers such as
+    ConcurrentHashMap are found even when the embedding misses them.
+
+    With a FilterIndex (filters), tags and sources restrict the search to
+    chunks carrying any of those tags and from any of those articles, inside
+    the search itself (id bitsets); a restriction that matches no chunk, or
+    finds nothing, falls back to the full index. boost_tags are only a prior:
+    a second search restricted to those chunks is fused (topic_weight) with
+    the main one, so they rank higher but a strong match without the tag is
+    never dropped.
+
+    With a reranker, rerank_depth candidates are retrieved and re-scored by
+    the cross-encoder down to k (bi-encoder order if it runs out of budget).
+    """
 
-    def rag_tool(query):
-        docs = vectorstore.similarity_search(query, k=4)
-        return "\n".join([doc.page_content for doc in docs])
+    def __init__(self, embeddings, retriever, chunks, k=4, lexical=None, mode="vector", fusion_depth=20,
+                 filters=None, reranker=None, rerank_depth=DEFAULT_DEPTH, topic_weight=DEFAULT_TOPIC_WEIGHT):
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {mode} (choose from {', '.join(RETRIEVAL_MODES)})")
+        if mode != "vector" and lexical is None:
+            raise ValueError(f"Retrieval mode {mode} needs a BM25 index")
+        self.embeddings = embeddings
+        self.retriever = retriever
+        self.chunks = chunks
+        self.k = k
+        self.lexical = lexical
+        self.mode = mode
+        self.fusion_depth = fusion_depth
+        self.filters = filters if getattr(retriever, "supports_filter", False) else None
+        self.topic_weight = topic_weight
+        self.reranker = reranker
+        self.rerank_depth = rerank_depth
+        self.query_cache = QueryEmbeddingCache(embeddings)
+        self.timings = {"calls": 0, "queries": 0, "embed": 0.0, "search": 0.0, "fetch": 0.0, "rerank": 0.0,
+                        "filtered": 0, "filter_fallbacks": 0, "boosted": 0}
+        self.last_timings = {}
+        self._timing_lock = threading.Lock()
+
+    def embed_query(self, query):
+        """Cached query vector (shared with callers such as the answer cache)."""
+        return self.query_cache.embed([query])[0]
+
+    def search_many(self, queries, k=None, tags=None, sources=None, boost_tags=None):
+        """Top-k chunks for each query: a list of lists of chunk dicts.
+
+        Each chunk has a "distance" key (L2 distance, None for chunks only
+        BM25 found) and, in bm25/hybrid mode or with boost_tags, a "score"
+        key. tags and sources restrict the search to chunks carrying any of
+        those tags and from any of those articles; boost_tags rank chunks
+        carrying any of them higher.
+        """
+        k = k or self.k
+        depth = max(k, self.rerank_depth) if self.reranker is not None else k
+        start = time.perf_counter()
+        vectors = self.query_cache.embed(queries) if self.mode != "bm25" else None
+        embedded = time.perf_counter()
+        id_filter = self._id_filter(tags, sources)
+        ranked = self._rank(queries, vectors, depth, id_filter)
+        if id_filter is not None:
+            empty = [row for row, hits in enumerate(ranked) if not hits]
+            if empty:
+                fallback = self._rank([queries[row] for row in empty],
+                                      vectors[empty] if vectors is not None else None, depth)
+                for row, hits in zip(empty, fallback):
+                    ranked[row] = hits
+                self._count("filter_fallbacks", len(empty))
+            self._count("filtered", len(queries))
+        topic_filter = self._id_filter(boost_tags, sources) if boost_tags else None
+        if topic_filter is not None:
+            if id_filter is not None:
+                topic_filter = topic_filter & id_filter  # the prior never reaches outside the restriction
+            on_topic = self._rank(queries, vectors, depth, topic_filter)
+            ranked = [self._boost(hits, topic_hits, depth) for hits, topic_hits in zip(ranked, on_topic)]
+            self._count("boosted", len(queries))
+        searched = time.perf_counter()
+        results = []
+        for row in ranked:
+            hits = []
+            for chunk_id, distance, score in row:
+                chunk = self.chunks.get(int(chunk_id))
+                if chunk is not None:
+                    hit = dict(chunk, distance=distance)
+                    if score is not None:
+                        hit["score"] = score
+                    hits.append(hit)
+            results.append(hits)
+        fetched = time.perf_counter()
+        if self.reranker is not None:
+            results = [self.reranker.rerank(query, hits, k)[0] for query, hits in zip(queries, results)]
+        reranked = time.perf_counter()
+        self._record(len(queries), embedded - start, searched - embedded, fetched - searched, reranked - fetched)
+        return results
+
+    def _id_filter(self, tags, sources):
+        """Bitmap of allowed chunk ids, or None to search everything."""
+        if (not tags and not sources) or self.filters is None:
+            return None
+        bitmap = self.filters.select(tags, sources)
+        if not FilterIndex.count(bitmap):
+            print(f"⚠️ No chunks match tags={tags} sources={sources}, searching everything")
+            self._count("filter_fallbacks", 1)
+            return None
+        return bitmap
+
+    def _boost(self, hits, topic_hits, k):
+        """Fuse the unrestricted ranking with the on-topic one: chunks in both rise, neither list is dropped."""
+        if not topic_hits:
+            return hits
+        known = {i: distance for i, distance, _ in topic_hits}
+        known.update((i, distance) for i, distance, _ in hits)
+        fused = reciprocal_rank_fusion([[i for i, _, _ in hits], [i for i, _, _ in topic_hits]],
+                                       weights=[1.0, self.topic_weight])[:k]
+        return [(i, known[i], score) for i, score in fused]
+
+    def _rank(self, queries, vectors, k, id_filter=None):
+        """Per query, the top-k [(chunk id, distance or None, score or None)]."""
+        if self.mode == "vector":
+            distances, ids = self.retriever.search(vectors, k, id_filter=id_filter)
+            return [[(i, float(d), None) for d, i in zip(row_d, row_ids) if i != -1]
+                    for row_d, row_ids in zip(distances, ids)]
+        if self.mode == "bm25":
+            scores, ids = self.lexical.search(queries, k, id_filter=id_filter)
+            return [[(i, None, float(s)) for s, i in zip(row_s, row_ids) if i != -1]
+                    for row_s, row_ids in zip(scores, ids)]
+        depth = max(k, self.fusion_depth)
+        distances, vector_ids = self.retriever.search(vectors, depth, id_filter=id_filter)
+        _, lexical_ids = self.lexical.search(queries, depth, id_filter=id_filter)
+        ranked = []
+        for row_d, row_v, row_l in zip(distances, vector_ids, lexical_ids):
+            distance_of = {int(i): float(d) for d, i in zip(row_d, row_v) if i != -1}
+            fused = reciprocal_rank_fusion([row_v.tolist(), row_l.tolist()])[:k]
+            ranked.append([(i, distance_of.get(i), score) for i, score in fused])
+        return ranked
+
+    def _count(self, key, n):
+        with self._timing_lock:
+            self.timings[key] += n
+
+    def _record(self, queries, embed, search, fetch, rerank=0.0):
+        with self._timing_lock:
+            self.timings["calls"] += 1
+            self.timings["queries"] += queries
+            self.timings["embed"] += embed
+            self.timings["search"] += search
+            self.timings["fetch"] += fetch
+            self.timings["rerank"] += rerank
+            self.last_timings = {"queries": queries, "embed": embed, "search": search, "fetch": fetch,
+                                 "rerank": rerank}
+
+    def __call__(self, query, tags=None, sources=None, boost_tags=None):
+        hits = self.search_many([query], tags=tags, sources=sources, boost_tags=boost_tags)[0]
+        return "\n".join(chunk["text"] for chunk in hits)
+
+    def stats(self):
+        return {"mode": self.mode, "timings": dict(self.timings), "last": dict(self.last_timings),
+                "query_cache": self.query_cache.stats(),
+                "reranker": self.reranker.stats() if self.reranker is not None else None}
+
+
+def open_lexical(folder, manifest):
+    """The BM25 index of this build, or None if it is missing or from another build."""
+    if not has_bm25_index(folder):
+        return None
+    lexical = BM25Index.load(folder)
+    if lexical.meta.get("built_at") != manifest.get("built_at"):
+        print("⚠️ BM25 index is from another build, using vector retrieval only")
+        return None
+    return lexical
+
+
+def open_filters(folder, manifest):
+    """The tag/source bitsets of this build, or None if they are missing or from another build."""
+    if not has_filter_index(folder):
+        return None
+    filters = FilterIndex.load(folder)
+    if filters.meta.get("built_at") != manifest.get("built_at"):
+        print("⚠️ Filter index is from another build, tag filters are disabled")
+        return None
+    return filters
+
+
+def build_rag_tool(index_path, chunks_path, backend=None, mode=None):
+    """Build the RagTool over one retriever backend.
+
+    The backend ("faiss", "numpy" or "chroma"; default from the RAG_BACKEND
+    secret) is checked against the index manifest so queries never hit an
+    index built with a different embedding model or dimension. The retrieval
+    mode (default from the RAG_RETRIEVAL secret, "hybrid") falls back to
+    "vector" when the build has no BM25 index. Cross-encoder re-ranking is
+    off unless RAG_RERANK is "true" (RAG_RERANK_MODEL, RAG_RERANK_BUDGET_MS
+    and RAG_RERANK_DEPTH tune it); its model loads in the background.
+    """
+    embeddings = get_embeddings()
+    backend_name = backend or st.secrets.get("RAG_BACKEND", "faiss")
+    mode = mode or st.secrets.get("RAG_RETRIEVAL", "hybrid")
+    dim = len(embeddings.embed_query("dimension check"))
+    retriever = open_backend(index_path, backend_name, model_name=embedding_model_name(embeddings), dim=dim)
+    chunks = load_chunks(index_path, chunks_path)
+    lexical = open_lexical(index_path, retriever.manifest) if mode != "vector" else None
+    if lexical is None:
+        mode = "vector"
+    filters = open_filters(index_path, retriever.manifest)
+    reranker = None
+    if st.secrets.get("RAG_RERANK", "false").lower() == "true":
+        reranker = CrossEncoderReranker(
+            model_name=st.secrets.get("RAG_RERANK_MODEL", DEFAULT_RERANK_MODEL),
+            budget_ms=float(st.secrets.get("RAG_RERANK_BUDGET_MS", DEFAULT_BUDGET_MS)),
+        )
+        reranker.warm_up()
+    print(f"🔎 Retrieval mode: {mode}, tag filters: {'on' if filters is not None else 'off'}, "
+          f"re-ranking: {reranker.model_name if reranker is not None else 'off'}")
 
-    return rag_tool, chunks
+    return RagTool(embeddings, retriever, chunks, lexical=lexical, mode=mode, filters=filters, reranker=reranker,
+                   rerank_depth=int(st.secrets.get("RAG_RERANK_DEPTH", DEFAULT_DEPTH))), chunks
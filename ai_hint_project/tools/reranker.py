@@ -0,0 +1,115 @@
+import threading
+import time
+
+DEFAULT_RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+DEFAULT_BUDGET_MS = 300
+DEFAULT_DEPTH = 20
+DEFAULT_BATCH_SIZE = 16
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def load_cross_encoder(model_name=DEFAULT_RERANK_MODEL, max_length=256):
+    """Process-wide CrossEncoder, loaded once per model name."""
+    with _models_lock:
+        model = _models.get(model_name)
+        if model is None:
+            from sentence_transformers import CrossEncoder
+            model = _models[model_name] = CrossEncoder(model_name, max_length=max_length, device="cpu")
+        return model
+
+
+class CrossEncoderReranker:
+    """Re-scores retrieved candidates with a small CPU cross-encoder, within a latency budget.
+
+    Candidates are scored in batches. Before each batch the expected batch
+    time (a running average) is checked against what is left of budget_ms;
+    if it wouldn't fit, or the model is still loading, the candidates keep
+    their bi-encoder order. A batch already running is never interrupted, so
+    the budget is enforced to within one batch.
+    """
+
+    def __init__(self, model_name=DEFAULT_RERANK_MODEL, budget_ms=DEFAULT_BUDGET_MS, batch_size=DEFAULT_BATCH_SIZE,
+                 max_length=256):
+        self.model_name = model_name
+        self.budget_ms = budget_ms
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.model = None
+        self._loader = None
+        self._lock = threading.Lock()
+        self._batch_ms = None  # running average of one batch
+        self.stats_counts = {"calls": 0, "reranked": 0, "fallback_budget": 0, "fallback_loading": 0,
+                             "fallback_error": 0, "rerank_ms": 0.0}
+
+    def warm_up(self, background=True):
+        """Load the model (in a daemon thread by default) so the first request isn't the one paying for it."""
+        with self._lock:
+            if self.model is not None:
+                return
+            if self._loader is None or not self._loader.is_alive():
+                self._loader = threading.Thread(target=self._load, name="reranker-warmup", daemon=True)
+                self._loader.start()
+            loader = self._loader
+        if not background:
+            loader.join()
+
+    def _load(self):
+        try:
+            model = load_cross_encoder(self.model_name, self.max_length)
+            model.predict([("warm up", "warm up")], batch_size=1)
+            self.model = model
+            print(f"✅ Re-ranker loaded: {self.model_name}")
+        except Exception as e:
+            print(f"⚠️ Re-ranker unavailable ({e}), keeping bi-encoder order")
+
+    def _count(self, key, value=1):
+        with self._lock:
+            self.stats_counts[key] += value
+
+    def rerank(self, query, hits, k):
+        """(top-k hits, info). info["reranked"] is False when the bi-encoder order was kept."""
+        self._count("calls")
+        started = time.perf_counter()
+        if self.model is None:
+            self.warm_up()
+            self._count("fallback_loading")
+            return hits[:k], {"reranked": False, "reason": "loading", "ms": 0.0}
+
+        scores = []
+        for start in range(0, len(hits), self.batch_size):
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            expected_ms = self._batch_ms or 0.0
+            if elapsed_ms + expected_ms > self.budget_ms:
+                self._count("fallback_budget")
+                return hits[:k], {"reranked": False, "reason": "budget", "ms": elapsed_ms}
+            batch = hits[start:start + self.batch_size]
+            batch_started = time.perf_counter()
+            try:
+                scores.extend(self.model.predict([(query, hit["text"]) for hit in batch],
+                                                 batch_size=self.batch_size, show_progress_bar=False))
+            except Exception as e:
+                print(f"⚠️ Re-ranking failed ({e}), keeping bi-encoder order")
+                self._count("fallback_error")
+                return hits[:k], {"reranked": False, "reason": "error", "ms": elapsed_ms}
+            batch_ms = (time.perf_counter() - batch_started) * 1000 * self.batch_size / len(batch)
+            with self._lock:
+                self._batch_ms = batch_ms if self._batch_ms is None else 0.8 * self._batch_ms + 0.2 * batch_ms
+
+        ms = (time.perf_counter() - started) * 1000
+        if ms > self.budget_ms:  # the last batch ran over: results are ready, but report it
+            self._count("fallback_budget")
+            return hits[:k], {"reranked": False, "reason": "budget", "ms": ms}
+        order = sorted(range(len(hits)), key=lambda i: -float(scores[i]))[:k]
+        self._count("reranked")
+        self._count("rerank_ms", ms)
+        return [dict(hits[i], rerank_score=float(scores[i])) for i in order], {"reranked": True, "ms": ms}
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.stats_counts)
+            stats["batch_ms"] = self._batch_ms
+        stats["loaded"] = self.model is not None
+        stats["avg_rerank_ms"] = stats["rerank_ms"] / stats["reranked"] if stats["reranked"] else None
+        return stats
@@ -0,0 +1,181 @@
+import os
+import json
+import numpy as np
+import faiss
+from ai_hint_project.tools.faiss_index import apply_search_params, filtered_search_parameters, read_index_mmap
+from ai_hint_project.tools.metadata_filter import allowed_ids
+
+# Files written by scripts/build_rag_store.py
+INDEX_FILE = "baeldung_index.faiss"
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.npy"
+VECTOR_IDS_FILE = "vector_ids.npy"
+CHROMA_DIR = "chroma_index"
+CHROMA_COLLECTION = "rag_chunks"
+
+
+class IndexMismatchError(RuntimeError):
+    """The index on disk doesn't match the embedding model used for queries."""
+
+
+def model_key(name):
+    """'sentence-transformers/all-MiniLM-L6-v2' and 'all-MiniLM-L6-v2' name the same model."""
+    return (name or "").split("/")[-1]
+
+
+def load_manifest(folder):
+    """Read manifest.json, or infer one for pre-manifest builds (plain IndexFlatL2 + chunks.json)."""
+    path = os.path.join(folder, MANIFEST_FILE)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    index_path = os.path.join(folder, INDEX_FILE)
+    if not os.path.exists(index_path):
+        raise RuntimeError(f"No RAG index in {folder}; run ai_hint_project/scripts/build_rag_store.py")
+    index = faiss.read_index(index_path)
+    print("⚠️ No manifest.json, assuming a legacy all-MiniLM-L6-v2 flat index aligned with chunks.json")
+    return {"model": "all-MiniLM-L6-v2", "legacy": True, "index": {"type": "flat", "dim": index.d, "ntotal": index.ntotal}}
+
+
+def check_manifest(manifest, model_name, dim):
+    """Refuse to query an index built with another embedding model or dimension."""
+    if model_key(manifest.get("model")) != model_key(model_name):
+        raise IndexMismatchError(
+            f"Index was built with {manifest.get('model')} but queries use {model_name}; rebuild the index"
+        )
+    index_dim = manifest.get("index", {}).get("dim")
+    if index_dim is not None and index_dim != dim:
+        raise IndexMismatchError(f"Index dimension {index_dim} != query embedding dimension {dim}")
+
+
+class RetrieverBackend:
+    """Nearest-neighbour search over chunk vectors, returning chunk ids.
+
+    search() takes an (n, dim) float32 matrix and returns (distances, ids),
+    both (n, k), with -1 ids for missing results. Backends with
+    supports_filter also take id_filter, a FilterIndex bitmap of the chunk
+    ids that may be returned.
+    """
+
+    name = "base"
+    supports_filter = False
+
+    def __init__(self, folder, manifest):
+        self.folder = folder
+        self.manifest = manifest
+
+    def search(self, vectors, k, id_filter=None):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class FaissBackend(RetrieverBackend):
+    """Memory-mapped FAISS index (flat / IVF / HNSW / PQ, see faiss_index.py)."""
+
+    name = "faiss"
+    supports_filter = True
+
+    def __init__(self, folder, manifest):
+        super().__init__(folder, manifest)
+        self.index = read_index_mmap(os.path.join(folder, INDEX_FILE))
+        apply_search_params(self.index, manifest.get("index", {}))
+
+    def search(self, vectors, k, id_filter=None):
+        vectors = np.ascontiguousarray(vectors, dtype="float32")
+        if id_filter is None:
+            return self.index.search(vectors, k)
+        # The selector is applied inside the scan, so k results come from the allowed ids only
+        params, _selector = filtered_search_parameters(self.index, self.manifest.get("index", {}), id_filter)
+        return self.index.search(vectors, k, params=params)
+
+
+class NumpyBackend(RetrieverBackend):
+    """Exact L2 search over the stored vectors.npy with plain NumPy (memory-mapped)."""
+
+    name = "numpy"
+    supports_filter = True
+
+    def __init__(self, folder, manifest, block=65536):
+        super().__init__(folder, manifest)
+        self.vectors = np.load(os.path.join(folder, VECTORS_FILE), mmap_mode="r")
+        self.ids = np.load(os.path.join(folder, VECTOR_IDS_FILE))
+        self.block = block
+        self._norms = None
+
+    def search(self, vectors, k, id_filter=None):
+        queries = np.asarray(vectors, dtype="float32")
+        if self._norms is None:
+            self._norms = np.concatenate([np.empty(0, dtype="float32")] + [
+                np.einsum("ij,ij->i", self.vectors[s:s + self.block], self.vectors[s:s + self.block])
+                for s in range(0, len(self.ids), self.block)
+            ])
+        best_d = np.full((len(queries), k), np.inf, dtype="float32")
+        best_i = np.full((len(queries), k), -1, dtype="int64")
+        if not len(self.ids):
+            return best_d, best_i
+        kth = min(k, len(self.ids)) - 1
+        query_norms = np.einsum("ij,ij->i", queries, queries)[:, None]
+        for start in range(0, len(self.ids), self.block):
+            block = np.asarray(self.vectors[start:start + self.block])
+            dists = query_norms - 2 * queries @ block.T + self._norms[start:start + len(block)][None, :]
+            if id_filter is not None:
+                dists[:, ~allowed_ids(id_filter, self.ids[start:start + len(block)])] = np.inf
+            merged_d = np.concatenate([best_d, dists], axis=1)
+            merged_i = np.concatenate([best_i, np.broadcast_to(self.ids[start:start + len(block)], dists.shape)], axis=1)
+            top = np.argpartition(merged_d, kth, axis=1)[:, :k]
+            best_d = np.take_along_axis(merged_d, top, axis=1)
+            best_i = np.take_along_axis(merged_i, top, axis=1)
+        order = np.argsort(best_d, axis=1)
+        best_d, best_i = np.take_along_axis(best_d, order, axis=1), np.take_along_axis(best_i, order, axis=1)
+        best_i[np.isinf(best_d)] = -1  # fewer than k allowed ids
+        return best_d, best_i
+
+
+class ChromaBackend(RetrieverBackend):
+    """Chroma collection populated by build_chroma_index.py from the same stored vectors."""
+
+    name = "chroma"
+
+    def __init__(self, folder, manifest):
+        super().__init__(folder, manifest)
+        import chromadb
+
+        built_from = manifest.get("backends", {}).get("chroma", {}).get("source_built_at")
+        if built_from != manifest.get("built_at"):
+            raise IndexMismatchError("Chroma collection is out of date; run build_chroma_index.py")
+        client = chromadb.PersistentClient(path=os.path.join(folder, CHROMA_DIR))
+        self.collection = client.get_collection(CHROMA_COLLECTION)
+
+    def search(self, vectors, k, id_filter=None):
+        if id_filter is not None:
+            raise ValueError("The chroma backend doesn't support id filters")
+        result = self.collection.query(
+            query_embeddings=np.asarray(vectors, dtype="float32").tolist(), n_results=k, include=["distances"]
+        )
+        distances = np.full((len(vectors), k), np.inf, dtype="float32")
+        ids = np.full((len(vectors), k), -1, dtype="int64")
+        for row, (row_ids, row_d) in enumerate(zip(result["ids"], result["distances"])):
+            ids[row, :len(row_ids)] = [int(i) for i in row_ids]
+            distances[row, :len(row_d)] = row_d
+        return distances, ids
+
+
+BACKENDS = {
+    "faiss": FaissBackend,
+    "numpy": NumpyBackend,
+    "chroma": ChromaBackend,
+}
+
+
+def open_backend(folder, name="faiss", model_name=None, dim=None):
+    """Open a retriever backend after checking its manifest against the query embedder."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown retriever backend: {name} (choose from {', '.join(BACKENDS)})")
+    manifest = load_manifest(folder)
+    if model_name is not None:
+        check_manifest(manifest, model_name, dim)
+    backend = BACKENDS[name](folder, manifest)
+    print(f"✅ Opened {name} retriever: {manifest.get('index', {})}")
+    return backend
@@ -5,8 +5,8 @@ Gamified learning experience with persona-based tutoring
 import streamlit as st
 import sys
 import os
-import yaml
 import traceback
+import uuid
 from datetime import datetime
 
 # Setup paths
@@ -16,13 +16,14 @@ sys.path.insert(0, base_dir)
 # ==========================
 # IMPORT UTILITIES
 # ==========================
-from utils.storage import load_user_progress, save_user_progress, load_ratings, save_rating
+from utils.storage import load_user_progress, save_user_progress, load_rating_aggregates, save_rating
 from utils.gamification import (
     get_xp_for_level, get_level_tier, get_affinity_tier,
     calculate_xp_progress, add_xp, update_streak, add_affinity
 )
 from utils.personas import build_persona_data, get_available_personas, PERSONA_UNLOCK_LEVELS
 from utils.snippets import CODE_SNIPPETS, get_persona_snippets
+from ai_hint_project.config_registry import get_config
 
 # ==========================
 # IMPORT COMPONENTS
@@ -74,31 +75,38 @@ load_css()
 # LOAD AI CREW
 # ==========================
 try:
-    from ai_hint_project.crew import create_crew
+    from ai_hint_project.crew import create_crew, stream_crew, get_crew_executor
+    from ai_hint_project.tools.rag_registry import warm_up_rag
     AI_AVAILABLE = True
+    # Load the embedding model/vector store in the background so the first question doesn't wait on it
+    warm_up_rag()
+    # Questions run on a bounded background pool; pages poll for results
+    crew_executor = get_crew_executor()
 except ImportError:
     st.warning("⚠️⚠️️ AI crew module not found. Running in demo mode.")
     AI_AVAILABLE = False
     def create_crew(persona, question):
         return f"[Demo Mode] {persona} would explain: {question[:50]}..."
+    stream_crew = None
+    crew_executor = None
 
 # ==========================
 # CACHE DATA
 # ==========================
-@st.cache_data(show_spinner=False)
 def get_cached_persona_data():
-    yaml_path = os.path.join(base_dir, 'ai_hint_project/config/agents.yaml')
-    with open(yaml_path, 'r') as f:
-        return yaml.safe_load(f)
+    # Shared with crew.py; re-parsed only when agents.yaml changes on disk
+    return get_config('agents')
 
-@st.cache_data(ttl=60)
-def load_historical_ratings():
-    return load_ratings()
+def load_rating_stats():
+    # Aggregates are maintained by save_rating, so this doesn't scan the ratings
+    return load_rating_aggregates()
 
 # ==========================
 # SESSION STATE INIT
 # ==========================
 def init_session_state():
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
     if 'user_progress' not in st.session_state:
         st.session_state.user_progress = load_user_progress()
     if 'current_persona' not in st.session_state:
@@ -129,7 +137,7 @@ except Exception as e:
     st.error(f"⚠️ Failed to load agents: {e}")
     st.stop()
 
-historical_df = load_historical_ratings()
+rating_stats = load_rating_stats()
 progress = st.session_state.user_progress
 user_level = progress['level']
 user_xp = progress['xp']
@@ -155,7 +163,7 @@ render_header(user_level, user_xp, user_streak, next_level_xp, xp_progress, tier
 # ==========================
 # SIDEBAR
 # ==========================
-render_sidebar(user_level, user_xp, user_streak, persona_avatars, historical_df)
+render_sidebar(user_level, user_xp, user_streak, persona_avatars, rating_stats)
 
 # ==========================
 # MAIN CONTENT
@@ -165,12 +173,12 @@ if st.session_state.active_page == 'home':
     if st.session_state.current_persona:
         selected_persona = st.session_state.current_persona
         if st.session_state.active_mode == 'question':
-            render_question_mode(selected_persona, persona_avatars, create_crew, user_level)
+            render_question_mode(selected_persona, persona_avatars, create_crew, user_level, stream_crew, crew_executor)
         else:
-            render_code_review_mode(selected_persona, persona_avatars, create_crew)
+            render_code_review_mode(selected_persona, persona_avatars, create_crew, stream_crew, crew_executor)
 
 elif st.session_state.active_page == 'analytics':
-    render_analytics(historical_df)
+    render_analytics(rating_stats)
 
 elif st.session_state.active_page == 'snippets':
     render_snippets_library(user_level, user_affinity, persona_avatars, get_available_personas, get_affinity_tier)
@@ -1,19 +1,55 @@
-from langchain.vectorstores import Chroma
-from langchain_openai import OpenAIEmbeddings
-from langchain.schema import Document
+import chromadb
+import numpy as np
 import json
 import os
+from datetime import datetime
 
-chunks_path = "baeldung_scraper/chunks.json"
-index_path = "baeldung_scraper/chroma_index"
+from ai_hint_project.tools.chunk_store import ChunkStore
+from ai_hint_project.tools.retrievers import (
+    MANIFEST_FILE, VECTORS_FILE, VECTOR_IDS_FILE, CHROMA_DIR, CHROMA_COLLECTION
+)
 
-with open(chunks_path, "r") as f:
-    chunks = json.load(f)
+# Mirrors the store written by ai_hint_project/scripts/build_rag_store.py into Chroma,
+# reusing its MiniLM vectors so both backends answer from the same index.
+rag_folder = "baeldung_scraper"
+index_path = os.path.join(rag_folder, CHROMA_DIR)
+manifest_path = os.path.join(rag_folder, MANIFEST_FILE)
+BATCH = 1000
 
-docs = [Document(page_content=chunk["text"]) for chunk in chunks]
-from langchain.embeddings import FakeEmbeddings
-embeddings = FakeEmbeddings(size=768)
+with open(manifest_path, "r", encoding="utf-8") as f:
+    manifest = json.load(f)
 
-Chroma.from_documents(docs, embedding=embeddings, persist_directory=index_path)
+vectors = np.load(os.path.join(rag_folder, VECTORS_FILE), mmap_mode="r")
+vector_ids = np.load(os.path.join(rag_folder, VECTOR_IDS_FILE))
+chunks = ChunkStore(rag_folder)
 
-print("✅ Chroma index built at:", index_path)
+client = chromadb.PersistentClient(path=index_path)
+collection = client.get_or_create_collection(CHROMA_COLLECTION, metadata={"hnsw:space": "l2"})
+
+# Update in place: drop ids that left the store, add ones Chroma doesn't have yet
+existing = set(collection.get(include=[])["ids"])
+wanted = {str(i) for i in vector_ids}
+stale = sorted(existing - wanted)
+for start in range(0, len(stale), BATCH):
+    collection.delete(ids=stale[start:start + BATCH])
+
+rows = [row for row, chunk_id in enumerate(vector_ids) if str(chunk_id) not in existing]
+for start in range(0, len(rows), BATCH):
+    batch = rows[start:start + BATCH]
+    batch_chunks = [chunks[int(vector_ids[row])] for row in batch]
+    collection.add(
+        ids=[str(vector_ids[row]) for row in batch],
+        embeddings=np.asarray(vectors[batch], dtype="float32").tolist(),
+        documents=[chunk["text"] for chunk in batch_chunks],
+        metadatas=[{"source": chunk["source"], "chunk_index": chunk["chunk_index"]} for chunk in batch_chunks],
+    )
+
+manifest.setdefault("backends", {})["chroma"] = {
+    "source_built_at": manifest.get("built_at"),
+    "built_at": datetime.now().isoformat(),
+    "count": collection.count(),
+}
+with open(manifest_path, "w", encoding="utf-8") as f:
+    json.dump(manifest, f, indent=2)
+
+print(f"✅ Chroma index at {index_path}: +{len(rows)} / -{len(stale)} ({collection.count()} vectors)")
@@ -3,30 +3,30 @@ Analytics dashboard component
 """
 import streamlit as st
 
-def render_analytics(historical_df):
-    """Render analytics dashboard page"""
+def render_analytics(rating_stats):
+    """Render analytics dashboard page from pre-aggregated rating stats"""
     st.header("📊 Analytics Dashboard")
 
-    if historical_df.empty:
+    if not rating_stats.count:
         st.info("📊 No ratings data yet. Start asking questions!")
         return
 
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        avg_clarity = historical_df['clarity'].mean() if 'clarity' in historical_df.columns else 0
+        avg_clarity = rating_stats.mean('clarity') or 0
         st.metric("📊 Avg Clarity", f"{avg_clarity:.2f}⭐")
 
     with col2:
-        total = len(historical_df)
+        total = rating_stats.count
         st.metric("📝 Total Ratings", total)
 
     with col3:
-        if 'persona' in historical_df.columns:
-            best = historical_df.groupby('persona')['clarity'].mean().idxmax()
+        best = rating_stats.best('persona', 'clarity')
+        if best:
             st.metric("🏆 Top Persona", best[:12])
 
     with col4:
-        if 'helpfulness' in historical_df.columns:
-            avg_help = historical_df['helpfulness'].mean()
+        avg_help = rating_stats.mean('helpfulness')
+        if avg_help is not None:
             st.metric("💡 Helpfulness", f"{avg_help:.2f}⭐")
@@ -3,10 +3,15 @@ Code review mode component
 """
 import streamlit as st
 from utils.gamification import add_xp, add_affinity
-from utils.storage import save_user_progress
+from ai_hint_project.crew_executor import ExecutorBusyError
+from components.crew_job import render_crew_job
 
-def render_code_review_mode(selected_persona, persona_avatars, create_crew):
-    """Render code review interface"""
+def render_code_review_mode(selected_persona, persona_avatars, create_crew, stream_crew=None, crew_executor=None):
+    """Render code review interface.
+
+    With crew_executor the review runs as a background job and this page polls
+    for it; otherwise the review is streamed (stream_crew) or computed inline.
+    """
     st.subheader("📝 Code Review")
     st.caption(f"{persona_avatars[selected_persona]} {selected_persona} will review your Java code")
     
@@ -21,29 +26,45 @@ def render_code_review_mode(selected_persona, persona_avatars, create_crew):
         key="code_input"
     )
     
-    if st.button("🔍 Get Code Review (+15 XP)", type="primary", use_container_width=True):
+    if st.button("🔍 Get Code Review (+15 XP)", type="primary", use_container_width=True,
+                 disabled=bool(st.session_state.get('code_review_job'))):
         if not user_code.strip():
             st.warning("⚠️ Please paste some code first!")
+        elif crew_executor is not None:
+            review_prompt = f"Review this Java code and provide feedback:\n\n{user_code}"
+            try:
+                st.session_state.code_review_job = crew_executor.submit(
+                    st.session_state.session_id, selected_persona, review_prompt
+                )
+                st.session_state.code_review = None
+            except ExecutorBusyError as e:
+                st.warning(f"⏳ {e}")
         else:
             try:
-                with st.spinner(f"{persona_avatars[selected_persona]} Analyzing your code..."):
-                    review_prompt = f"Review this Java code and provide feedback:\n\n{user_code}"
-                    result = create_crew(selected_persona, review_prompt)
-                
-                st.session_state.code_review = result
+                review_prompt = f"Review this Java code and provide feedback:\n\n{user_code}"
+                if stream_crew is not None:
+                    st.markdown("### 🔍 Code Review Results")
+                    result = st.write_stream(stream_crew(selected_persona, review_prompt))
+                else:
+                    with st.spinner(f"{persona_avatars[selected_persona]} Analyzing your code..."):
+                        result = create_crew(selected_persona, review_prompt)
                 
-                # Award XP and affinity
-                leveled_up = add_xp(st.session_state.user_progress, 15, st.session_state)
-                add_affinity(st.session_state.user_progress, selected_persona, 15, st.session_state)
-                
-                st.success("✅ Code review complete! +15 XP, +15 Affinity")
-                if leveled_up:
-                    save_user_progress(st.session_state.user_progress)
-                st.rerun()
+                complete_code_review(selected_persona, result)
                 
             except Exception as e:
                 st.error(f"❌ Error: {str(e)}")
     
+    # Poll the background job
+    if crew_executor is not None:
+        job = render_crew_job(crew_executor, 'code_review_job', persona_avatars[selected_persona], "🔍 Code Review Results")
+        if job is not None:
+            if job["status"] == "done":
+                complete_code_review(selected_persona, job["result"])
+            elif job["status"] == "timeout":
+                st.error(f"⌛ {job['error']}. Please try again.")
+            elif job["status"] == "failed":
+                st.error(f"❌ Error: {job['error']}")
+    
     # Display code review
     if st.session_state.code_review:
         st.divider()
@@ -56,4 +77,16 @@ def render_code_review_mode(selected_persona, persona_avatars, create_crew):
         
         if st.button("🗑️ Clear Review", use_container_width=True):
             st.session_state.code_review = None
-            st.rerun()
\ No newline at end of file
+            st.rerun()
+
+
+def complete_code_review(selected_persona, result):
+    """Store a finished code review and award XP/affinity"""
+    st.session_state.code_review = result
+    
+    # Award XP and affinity (persisted in the background)
+    add_xp(st.session_state.user_progress, 15, st.session_state)
+    add_affinity(st.session_state.user_progress, selected_persona, 15, st.session_state)
+    
+    st.success("✅ Code review complete! +15 XP, +15 Affinity")
+    st.rerun()
@@ -0,0 +1,46 @@
+"""
+Background crew job status component
+"""
+import time
+import streamlit as st
+
+POLL_INTERVAL_SECONDS = 1.0
+
+
+def render_crew_job(crew_executor, state_key, avatar, title):
+    """Show progress for the job id stored in st.session_state[state_key].
+
+    While the job is queued/running this renders its status and partial answer,
+    then reruns the script after a short sleep. Once the job is finished the
+    state key is cleared and the final snapshot is returned (None otherwise).
+    """
+    job_id = st.session_state.get(state_key)
+    if not job_id:
+        return None
+
+    job = crew_executor.poll(job_id)
+    if job is None:
+        # Expired or the server restarted
+        st.session_state[state_key] = None
+        return None
+
+    if job["status"] in ("queued", "running"):
+        st.markdown(f"### {title}")
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            if job["status"] == "queued":
+                st.info(f"{avatar} Waiting in line (position {job['position']})...")
+            else:
+                st.info(f"{avatar} Thinking...")
+        with col2:
+            if st.button("✖️ Cancel", key=f"{state_key}_cancel", use_container_width=True):
+                crew_executor.cancel(job_id)
+                st.session_state[state_key] = None
+                st.rerun()
+        if job["partial"]:
+            st.markdown(job["partial"])
+        time.sleep(POLL_INTERVAL_SECONDS)
+        st.rerun()
+
+    st.session_state[state_key] = None
+    return job
@@ -5,10 +5,16 @@ import streamlit as st
 import traceback
 from datetime import datetime
 from utils.gamification import add_xp, add_affinity
-from utils.storage import save_rating, save_user_progress
+from utils.storage import save_rating
+from ai_hint_project.crew_executor import ExecutorBusyError
+from components.crew_job import render_crew_job
 
-def render_question_mode(selected_persona, persona_avatars, create_crew, user_level):
-    """Render question asking interface"""
+def render_question_mode(selected_persona, persona_avatars, create_crew, user_level, stream_crew=None, crew_executor=None):
+    """Render question asking interface.
+
+    With crew_executor the question runs as a background job and this page polls
+    for it; otherwise the answer is streamed (stream_crew) or computed inline.
+    """
     st.subheader("💬 Ask Your Java Question")
     user_question = st.text_area(
         "Enter your programming question:",
@@ -20,7 +26,8 @@ def render_question_mode(selected_persona, persona_avatars, create_crew, user_le
     col1, col2 = st.columns([3, 1])
     
     with col1:
-        ask_button = st.button("🚀 Get Explanation (+10 XP)", type="primary", use_container_width=True)
+        ask_button = st.button("🚀 Get Explanation (+10 XP)", type="primary", use_container_width=True,
+                               disabled=bool(st.session_state.get('question_job')))
     
     with col2:
         if st.session_state.explanation:
@@ -33,28 +40,44 @@ def render_question_mode(selected_persona, persona_avatars, create_crew, user_le
     if ask_button:
         if not user_question.strip():
             st.warning("⚠️ Please enter a question first!")
+        elif crew_executor is not None:
+            try:
+                st.session_state.question_job = crew_executor.submit(
+                    st.session_state.session_id, selected_persona, user_question
+                )
+                st.session_state.current_question = user_question
+                st.session_state.explanation = None
+                st.session_state.show_rating = False
+            except ExecutorBusyError as e:
+                st.warning(f"⏳ {e}")
         else:
             try:
-                with st.spinner(f"{persona_avatars[selected_persona]} Thinking..."):
-                    result = create_crew(selected_persona, user_question)
+                if stream_crew is not None:
+                    st.markdown("### 🗣️ Explanation")
+                    result = st.write_stream(stream_crew(selected_persona, user_question))
+                else:
+                    with st.spinner(f"{persona_avatars[selected_persona]} Thinking..."):
+                        result = create_crew(selected_persona, user_question)
                 
-                st.session_state.explanation = result
                 st.session_state.current_question = user_question
-                st.session_state.show_rating = True
-                
-                # Award XP and affinity
-                leveled_up = add_xp(st.session_state.user_progress, 10, st.session_state)
-                add_affinity(st.session_state.user_progress, selected_persona, 10, st.session_state)
-                
-                if leveled_up:
-                    save_user_progress(st.session_state.user_progress)
-                st.rerun()
+                complete_question(selected_persona, result)
                 
             except Exception as e:
                 st.error(f"❌ Error: {str(e)}")
                 with st.expander("Show detailed error"):
                     st.code(traceback.format_exc())
     
+    # Poll the background job
+    if crew_executor is not None:
+        job = render_crew_job(crew_executor, 'question_job', persona_avatars[selected_persona], "🗣️ Explanation")
+        if job is not None:
+            if job["status"] == "done":
+                complete_question(selected_persona, job["result"])
+            elif job["status"] == "timeout":
+                st.error(f"⌛ {job['error']}. Please try again.")
+            elif job["status"] == "failed":
+                st.error(f"❌ Error: {job['error']}")
+    
     # Display explanation
     if st.session_state.explanation:
         st.divider()
@@ -70,6 +93,18 @@ def render_question_mode(selected_persona, persona_avatars, create_crew, user_le
             render_rating_form(selected_persona, user_level)
 
 
+def complete_question(selected_persona, result):
+    """Store a finished explanation and award XP/affinity"""
+    st.session_state.explanation = result
+    st.session_state.show_rating = True
+    
+    # Award XP and affinity (persisted in the background)
+    add_xp(st.session_state.user_progress, 10, st.session_state)
+    add_affinity(st.session_state.user_progress, selected_persona, 10, st.session_state)
+    
+    st.rerun()
+
+
 def render_rating_form(selected_persona, user_level):
     """Render rating form for explanations"""
     st.divider()
@@ -8,7 +8,7 @@ def navigate_to(page_name: str):
     """Set query params to navigate to a page"""
     st.experimental_set_query_params(page=page_name)
 
-def render_sidebar(user_level, user_xp, user_streak, persona_avatars, historical_df):
+def render_sidebar(user_level, user_xp, user_streak, persona_avatars, rating_stats):
     """Render the sidebar with stats, controls, and page navigation"""
     with st.sidebar:
         st.title("⚙️ Control Center")
@@ -59,8 +59,8 @@ def render_sidebar(user_level, user_xp, user_streak, persona_avatars, historical
         # =================
         # Quick stats from history
         # =================
-        if not historical_df.empty:
+        if rating_stats.count:
             st.header("📈 All-Time Stats")
-            avg_rating = historical_df['clarity'].mean() if 'clarity' in historical_df.columns else 0
+            avg_rating = rating_stats.mean('clarity') or 0
             st.metric("Avg Clarity", f"{avg_rating:.1f}⭐")
-            st.metric("Total Questions", len(historical_df))
+            st.metric("Total Questions", rating_stats.count)
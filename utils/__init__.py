@@ -1,7 +1,10 @@
 """
 Utils package for AI Java Tutor Pro
 """
-from .storage import load_user_progress, save_user_progress, load_ratings, save_rating
+from .storage import (
+    load_user_progress, save_user_progress, progress_batch, get_progress_store, load_ratings, save_rating,
+    load_rating_aggregates, rebuild_rating_aggregates
+)
 from .gamification import (
     get_xp_for_level,
     get_level_tier,
@@ -23,8 +26,12 @@ from .snippets import CODE_SNIPPETS, get_persona_snippets, get_unlocked_snippets
 __all__ = [
     'load_user_progress',
     'save_user_progress',
+    'progress_batch',
+    'get_progress_store',
     'load_ratings',
     'save_rating',
+    'load_rating_aggregates',
+    'rebuild_rating_aggregates',
     'get_xp_for_level',
     'get_level_tier',
     'get_affinity_tier',
@@ -2,7 +2,7 @@
 Gamification logic: XP, levels, streaks, affinity
 """
 from datetime import datetime, timedelta
-from .storage import save_user_progress
+from .storage import record_progress_event
 
 def get_xp_for_level(level):
     """Calculate XP needed for a given level"""
@@ -38,20 +38,20 @@ def calculate_xp_progress(user_xp, user_level):
     return max(0, min(100, xp_progress))
 
 def add_xp(progress, amount, session_state):
-    """Add XP and check for level up"""
+    """Add XP and check for level up (both recorded as one write-behind event)"""
     progress['xp'] += amount
     next_level_xp = get_xp_for_level(progress['level'])
+    leveled_up = progress['xp'] >= next_level_xp
     
-    if progress['xp'] >= next_level_xp:
+    if leveled_up:
         progress['level'] += 1
         session_state.show_reward = {
             'type': 'level_up',
             'level': progress['level']
         }
-        return True  # Level up occurred
     
-    save_user_progress(progress)
-    return False
+    record_progress_event(progress, 'xp', amount=amount, level=progress['level'])
+    return leveled_up  # True if a level up occurred
 
 def update_streak(progress, session_state):
     """Update daily streak"""
@@ -73,7 +73,7 @@ def update_streak(progress, session_state):
             progress['streak'] = 1
         
         progress['last_visit'] = today
-        save_user_progress(progress)
+        record_progress_event(progress, 'streak', streak=progress['streak'], last_visit=today)
 
 def add_affinity(progress, persona_name, amount, session_state):
     """Add affinity points to a persona"""
@@ -83,6 +83,7 @@ def add_affinity(progress, persona_name, amount, session_state):
     old_affinity = progress['affinity'].get(persona_name, 0)
     new_affinity = old_affinity + amount
     progress['affinity'][persona_name] = new_affinity
+    record_progress_event(progress, 'affinity', persona=persona_name, amount=amount)
     
     # Check for tier upgrade
     old_tier, _ = get_affinity_tier(old_affinity)
@@ -93,6 +94,4 @@ def add_affinity(progress, persona_name, amount, session_state):
             'type': 'affinity',
             'persona': persona_name,
             'tier': new_tier
-        }
-    
-    save_user_progress(progress)
\ No newline at end of file
+        }
\ No newline at end of file
@@ -0,0 +1,200 @@
+"""
+Write-behind gamification events (XP, affinity, streak, level-up)
+"""
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+
+DEFAULT_FLUSH_INTERVAL = 2.0
+DEFAULT_FLUSH_SIZE = 50
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # exists but owned by someone else
+    return True
+
+
+class ProgressEventLog:
+    """Buffers gamification events in memory and applies them to the ProgressStore in batches.
+
+    record() appends the event to this process's journal (journal_dir/<pid>.jsonl,
+    one JSON line, no fsync) and to the in-memory buffer; a background thread
+    applies the buffer in one transaction every flush_interval seconds or as
+    soon as flush_size events are pending. The store keeps the last applied
+    sequence number per journal in the same transaction, so replaying a
+    journal after a crash applies each event exactly once.
+    """
+
+    def __init__(self, store, journal_dir, flush_interval=DEFAULT_FLUSH_INTERVAL, flush_size=DEFAULT_FLUSH_SIZE):
+        self.store = store
+        self.journal_dir = journal_dir
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        os.makedirs(journal_dir, exist_ok=True)
+        self.journal_path = os.path.join(journal_dir, f"{os.getpid()}.jsonl")
+
+        self._lock = threading.Lock()        # buffer + journal file
+        self._flush_lock = threading.Lock()  # one flush at a time
+        self._buffer = []
+        self._wake = threading.Event()
+        self._stopped = False
+        self.flushes = 0
+        self.applied = 0
+
+        self.recover()
+        self._seq = int(self.store.get_meta(self._meta_key(self.journal_path), 0))
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="progress-flush", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @staticmethod
+    def _meta_key(journal_path):
+        return f"journal_seq:{os.path.basename(journal_path)}"
+
+    # ---- recording -------------------------------------------------------
+
+    def record(self, user_id, kind, **data):
+        """Queue an event: kind is 'xp' (amount, level), 'affinity' (persona, amount) or 'streak'."""
+        with self._lock:
+            self._seq += 1
+            event = dict(data, seq=self._seq, ts=time.time(), user_id=user_id, kind=kind)
+            self._journal.write(json.dumps(event) + "\n")
+            self._journal.flush()
+            self._buffer.append(event)
+            pending = len(self._buffer)
+        if pending >= self.flush_size:
+            self._wake.set()
+
+    def pending(self):
+        return len(self._buffer)
+
+    # ---- applying --------------------------------------------------------
+
+    def _apply(self, events, journal_path):
+        """Apply events and advance the journal's applied seq in one transaction."""
+        key = self._meta_key(journal_path)
+        with self.store.batch():
+            applied = int(self.store.get_meta(key, 0))
+            for event in events:
+                if event["seq"] <= applied:
+                    continue  # already applied before a crash
+                user_id, kind = event["user_id"], event["kind"]
+                if kind == "xp":
+                    self.store.increment_xp(user_id, event["amount"], event.get("level"))
+                elif kind == "affinity":
+                    self.store.increment_affinity(user_id, event["persona"], event["amount"])
+                elif kind == "streak":
+                    self.store.set_streak(user_id, event["streak"], event["last_visit"])
+                applied = event["seq"]
+            self.store.set_meta(key, str(applied))
+        return len(events)
+
+    def flush(self):
+        """Apply everything buffered so far; returns the number of events applied."""
+        with self._flush_lock:
+            with self._lock:
+                events, self._buffer = self._buffer, []
+            if not events:
+                return 0
+            try:
+                self._apply(events, self.journal_path)
+            except Exception as e:
+                print(f"Error flushing progress events: {e}")
+                with self._lock:
+                    self._buffer = events + self._buffer  # retry on the next flush
+                return 0
+            self.flushes += 1
+            self.applied += len(events)
+            self._compact()
+            return len(events)
+
+    def _compact(self):
+        """Rewrite the journal with only the events that are still buffered."""
+        with self._lock:
+            tmp = self.journal_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for event in self._buffer:
+                    f.write(json.dumps(event) + "\n")
+            self._journal.close()
+            os.replace(tmp, self.journal_path)
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    # ---- recovery --------------------------------------------------------
+
+    @staticmethod
+    def _read_journal(path):
+        events = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    break  # torn last line from a crash
+        return events
+
+    @staticmethod
+    def _claim(path, journal_path):
+        """Rename a dead journal to a name only this process reads; None if another process claimed it first."""
+        claimed = f"{journal_path}.{os.getpid()}.{threading.get_ident()}.claimed"
+        try:
+            os.rename(path, claimed)
+        except FileNotFoundError:
+            return None
+        return claimed
+
+    def recover(self):
+        """Replay journals left behind by processes that are no longer running (including ours).
+
+        A dead journal is first renamed to <journal>.<pid>.<thread>.claimed, so when
+        several processes start together only one of them replays it (a
+        claimer that dies mid-replay leaves the claimed file for the next
+        process to start). The applied seq is kept in the store, never reset, so even a
+        journal read twice is applied once; a new process that gets the same
+        pid continues numbering after it.
+        """
+        paths = glob.glob(os.path.join(self.journal_dir, "*.jsonl"))
+        paths += glob.glob(os.path.join(self.journal_dir, "*.jsonl.*.claimed"))
+        for path in paths:
+            name, _, claimer = os.path.basename(path).partition(".jsonl")
+            journal_path = os.path.join(self.journal_dir, name + ".jsonl")
+            owner = claimer.split(".")[1] if claimer else name
+            if owner.isdigit() and (claimer or int(owner) != os.getpid()) and _pid_alive(int(owner)):
+                continue  # journal of a running process, or being replayed by one
+            if path != self.journal_path:
+                path = self._claim(path, journal_path)
+                if path is None:
+                    continue
+            events = self._read_journal(path)
+            if events:
+                self._apply(events, journal_path)
+                print(f"✅ Replayed {len(events)} progress events from {os.path.basename(journal_path)}")
+            if path != self.journal_path:
+                os.remove(path)
+            else:
+                open(path, "w").close()
+
+    def stats(self):
+        return {"pending": self.pending(), "flushes": self.flushes, "applied": self.applied}
+
+    def close(self):
+        if self._stopped:
+            return
+        self._stopped = True
+        self._wake.set()
+        self.flush()
+        self._journal.close()
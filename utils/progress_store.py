@@ -0,0 +1,196 @@
+"""
+SQLite-backed user progress store (WAL mode, keyed by user id)
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_USER_ID = "default"
+BUSY_TIMEOUT_MS = 30000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    level INTEGER NOT NULL DEFAULT 1,
+    xp INTEGER NOT NULL DEFAULT 0,
+    streak INTEGER NOT NULL DEFAULT 0,
+    last_visit TEXT,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS affinity (
+    user_id TEXT NOT NULL,
+    persona TEXT NOT NULL,
+    points INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, persona)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def default_progress():
+    return {
+        'level': 1,
+        'xp': 0,
+        'streak': 0,
+        'last_visit': None,
+        'affinity': {}
+    }
+
+
+class ProgressStore:
+    """User progress in SQLite, safe to share between threads and processes.
+
+    Each thread gets its own connection. Writes take the database write lock
+    up front (BEGIN IMMEDIATE) and WAL mode lets readers continue meanwhile.
+    XP/affinity use in-place increments, so concurrent sessions never lose
+    each other's updates, and batch() groups several writes into one commit.
+    """
+
+    def __init__(self, path, legacy_json=None):
+        self.path = path
+        self._local = threading.local()
+        self._migrate(legacy_json)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        if self._local.depth:
+            # Inside batch(): join the open transaction
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+        finally:
+            self._local.depth = 0
+
+    def batch(self):
+        """Group the writes made inside the with-block into a single transaction."""
+        return self._transaction()
+
+    def _migrate(self, legacy_json):
+        """One-time import of the old single-user user_progress.json."""
+        if not legacy_json or not os.path.exists(legacy_json):
+            return
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_json'").fetchone():
+                return
+            try:
+                with open(legacy_json, "r") as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"Error migrating progress: {e}")
+                return
+            if not conn.execute("SELECT 1 FROM users WHERE user_id = ?", (DEFAULT_USER_ID,)).fetchone():
+                self.save(DEFAULT_USER_ID, dict(default_progress(), **data))
+            conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_json', ?)", (legacy_json,))
+        print(f"✅ Migrated {legacy_json} into {self.path}")
+
+    def _ensure_user(self, conn, user_id):
+        conn.execute("INSERT OR IGNORE INTO users (user_id, updated_at) VALUES (?, ?)", (user_id, time.time()))
+
+    def load(self, user_id=DEFAULT_USER_ID):
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT level, xp, streak, last_visit FROM users WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        progress = default_progress()
+        if row:
+            progress.update(level=row[0], xp=row[1], streak=row[2], last_visit=row[3])
+            progress['affinity'] = dict(conn.execute(
+                "SELECT persona, points FROM affinity WHERE user_id = ?", (user_id,)
+            ).fetchall())
+        return progress
+
+    def save(self, user_id, progress):
+        """Overwrite the whole progress record (level/xp/streak/last_visit/affinity)."""
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO users (user_id, level, xp, streak, last_visit, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET level = excluded.level, xp = excluded.xp, "
+                "streak = excluded.streak, last_visit = excluded.last_visit, updated_at = excluded.updated_at",
+                (user_id, progress.get('level', 1), progress.get('xp', 0), progress.get('streak', 0),
+                 progress.get('last_visit'), time.time())
+            )
+            conn.executemany(
+                "INSERT INTO affinity (user_id, persona, points) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id, persona) DO UPDATE SET points = excluded.points",
+                [(user_id, persona, points) for persona, points in progress.get('affinity', {}).items()]
+            )
+
+    def increment_xp(self, user_id, amount, level=None):
+        """Atomically add XP (and raise the level to at least `level`); returns (xp, level)."""
+        with self._transaction() as conn:
+            self._ensure_user(conn, user_id)
+            conn.execute(
+                "UPDATE users SET xp = xp + ?, level = MAX(level, COALESCE(?, level)), updated_at = ? "
+                "WHERE user_id = ?",
+                (amount, level, time.time(), user_id)
+            )
+            return tuple(conn.execute("SELECT xp, level FROM users WHERE user_id = ?", (user_id,)).fetchone())
+
+    def increment_affinity(self, user_id, persona, amount):
+        """Atomically add affinity points for a persona; returns the new total."""
+        with self._transaction() as conn:
+            self._ensure_user(conn, user_id)
+            conn.execute(
+                "INSERT INTO affinity (user_id, persona, points) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id, persona) DO UPDATE SET points = points + excluded.points",
+                (user_id, persona, amount)
+            )
+            return conn.execute(
+                "SELECT points FROM affinity WHERE user_id = ? AND persona = ?", (user_id, persona)
+            ).fetchone()[0]
+
+    def set_streak(self, user_id, streak, last_visit):
+        with self._transaction() as conn:
+            self._ensure_user(conn, user_id)
+            conn.execute(
+                "UPDATE users SET streak = ?, last_visit = ?, updated_at = ? WHERE user_id = ?",
+                (streak, last_visit, time.time(), user_id)
+            )
+
+    def get_meta(self, key, default=None):
+        row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value)
+            )
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
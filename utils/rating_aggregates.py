@@ -0,0 +1,92 @@
+"""
+Running rating aggregates (count, sum, sum of squares) per persona, user level and day
+"""
+import math
+
+METRICS = ('clarity', 'accuracy', 'helpfulness')
+DIMENSIONS = ('persona', 'user_level', 'day')
+
+
+def _empty_group():
+    group = {'count': 0}
+    for metric in METRICS:
+        group[metric] = [0, 0.0, 0.0]  # count, sum, sum of squares
+    return group
+
+
+def _add(group, rating):
+    group['count'] += 1
+    for metric in METRICS:
+        value = rating.get(metric)
+        if not _present(value):  # missing / NaN from a DataFrame
+            continue
+        value = float(value)
+        group[metric][0] += 1
+        group[metric][1] += value
+        group[metric][2] += value * value
+
+
+def _present(value):
+    return value is not None and value == value  # NaN != NaN
+
+
+def _keys(rating):
+    """Dimension values of a rating ('day' comes from the ISO timestamp)."""
+    timestamp = rating.get('timestamp')
+    level = rating.get('user_level')
+    return {
+        'persona': rating.get('persona') if _present(rating.get('persona')) else None,
+        'user_level': str(int(level)) if _present(level) else None,
+        'day': timestamp[:10] if isinstance(timestamp, str) and timestamp else None,
+    }
+
+
+class RatingAggregates:
+    """Sufficient statistics for the dashboard, updated one rating at a time.
+
+    Reads cost O(number of groups), independent of how many ratings exist.
+    Means and standard deviations are derived from count/sum/sum-of-squares.
+    """
+
+    def __init__(self, data=None):
+        data = data or {}
+        self.total = data.get('total') or _empty_group()
+        self.groups = {dim: dict(data.get(dim, {})) for dim in DIMENSIONS}
+
+    @classmethod
+    def from_records(cls, records):
+        aggregates = cls()
+        for rating in records:
+            aggregates.add(rating)
+        return aggregates
+
+    def add(self, rating):
+        _add(self.total, rating)
+        for dim, key in _keys(rating).items():
+            if key is not None:
+                _add(self.groups[dim].setdefault(key, _empty_group()), rating)
+
+    def to_dict(self):
+        return dict({'total': self.total}, **self.groups)
+
+    @property
+    def count(self):
+        return self.total['count']
+
+    @staticmethod
+    def stats(group, metric):
+        """(mean, std) of a metric in a group, or (None, None) if it has no ratings."""
+        n, total, squares = group[metric]
+        if not n:
+            return None, None
+        mean = total / n
+        return mean, math.sqrt(max(squares / n - mean * mean, 0.0))
+
+    def mean(self, metric, dim=None, key=None):
+        group = self.total if dim is None else self.groups[dim].get(key)
+        return self.stats(group, metric)[0] if group else None
+
+    def best(self, dim, metric):
+        """Group key with the highest mean for a metric (e.g. the top persona by clarity)."""
+        scored = [(self.stats(group, metric)[0], key) for key, group in self.groups[dim].items() if group[metric][0]]
+        return max(scored)[1] if scored else None
@@ -0,0 +1,274 @@
+"""
+Ratings storage: JSON-lines append log compacted into Parquet parts, loaded incrementally
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from .rating_aggregates import RatingAggregates
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+try:
+    import pyarrow  # noqa: F401  (pandas' Parquet engine)
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+LOG_FILE = "ratings.json"
+PARQUET_DIR = "ratings_parquet"
+STATE_FILE = "_state.json"
+AGGREGATES_FILE = "_aggregates.json"
+LOCK_FILE = "ratings.lock"
+DEFAULT_COMPACT_BYTES = 1 << 20  # compact the log once it reaches ~1 MB
+DEFAULT_MAX_PARTS = 16  # then merge all parts into one
+
+
+class RatingsStore:
+    """Ratings kept as an append-only JSON-lines log plus immutable Parquet parts.
+
+    save() appends one line to the log. Once the log passes compact_bytes its
+    rows are written to a new Parquet part and the log is truncated; every
+    max_parts compactions the parts are merged into a single one. load()
+    keeps the frame it built last time and only reads what's new since: Parquet
+    parts it hasn't seen and log lines past its byte offset.
+
+    The state file lists the parts and, while a compaction is being finished,
+    how many log bytes are already in the newest part, so a crash between
+    writing the part and truncating the log never duplicates rows.
+
+    save() also folds each rating into RatingAggregates (persisted next to
+    the parts) so dashboards don't need to scan the ratings at all;
+    rebuild_aggregates() recomputes them from the raw data.
+    """
+
+    def __init__(self, base_dir, compact_bytes=DEFAULT_COMPACT_BYTES, max_parts=DEFAULT_MAX_PARTS):
+        self.log_path = os.path.join(base_dir, LOG_FILE)
+        self.parquet_dir = os.path.join(base_dir, PARQUET_DIR)
+        self.state_path = os.path.join(self.parquet_dir, STATE_FILE)
+        self.aggregates_path = os.path.join(self.parquet_dir, AGGREGATES_FILE)
+        self.lock_path = os.path.join(base_dir, LOCK_FILE)
+        self.compact_bytes = compact_bytes
+        self.max_parts = max_parts
+        self._thread_lock = threading.Lock()
+        # Incremental load state
+        self._parts_loaded = []
+        self._parts_frame = pd.DataFrame()
+        self._log_rows = []
+        self._log_offset = 0
+        self._frame = pd.DataFrame()
+        self._aggregates = None
+        self._aggregates_signature = None
+
+    @contextmanager
+    def _locked(self):
+        """Serialize appends and compaction across threads and processes."""
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_path, "a") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_state(self):
+        try:
+            with open(self.state_path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"parts": [], "next_part": 0, "log_consumed": 0}
+
+    def _write_json(self, path, data):
+        os.makedirs(self.parquet_dir, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def _write_state(self, state):
+        self._write_json(self.state_path, state)
+
+    # ---- writes ----------------------------------------------------------
+
+    def save(self, rating):
+        with self._locked():
+            aggregates = self._read_aggregates()
+            with open(self.log_path, "a") as f:
+                f.write(json.dumps(rating) + "\n")
+                size = f.tell()
+            if aggregates is not None:
+                aggregates.add(rating)
+                self._write_aggregates(aggregates)
+        if HAS_PARQUET and size >= self.compact_bytes:
+            # The rating is already in the log; a failed compaction leaves the
+            # log as it is and is retried on the next save
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"⚠️ Ratings compaction failed, keeping the log: {e}")
+
+    def _finish_compaction(self, state):
+        """Drop the log prefix that the newest part already holds (must hold the lock)."""
+        consumed = state.get("log_consumed", 0)
+        if not consumed:
+            return
+        with open(self.log_path, "rb") as f:
+            f.seek(consumed)
+            rest = f.read()
+        tmp = self.log_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(rest)
+        os.replace(tmp, self.log_path)
+        state["log_consumed"] = 0
+        self._write_state(state)
+
+    def compact(self):
+        """Move every complete line of the log into a new Parquet part; returns rows moved."""
+        if not HAS_PARQUET:
+            return 0
+        with self._locked():
+            state = self._read_state()
+            self._finish_compaction(state)  # a previous run may have crashed half-way
+            if not os.path.exists(self.log_path):
+                return 0
+            with open(self.log_path, "rb") as f:
+                data = f.read()
+            end = data.rfind(b"\n") + 1
+            rows = [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+            if not rows:
+                return 0
+            frame = pd.DataFrame(rows)
+            merged = state["parts"] if len(state["parts"]) + 1 >= self.max_parts else []
+            if merged:
+                frame = pd.concat(
+                    [pd.read_parquet(os.path.join(self.parquet_dir, part)) for part in merged] + [frame],
+                    ignore_index=True
+                )
+            os.makedirs(self.parquet_dir, exist_ok=True)
+            number = state.get("next_part", len(state["parts"]))
+            name = f"part-{number:05d}.parquet"
+            tmp = os.path.join(self.parquet_dir, name + ".tmp")
+            frame.to_parquet(tmp, index=False)
+            os.replace(tmp, os.path.join(self.parquet_dir, name))
+            state["parts"] = [part for part in state["parts"] if part not in merged] + [name]
+            state["next_part"] = number + 1
+            state["log_consumed"] = end
+            self._write_state(state)
+            self._finish_compaction(state)
+            for part in merged:
+                os.remove(os.path.join(self.parquet_dir, part))
+        print(f"✅ Compacted {len(rows)} ratings into {name}")
+        return len(rows)
+
+    # ---- incremental reads -----------------------------------------------
+
+    def _read_log_tail(self, start):
+        """Parse complete lines from byte offset `start`; returns (rows, new offset)."""
+        if not os.path.exists(self.log_path):
+            return [], 0
+        with open(self.log_path, "rb") as f:
+            f.seek(start)
+            data = f.read()
+        end = data.rfind(b"\n") + 1  # leave a half-written last line for next time
+        rows = []
+        for line in data[:end].splitlines():
+            if line.strip():
+                try:
+                    rows.append(json.loads(line))
+                except ValueError as e:
+                    print(f"Skipping bad rating line: {e}")
+        return rows, start + end
+
+    def load(self):
+        """All ratings as a DataFrame (shared between callers; treat it as read-only)."""
+        # Holding the lock means no compaction is half-way through while we read
+        with self._locked():
+            state = self._read_state()
+            if state.get("log_consumed"):
+                self._finish_compaction(state)  # left over from a crash
+            parts = state["parts"]
+            changed = False
+            if parts[:len(self._parts_loaded)] != self._parts_loaded:
+                # Store was rebuilt under us: start over
+                self._parts_loaded, self._parts_frame = [], pd.DataFrame()
+                self._log_rows, self._log_offset = [], 0
+                changed = True
+            if len(parts) > len(self._parts_loaded):
+                frames = [self._parts_frame] + [
+                    pd.read_parquet(os.path.join(self.parquet_dir, name)) for name in parts[len(self._parts_loaded):]
+                ]
+                self._parts_frame = pd.concat([f for f in frames if not f.empty], ignore_index=True)
+                self._parts_loaded = list(parts)
+                # The new parts hold the log rows we had and the log was truncated
+                self._log_rows, self._log_offset = [], 0
+                changed = True
+            elif self._log_offset > (os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0):
+                self._log_rows, self._log_offset = [], 0
+                changed = True
+
+            new_rows, self._log_offset = self._read_log_tail(self._log_offset)
+            if new_rows:
+                self._log_rows.extend(new_rows)
+                changed = True
+            if changed:
+                frames = [self._parts_frame] + ([pd.DataFrame(self._log_rows)] if self._log_rows else [])
+                frames = [frame for frame in frames if not frame.empty]
+                if len(frames) > 1:
+                    self._frame = pd.concat(frames, ignore_index=True)
+                else:
+                    self._frame = frames[0] if frames else pd.DataFrame()
+            return self._frame
+
+    # ---- aggregates ------------------------------------------------------
+
+    def _signature(self, path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_aggregates(self):
+        """Current aggregates (re-read only if another process changed the file), or None if missing."""
+        signature = self._signature(self.aggregates_path)
+        if signature is None:
+            return None
+        if signature != self._aggregates_signature:
+            with open(self.aggregates_path, "r") as f:
+                self._aggregates = RatingAggregates(json.load(f))
+            self._aggregates_signature = signature
+        return self._aggregates
+
+    def _write_aggregates(self, aggregates):
+        self._write_json(self.aggregates_path, aggregates.to_dict())
+        self._aggregates = aggregates
+        self._aggregates_signature = self._signature(self.aggregates_path)
+
+    def _iter_raw(self):
+        """Every stored rating: Parquet parts first, then complete log lines (must hold the lock)."""
+        for name in self._read_state()["parts"]:
+            yield from pd.read_parquet(os.path.join(self.parquet_dir, name)).to_dict("records")
+        yield from self._read_log_tail(0)[0]
+
+    def rebuild_aggregates(self):
+        """Recompute the aggregates from the raw ratings."""
+        with self._locked():
+            aggregates = RatingAggregates.from_records(self._iter_raw())
+            self._write_aggregates(aggregates)
+        print(f"✅ Rebuilt rating aggregates from {aggregates.count} ratings")
+        return aggregates
+
+    def aggregates(self):
+        """RatingAggregates for dashboards; built from the raw data the first time."""
+        with self._thread_lock:
+            aggregates = self._read_aggregates()
+        return aggregates if aggregates is not None else self.rebuild_aggregates()
@@ -1,63 +1,110 @@
 """
 Storage utilities for user progress and ratings
 """
-import json
 import os
+import threading
 import pandas as pd
 from datetime import datetime
+from .progress_store import ProgressStore, DEFAULT_USER_ID, default_progress
+from .progress_events import ProgressEventLog
+from .ratings_store import RatingsStore
+from .rating_aggregates import RatingAggregates
 
 def get_base_dir():
     """Get the base directory of the application"""
     return os.path.dirname(os.path.dirname(__file__))
 
-def load_user_progress():
-    """Load user progress from JSON file"""
-    filepath = os.path.join(get_base_dir(), "user_progress.json")
-    if os.path.exists(filepath):
-        try:
-            with open(filepath, "r") as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading progress: {e}")
-    return {
-        'level': 1,
-        'xp': 0,
-        'streak': 0,
-        'last_visit': None,
-        'affinity': {}
-    }
-
-def save_user_progress(data):
-    """Save user progress to JSON file"""
-    filepath = os.path.join(get_base_dir(), "user_progress.json")
+_progress_store = None
+_progress_events = None
+_progress_store_lock = threading.Lock()
+
+def get_progress_store():
+    """Process-wide SQLite progress store (user_progress.json is imported on first use)"""
+    global _progress_store
+    with _progress_store_lock:
+        if _progress_store is None:
+            base_dir = get_base_dir()
+            _progress_store = ProgressStore(
+                os.path.join(base_dir, "user_progress.db"),
+                legacy_json=os.path.join(base_dir, "user_progress.json")
+            )
+    return _progress_store
+
+def get_progress_events():
+    """Process-wide write-behind log for gamification events (replays leftover journals on start)"""
+    global _progress_events
+    store = get_progress_store()
+    with _progress_store_lock:
+        if _progress_events is None:
+            _progress_events = ProgressEventLog(store, os.path.join(get_base_dir(), "progress_journal"))
+    return _progress_events
+
+def load_user_progress(user_id=DEFAULT_USER_ID):
+    """Load a user's progress from the progress store"""
     try:
-        with open(filepath, "w") as f:
-            json.dump(data, f, indent=2)
+        # Apply this process's buffered events first so the read is up to date
+        get_progress_events().flush()
+        progress = get_progress_store().load(user_id)
+    except Exception as e:
+        print(f"Error loading progress: {e}")
+        progress = default_progress()
+    progress['user_id'] = user_id
+    return progress
+
+def save_user_progress(data, user_id=None):
+    """Save a user's full progress record to the progress store"""
+    try:
+        # Buffered events predate this snapshot; apply them before overwriting
+        get_progress_events().flush()
+        get_progress_store().save(user_id or data.get('user_id', DEFAULT_USER_ID), data)
         return True
     except Exception as e:
         print(f"Error saving progress: {e}")
         return False
 
+def record_progress_event(progress, kind, **data):
+    """Queue a gamification event for the progress's user (applied in the background)"""
+    get_progress_events().record(progress.get('user_id', DEFAULT_USER_ID), kind, **data)
+
+def progress_batch():
+    """Context manager committing every progress-store write inside it in one transaction"""
+    return get_progress_store().batch()
+
+_ratings_store = None
+
+def get_ratings_store():
+    """Process-wide ratings store (keeps the loaded frame between calls)"""
+    global _ratings_store
+    with _progress_store_lock:
+        if _ratings_store is None:
+            _ratings_store = RatingsStore(get_base_dir())
+    return _ratings_store
+
 def load_ratings():
-    """Load historical ratings from JSON lines file"""
-    filepath = os.path.join(get_base_dir(), "ratings.json")
-    if os.path.exists(filepath):
-        try:
-            with open(filepath, "r") as f:
-                data = [json.loads(line) for line in f if line.strip()]
-                if data:
-                    return pd.DataFrame(data)
-        except Exception as e:
-            print(f"Error loading ratings: {e}")
+    """Load historical ratings (only rows added since the last call are read)"""
+    try:
+        return get_ratings_store().load()
+    except Exception as e:
+        print(f"Error loading ratings: {e}")
     return pd.DataFrame()
 
 def save_rating(rating_data):
-    """Append a rating to the ratings file"""
-    filepath = os.path.join(get_base_dir(), "ratings.json")
+    """Append a rating to the ratings log (compacted into Parquet as it grows)"""
     try:
-        with open(filepath, "a") as f:
-            f.write(json.dumps(rating_data) + "\n")
+        get_ratings_store().save(rating_data)
         return True
     except Exception as e:
         print(f"Error saving rating: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def load_rating_aggregates():
+    """Running rating aggregates (count/sum/sum of squares per persona, user level and day)"""
+    try:
+        return get_ratings_store().aggregates()
+    except Exception as e:
+        print(f"Error loading rating aggregates: {e}")
+    return RatingAggregates()
+
+def rebuild_rating_aggregates():
+    """Recompute the rating aggregates from the raw ratings"""
+    return get_ratings_store().rebuild_aggregates()